@@ -0,0 +1,41 @@
+"""Add the transactional outbox table
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0000"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("topic", sa.String(), nullable=False),
+        sa.Column("aggregate_id", sa.Integer(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("idempotency_key", sa.String(), nullable=False, unique=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("claim_token", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_outbox_events_id", "outbox_events", ["id"])
+    op.create_index("ix_outbox_events_status_available_at", "outbox_events", ["status", "available_at"])
+
+
+def downgrade():
+    op.drop_index("ix_outbox_events_status_available_at", table_name="outbox_events")
+    op.drop_index("ix_outbox_events_id", table_name="outbox_events")
+    op.drop_table("outbox_events")
@@ -0,0 +1,45 @@
+"""Add composite indexes for hot service queries
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = "0000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # notes: (user_id, created_at) serves the list view with or without a tag filter. A tag is
+    # matched inside the comma-separated list, which no index on tags can serve, so the old
+    # single-column indexes are dropped.
+    op.drop_index("ix_notes_user_id", table_name="notes")
+    op.drop_index("ix_notes_tags", table_name="notes")
+    op.create_index("ix_notes_user_id_created_at", "notes", ["user_id", "created_at"])
+
+    op.create_index("ix_reminders_user_id_reminder_time", "reminders", ["user_id", "reminder_time"])
+
+    op.drop_index("ix_calendar_events_user_id", table_name="calendar_events")
+    op.create_index("ix_calendar_events_user_id_start_time", "calendar_events", ["user_id", "start_time"])
+
+    op.create_index("ix_careers_user_id", "careers", ["user_id"])
+    op.create_index("ix_roadmaps_user_id", "roadmaps", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_roadmaps_user_id", table_name="roadmaps")
+    op.drop_index("ix_careers_user_id", table_name="careers")
+
+    op.drop_index("ix_calendar_events_user_id_start_time", table_name="calendar_events")
+    op.create_index("ix_calendar_events_user_id", "calendar_events", ["user_id"])
+
+    op.drop_index("ix_reminders_user_id_reminder_time", table_name="reminders")
+
+    op.drop_index("ix_notes_user_id_created_at", table_name="notes")
+    op.create_index("ix_notes_tags", "notes", ["tags"])
+    op.create_index("ix_notes_user_id", "notes", ["user_id"])
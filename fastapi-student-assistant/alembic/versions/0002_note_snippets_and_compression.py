@@ -0,0 +1,110 @@
+"""Store note snippets and compress large note bodies
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BATCH = 500
+
+# Frozen copies of the settings and helpers in app.core.compression and app.services.notes
+# as of this revision, so later changes to the app cannot change what this migration does.
+SNIPPET_LENGTH = 160
+COMPRESSION_THRESHOLD = 4096
+
+
+def make_snippet(text):
+    text = " ".join((text or "").split())
+    return text if len(text) <= SNIPPET_LENGTH else text[:SNIPPET_LENGTH - 1].rstrip() + "…"
+
+
+def compress(data):
+    if zstandard is not None:
+        codec, payload = "zstd", zstandard.ZstdCompressor(level=3).compress(data)
+    else:
+        codec, payload = "zlib", zlib.compress(data, 6)
+    if len(payload) >= len(data):
+        return None, data
+    return codec, payload
+
+
+def decompress(codec, payload):
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Note body is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def content_columns(text):
+    data = (text or "").encode("utf-8")
+    codec = None
+    if len(data) >= COMPRESSION_THRESHOLD:
+        codec, payload = compress(data)
+    if codec is None:
+        return {"content": text, "content_blob": None, "content_codec": None, "snippet": make_snippet(text)}
+    return {"content": None, "content_blob": payload, "content_codec": codec, "snippet": make_snippet(text)}
+
+
+def upgrade():
+    op.add_column("notes", sa.Column("content_blob", sa.LargeBinary(), nullable=True))
+    op.add_column("notes", sa.Column("content_codec", sa.String(), nullable=True))
+    op.add_column("notes", sa.Column("snippet", sa.String(), nullable=True))
+
+    # Backfill existing rows with the same snippet and codec the app gives new ones.
+    bind = op.get_bind()
+    notes = sa.table(
+        "notes",
+        sa.column("id", sa.Integer),
+        sa.column("content", sa.Text),
+        sa.column("content_blob", sa.LargeBinary),
+        sa.column("content_codec", sa.String),
+        sa.column("snippet", sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(notes.c.id, notes.c.content).where(notes.c.id > last_id).order_by(notes.c.id).limit(BATCH)
+        ).fetchall()
+        if not rows:
+            break
+        for note_id, content in rows:
+            bind.execute(notes.update().where(notes.c.id == note_id).values(**content_columns(content)))
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    bind = op.get_bind()
+    notes = sa.table(
+        "notes",
+        sa.column("id", sa.Integer),
+        sa.column("content", sa.Text),
+        sa.column("content_blob", sa.LargeBinary),
+        sa.column("content_codec", sa.String),
+    )
+    for note_id, codec, blob in bind.execute(
+        sa.select(notes.c.id, notes.c.content_codec, notes.c.content_blob).where(notes.c.content_codec.isnot(None))
+    ).fetchall():
+        bind.execute(notes.update().where(notes.c.id == note_id).values(content=decompress(codec, blob).decode("utf-8")))
+
+    with op.batch_alter_table("notes") as batch_op:
+        batch_op.drop_column("snippet")
+        batch_op.drop_column("content_codec")
+        batch_op.drop_column("content_blob")
@@ -0,0 +1,29 @@
+"""Add the shard directory table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only read on shard 0, but every shard runs the same migrations.
+    op.create_table(
+        "shard_assignments",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("shard_assignments")
@@ -0,0 +1,65 @@
+"""Archive completed reminders and past calendar events
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("reminders", sa.Column("completed", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.create_index("ix_reminders_completed_reminder_time", "reminders", ["completed", "reminder_time"])
+    op.create_index("ix_calendar_events_end_time", "calendar_events", ["end_time"])
+
+    op.create_table(
+        "reminders_archive",
+        sa.Column("archive_id", sa.Integer(), primary_key=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("is_recurring", sa.Boolean(), nullable=True),
+        sa.Column("completed", sa.Boolean(), nullable=False),
+        sa.Column("reminder_time", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_reminders_archive_user_id_reminder_time", "reminders_archive", ["user_id", "reminder_time"])
+
+    op.create_table(
+        "calendar_events_archive",
+        sa.Column("archive_id", sa.Integer(), primary_key=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("start_time", sa.DateTime(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=False),
+        sa.Column("category", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_calendar_events_archive_user_id_start_time", "calendar_events_archive", ["user_id", "start_time"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_calendar_events_archive_user_id_start_time", table_name="calendar_events_archive")
+    op.drop_table("calendar_events_archive")
+    op.drop_index("ix_reminders_archive_user_id_reminder_time", table_name="reminders_archive")
+    op.drop_table("reminders_archive")
+    op.drop_index("ix_calendar_events_end_time", table_name="calendar_events")
+    op.drop_index("ix_reminders_completed_reminder_time", table_name="reminders")
+    with op.batch_alter_table("reminders") as batch_op:
+        batch_op.drop_column("completed")
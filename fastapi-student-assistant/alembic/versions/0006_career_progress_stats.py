@@ -0,0 +1,109 @@
+"""Numeric career progress, JSON resources and running progress totals
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+BATCH = 500
+DONE_WORDS = {"done", "complete", "completed", "finished"}
+COMPLETE = 100.0
+BUCKETS = 10
+STAT_COLUMNS = ", ".join(["goals", "completed", "progress_sum"] + [f"bucket_{i}" for i in range(BUCKETS)])
+
+
+def _progress(value) -> float:
+    # The old column held free text ("Not Started", "50%", "Completed").
+    text = str(value or "").strip().lower().rstrip("%").strip()
+    if text in DONE_WORDS:
+        return 100.0
+    try:
+        return min(max(float(text), 0.0), 100.0)
+    except ValueError:
+        return 0.0
+
+def _resources(value) -> str:
+    try:
+        resources = json.loads(value or "[]")
+    except ValueError:
+        return "[]"
+    return json.dumps([str(item) for item in resources] if isinstance(resources, list) else [])
+
+
+def _stats_table(name: str, key: sa.Column):
+    op.create_table(
+        name,
+        key,
+        sa.Column("goals", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("progress_sum", sa.Float(), nullable=False),
+        *[sa.Column(f"bucket_{i}", sa.Integer(), nullable=False) for i in range(BUCKETS)],
+    )
+
+
+def _aggregates(key: str) -> str:
+    # Per-key totals over the careers table, as app.services.career_stats computed them at this revision.
+    width = COMPLETE / BUCKETS
+    buckets = [
+        f"COALESCE(SUM(CASE WHEN progress >= {i * width} THEN 1 ELSE 0 END), 0)" if i == BUCKETS - 1 else
+        f"COALESCE(SUM(CASE WHEN progress >= {i * width} AND progress < {(i + 1) * width} THEN 1 ELSE 0 END), 0)"
+        for i in range(BUCKETS)
+    ]
+    return (
+        f"SELECT {key}, COUNT(*), COALESCE(SUM(CASE WHEN progress >= {COMPLETE} THEN 1 ELSE 0 END), 0), "
+        f"COALESCE(SUM(progress), 0.0), {', '.join(buckets)} FROM careers WHERE {key} IS NOT NULL GROUP BY {key}"
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    careers = sa.table(
+        "careers", sa.column("id", sa.Integer), sa.column("progress", sa.String), sa.column("resources", sa.String)
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(careers.c.id, careers.c.progress, careers.c.resources)
+            .where(careers.c.id > last_id).order_by(careers.c.id).limit(BATCH)
+        ).fetchall()
+        if not rows:
+            break
+        for career_id, progress, resources in rows:
+            bind.execute(careers.update().where(careers.c.id == career_id).values(
+                progress=str(_progress(progress)), resources=_resources(resources)
+            ))
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table("careers") as batch_op:
+        batch_op.alter_column(
+            "progress", existing_type=sa.String(), type_=sa.Float(), nullable=False, server_default="0",
+            postgresql_using="progress::double precision",
+        )
+        batch_op.alter_column(
+            "resources", existing_type=sa.String(), type_=sa.JSON(), nullable=False, server_default="[]",
+            postgresql_using="resources::json",
+        )
+
+    _stats_table("career_user_stats", sa.Column("user_id", sa.Integer(), primary_key=True))
+    _stats_table("career_goal_stats", sa.Column("goal", sa.String(), primary_key=True))
+
+    op.execute(f"INSERT INTO career_user_stats (user_id, {STAT_COLUMNS}) {_aggregates('user_id')}")
+    op.execute(f"INSERT INTO career_goal_stats (goal, {STAT_COLUMNS}) {_aggregates('goal')}")
+
+
+def downgrade():
+    op.drop_table("career_goal_stats")
+    op.drop_table("career_user_stats")
+    with op.batch_alter_table("careers") as batch_op:
+        batch_op.alter_column("resources", existing_type=sa.JSON(), type_=sa.String(), nullable=True, server_default=None)
+        batch_op.alter_column("progress", existing_type=sa.Float(), type_=sa.String(), nullable=True, server_default=None)
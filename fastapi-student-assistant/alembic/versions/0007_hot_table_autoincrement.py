@@ -0,0 +1,41 @@
+"""Never reuse reminder and calendar event ids
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Archived rows keep their id, so a new hot row must never get one of them back.
+TABLES = {"reminders": "reminders_archive", "calendar_events": "calendar_events_archive"}
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Other databases hand out ids from sequences, which never go back.
+    if bind.dialect.name != "sqlite":
+        return
+    for table, archive in TABLES.items():
+        with op.batch_alter_table(table, recreate="always", table_kwargs={"sqlite_autoincrement": True}):
+            pass
+        # AUTOINCREMENT continues from the largest id ever handed out, archived ones included.
+        last_id = bind.execute(sa.text(
+            f"SELECT max(id) FROM (SELECT max(id) AS id FROM {table} UNION ALL SELECT max(id) FROM {archive})"
+        )).scalar() or 0
+        bind.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table})
+        bind.execute(sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {"name": table, "seq": last_id})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table in TABLES:
+        with op.batch_alter_table(table, recreate="always"):
+            pass
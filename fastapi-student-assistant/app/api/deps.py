@@ -1,6 +1,7 @@
-from fastapi import Depends
+from fastapi import Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.core.profiling import profiler
 from app.core.security import get_current_user
 
 # Dependency to get the current user
@@ -9,4 +10,9 @@ def get_current_active_user(current_user: str = Depends(get_current_user)):
 
 # Dependency to get the database session
 def get_database_session(db: Session = Depends(get_db)):
-    return db
\ No newline at end of file
+    return db
+
+# Dependency guarding the profiler endpoints
+def require_profiler_token(x_profiler_token: str = Header(None)):
+    if not profiler.authorized(x_profiler_token):
+        raise HTTPException(status_code=403, detail="A valid X-Profiler-Token header is required")
\ No newline at end of file
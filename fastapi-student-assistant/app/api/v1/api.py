@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import health, tips, roadmap, career, notes, reminders, calendar, followups, voice
+from app.api.v1.endpoints import health, tips, roadmap, career, notes, reminders, calendar, followups, voice, profiler, users
 
 router = APIRouter()
 
@@ -11,4 +11,6 @@ router.include_router(notes.router, prefix="/notes", tags=["notes"])
 router.include_router(reminders.router, prefix="/reminders", tags=["reminders"])
 router.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
 router.include_router(followups.router, prefix="/followups", tags=["followups"])
-router.include_router(voice.router, prefix="/voice", tags=["voice"])
\ No newline at end of file
+router.include_router(voice.router, prefix="/voice", tags=["voice"])
+router.include_router(users.router, prefix="/users", tags=["users"])
+router.include_router(profiler.router, prefix="/admin/profiler", tags=["admin"])
\ No newline at end of file
@@ -1,26 +1,32 @@
+from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models.calendar import Calendar
-from app.schemas.calendar import CalendarCreate, CalendarResponse
-from app.services.calendar import create_event, get_daily_events, get_weekly_events
+from app.db.session import get_read_db, get_writer
+from app.schemas.calendar import CalendarEventCreate, CalendarResponse
+from app.services.calendar import CalendarService
 
 router = APIRouter()
 
 @router.post("/events", response_model=CalendarResponse)
-def add_event(event: CalendarCreate, db: Session = Depends(get_db)):
-    return create_event(db=db, event=event)
+def add_event(event: CalendarEventCreate, user_id: int, writer=Depends(get_writer)):
+    return writer.for_user(user_id).run(lambda db: CalendarService(db).create_event(event=event, user_id=user_id))
 
 @router.get("/daily/{user_id}", response_model=list[CalendarResponse])
-def fetch_daily_planner(user_id: int, db: Session = Depends(get_db)):
-    events = get_daily_events(db=db, user_id=user_id)
+def fetch_daily_planner(user_id: int, db: Session = Depends(get_read_db)):
+    events = CalendarService(db).get_daily_events(user_id=user_id)
     if not events:
         raise HTTPException(status_code=404, detail="No events found for the day.")
     return events
 
 @router.get("/weekly/{user_id}", response_model=list[CalendarResponse])
-def fetch_weekly_planner(user_id: int, db: Session = Depends(get_db)):
-    events = get_weekly_events(db=db, user_id=user_id)
+def fetch_weekly_planner(user_id: int, db: Session = Depends(get_read_db)):
+    events = CalendarService(db).get_weekly_events(user_id=user_id)
     if not events:
         raise HTTPException(status_code=404, detail="No events found for the week.")
-    return events
\ No newline at end of file
+    return events
+
+@router.get("/events/{user_id}", response_model=list[CalendarResponse])
+def fetch_event_history(
+    user_id: int, start: datetime, end: datetime, include_archived: bool = False, db: Session = Depends(get_read_db)
+):
+    return CalendarService(db).get_events(user_id=user_id, start=start, end=end, include_archived=include_archived)
\ No newline at end of file
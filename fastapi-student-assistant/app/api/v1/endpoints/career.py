@@ -1,15 +1,47 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.schemas.career import CareerCreate, CareerRead
+from app.db.session import get_fan_out, get_read_db, get_writer
+from app.schemas.career import CareerCreate, CareerRead, CareerStats, CareerUpdate
 from app.services.career import CareerService
+from app.services.career_stats import CareerStatsService, summarize
 
 router = APIRouter()
 
 @router.post("/goals", response_model=CareerRead)
-def create_career_goal(goal: CareerCreate, db: Session = Depends(get_db)):
-    return CareerService.create_goal(db=db, goal=goal)
+def create_career_goal(goal: CareerCreate, writer=Depends(get_writer)):
+    return writer.for_user(goal.user_id).run(lambda db: CareerService(db).create_career_goal(goal))
 
 @router.get("/goals", response_model=list[CareerRead])
-def list_career_goals(db: Session = Depends(get_db)):
-    return CareerService.get_goals(db=db)
\ No newline at end of file
+def list_career_goals(user_id: Optional[int] = None, db: Session = Depends(get_read_db), fan_out=Depends(get_fan_out)):
+    if user_id is not None:
+        return CareerService(db).get_career_goals(user_id=user_id)
+    # Without a user filter this is an admin query across every shard.
+    return fan_out(lambda shard_db: CareerService(shard_db).get_all_career_goals())
+
+@router.put("/goals/{career_id}", response_model=CareerRead)
+def update_career_goal(career_id: int, update: CareerUpdate, user_id: int, writer=Depends(get_writer)):
+    career = writer.for_user(user_id).run(
+        lambda db: CareerService(db).update_career_goal(career_id, update, user_id=user_id)
+    )
+    if career is None:
+        raise HTTPException(status_code=404, detail="Career goal not found")
+    return career
+
+@router.delete("/goals/{career_id}", response_model=dict)
+def delete_career_goal(career_id: int, user_id: int, writer=Depends(get_writer)):
+    career = writer.for_user(user_id).run(lambda db: CareerService(db).delete_career_goal(career_id, user_id=user_id))
+    if career is None:
+        raise HTTPException(status_code=404, detail="Career goal not found")
+    return {"detail": "Career goal deleted successfully"}
+
+@router.get("/stats", response_model=CareerStats)
+def career_stats(user_id: Optional[int] = None, goal: Optional[str] = None, db: Session = Depends(get_read_db),
+                 fan_out=Depends(get_fan_out)):
+    # Served from the running totals, never by scanning careers.
+    if (user_id is None) == (goal is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of user_id or goal")
+    if user_id is not None:
+        return CareerStats(user_id=user_id, **summarize([CareerStatsService(db).user_stats(user_id)]))
+    # Goal totals are kept per shard: one primary-key lookup per shard.
+    return CareerStats(goal=goal, **summarize(fan_out(lambda shard_db: [CareerStatsService(shard_db).goal_stats(goal)])))
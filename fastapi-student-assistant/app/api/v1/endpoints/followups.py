@@ -1,19 +1,20 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models.reminder import Reminder
+from app.db.session import get_read_db, get_writer
 from app.schemas.reminder import ReminderCreate, ReminderOut
 from app.services.reminders import ReminderService
 
 router = APIRouter()
 
 @router.get("/{user_id}", response_model=list[ReminderOut])
-def get_followups(user_id: int, db: Session = Depends(get_db)):
-    followups = ReminderService.get_followups(db, user_id)
+def get_followups(user_id: int, db: Session = Depends(get_read_db)):
+    followups = ReminderService(db).get_followups(user_id=user_id)
     if not followups:
         raise HTTPException(status_code=404, detail="No follow-ups found")
     return followups
 
 @router.post("/", response_model=ReminderOut)
-def log_followup(reminder: ReminderCreate, db: Session = Depends(get_db)):
-    return ReminderService.create_followup(db, reminder)
\ No newline at end of file
+def log_followup(reminder: ReminderCreate, writer=Depends(get_writer)):
+    return writer.for_user(reminder.user_id).run(
+        lambda db: ReminderService(db).create_reminder(reminder=reminder, user_id=reminder.user_id)
+    )
\ No newline at end of file
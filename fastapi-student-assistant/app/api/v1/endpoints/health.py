@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from app.core import shared_cache, singleflight
 
 router = APIRouter()
 
@@ -13,4 +14,14 @@ async def readiness_check():
 
 @router.get("/version")
 async def version():
-    return {"version": "1.0.0"}  # Update with actual versioning logic if necessary
\ No newline at end of file
+    return {"version": "1.0.0"}  # Update with actual versioning logic if necessary
+
+@router.get("/singleflight")
+async def singleflight_stats():
+    # Per service method: calls, DB executions, calls served from another request's query.
+    return singleflight.stats()
+
+@router.get("/shared-cache")
+async def shared_cache_stats():
+    # Per cache, in the worker that served this request: local hits, hits on another worker's load, misses.
+    return shared_cache.stats()
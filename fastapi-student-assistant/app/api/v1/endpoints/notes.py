@@ -1,30 +1,37 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models.note import Note
-from app.schemas.note import NoteCreate, NoteRead
+from app.db.session import get_read_db, get_writer
+from app.schemas.note import NoteCreate, NoteRead, NoteSearchResult, NoteSummary
 from app.services.notes import NoteService
+from app.services.note_search import NoteSearchService
 
 router = APIRouter()
 
 @router.post("/", response_model=NoteRead)
-def create_note(note: NoteCreate, db: Session = Depends(get_db)):
-    return NoteService.create_note(db=db, note=note)
+def create_note(note: NoteCreate, user_id: int, writer=Depends(get_writer)):
+    return writer.for_user(user_id).run(lambda db: NoteService(db).create_note(note=note, user_id=user_id))
 
-@router.get("/", response_model=list[NoteRead])
-def get_notes(tag: str = None, db: Session = Depends(get_db)):
-    return NoteService.get_notes(db=db, tag=tag)
+@router.get("/", response_model=list[NoteSummary])
+def get_notes(user_id: int, tag: str = None, db: Session = Depends(get_read_db)):
+    return NoteService(db).get_notes(user_id=user_id, tag=tag)
+
+@router.get("/search", response_model=list[NoteSearchResult])
+def search_notes(user_id: int, q: str, mode: str = "semantic", k: int = 10, db: Session = Depends(get_read_db)):
+    if mode == "tag":
+        return [NoteSearchResult(**NoteSummary.from_orm(note).dict(), score=1.0)
+                for note in NoteService(db).get_notes(user_id=user_id, tag=q)[:k]]
+    if mode != "semantic":
+        raise HTTPException(status_code=400, detail="mode must be 'semantic' or 'tag'")
+    return [NoteSearchResult(**NoteSummary.from_orm(note).dict(), score=score)
+            for note, score in NoteSearchService(db).search(user_id=user_id, query=q, k=k)]
 
 @router.get("/{note_id}", response_model=NoteRead)
-def get_note(note_id: int, db: Session = Depends(get_db)):
-    note = NoteService.get_note_by_id(db=db, note_id=note_id)
+def get_note(note_id: int, user_id: int, db: Session = Depends(get_read_db)):
+    note = NoteService(db).get_note(note_id=note_id, user_id=user_id)
     if note is None:
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
 @router.delete("/{note_id}", response_model=dict)
-def delete_note(note_id: int, db: Session = Depends(get_db)):
-    result = NoteService.delete_note(db=db, note_id=note_id)
-    if not result:
-        raise HTTPException(status_code=404, detail="Note not found")
-    return {"detail": "Note deleted successfully"}
\ No newline at end of file
+def delete_note(note_id: int, user_id: int, writer=Depends(get_writer)):
+    return writer.for_user(user_id).run(lambda db: NoteService(db).delete_note(note_id=note_id, user_id=user_id))
\ No newline at end of file
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import PlainTextResponse
+from app.api.deps import require_profiler_token
+from app.core.config import settings
+from app.core.profiling import profiler
+
+router = APIRouter(dependencies=[Depends(require_profiler_token)])
+
+@router.post("/start", response_model=dict)
+def start_profiling(seconds: float = 30):
+    # Samples every thread in this process until the window ends.
+    trace = profiler.start_global(min(seconds, settings.PROFILER_MAX_SECONDS))
+    return trace.summary()
+
+@router.get("/", response_model=list[dict])
+def list_profiles():
+    profiles = list(profiler.profiles)
+    if profiler.global_trace is not None:
+        profiles.append(profiler.global_trace)
+    return [trace.summary() for trace in reversed(profiles)]
+
+@router.get("/{profile_id}", response_model=dict)
+def get_profile(profile_id: int):
+    trace = profiler.get(profile_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {**trace.summary(), "sql": trace.sql}
+
+@router.get("/{profile_id}/collapsed", response_class=PlainTextResponse)
+def download_collapsed_stacks(profile_id: int):
+    trace = profiler.get(profile_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        trace.collapsed(), headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+    )
\ No newline at end of file
@@ -1,26 +1,30 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models.reminder import Reminder
-from app.schemas.reminder import ReminderCreate, ReminderOut
+from app.db.session import get_read_db, get_writer
+from app.schemas.reminder import ReminderCreate, ReminderOut, ReminderUpdate
 from app.services.reminders import ReminderService
 
 router = APIRouter()
 
 @router.post("/", response_model=ReminderOut)
-def create_reminder(reminder: ReminderCreate, db: Session = Depends(get_db)):
-    return ReminderService.create_reminder(db=db, reminder=reminder)
+def create_reminder(reminder: ReminderCreate, writer=Depends(get_writer)):
+    return writer.for_user(reminder.user_id).run(lambda db: ReminderService(db).create_reminder(reminder=reminder, user_id=reminder.user_id))
 
 @router.get("/{user_id}", response_model=list[ReminderOut])
-def get_reminders(user_id: int, db: Session = Depends(get_db)):
-    reminders = ReminderService.get_reminders_by_user(db=db, user_id=user_id)
+def get_reminders(user_id: int, include_archived: bool = False, db: Session = Depends(get_read_db)):
+    reminders = ReminderService(db).get_reminders(user_id=user_id, include_archived=include_archived)
     if not reminders:
         raise HTTPException(status_code=404, detail="No reminders found")
     return reminders
 
+@router.patch("/{id}", response_model=ReminderOut)
+def update_reminder(id: int, update: ReminderUpdate, user_id: int, writer=Depends(get_writer)):
+    # {"completed": true} marks a reminder done; the archiver moves it out once its time is long past.
+    return writer.for_user(user_id).run(
+        lambda db: ReminderService(db).update_reminder(reminder_id=id, reminder_update=update, user_id=user_id)
+    )
+
 @router.delete("/{id}", response_model=dict)
-def delete_reminder(id: int, db: Session = Depends(get_db)):
-    result = ReminderService.delete_reminder(db=db, reminder_id=id)
-    if not result:
-        raise HTTPException(status_code=404, detail="Reminder not found")
+def delete_reminder(id: int, user_id: int, writer=Depends(get_writer)):
+    writer.for_user(user_id).run(lambda db: ReminderService(db).delete_reminder(reminder_id=id, user_id=user_id))
     return {"detail": "Reminder deleted successfully"}
\ No newline at end of file
@@ -1,18 +1,18 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_read_db, get_writer
 from app.schemas.roadmap import RoadmapCreate, RoadmapResponse
 from app.services.roadmap import RoadmapService
 
 router = APIRouter()
 
 @router.post("/", response_model=RoadmapResponse)
-def create_roadmap(roadmap: RoadmapCreate, db: Session = Depends(get_db)):
-    return RoadmapService.create_roadmap(db=db, roadmap=roadmap)
+def create_roadmap(roadmap: RoadmapCreate, writer=Depends(get_writer)):
+    return writer.for_user(roadmap.user_id).run(lambda db: RoadmapService(db).create_roadmap(roadmap))
 
 @router.get("/{user_id}", response_model=RoadmapResponse)
-def get_roadmap(user_id: int, db: Session = Depends(get_db)):
-    roadmap = RoadmapService.get_roadmap(db=db, user_id=user_id)
+def get_roadmap(user_id: int, db: Session = Depends(get_read_db)):
+    roadmap = RoadmapService(db).get_roadmap(user_id=user_id)
     if roadmap is None:
         raise HTTPException(status_code=404, detail="Roadmap not found")
     return roadmap
\ No newline at end of file
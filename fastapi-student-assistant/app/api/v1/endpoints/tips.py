@@ -1,12 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.orm import Session
+from app.db.session import get_read_db
 from app.schemas.tip import TipResponse
-from app.services.tips import get_tips_by_topic
+from app.services.tips import TipService
 
 router = APIRouter()
 
 @router.get("/tips", response_model=list[TipResponse])
-async def fetch_tips(topic: str):
-    tips = await get_tips_by_topic(topic)
+def fetch_tips(topic: str, db: Session = Depends(get_read_db)):
+    tips = TipService(db).get_tips(topic=topic)
     if not tips:
         raise HTTPException(status_code=404, detail="Tips not found")
     return tips
\ No newline at end of file
@@ -0,0 +1,37 @@
+from tempfile import SpooledTemporaryFile
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.profiling import traced
+from app.db.session import get_writer, open_read_session
+from app.services.user_data import UserDataImporter, UserDataService
+
+router = APIRouter()
+
+@router.get("/{user_id}/export")
+def export_user_data(user_id: int):
+    # The generator owns its session: it outlives the endpoint while the response streams.
+    def chunks():
+        db = open_read_session(user_id)
+        try:
+            yield from UserDataService(db).export_zip(user_id)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        chunks(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="user-{user_id}-export.zip"'},
+    )
+
+@router.post("/{user_id}/import", response_model=dict)
+async def import_user_data(user_id: int, request: Request, writer=Depends(get_writer)):
+    # The upload is spooled (to disk past IMPORT_SPOOL_MAX_BYTES) because zip needs to seek to its directory.
+    with SpooledTemporaryFile(max_size=settings.IMPORT_SPOOL_MAX_BYTES) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        counts = await run_in_threadpool(traced(lambda: UserDataImporter(writer.for_user(user_id)).import_zip(upload, user_id)))
+    return {"imported": counts}
@@ -0,0 +1,28 @@
+import zlib
+from typing import Optional, Tuple
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+def compress(data: bytes, codec: str = None) -> Tuple[Optional[str], bytes]:
+    # Returns (codec, payload); codec is None when compressing would not save space.
+    codec = codec or settings.NOTE_COMPRESSION_CODEC
+    if codec == "zstd" and zstandard is not None:
+        payload = zstandard.ZstdCompressor(level=3).compress(data)
+    else:
+        codec, payload = "zlib", zlib.compress(data, 6)
+    if len(payload) >= len(data):
+        return None, data
+    return codec, payload
+
+def decompress(codec: str, payload: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Note body is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unknown compression codec: {codec}")
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import List
 from pydantic import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,7 +7,90 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "your_jwt_secret"
     JWT_EXPIRATION: int = 60  # in minutes
 
+    # Transactional outbox worker
+    OUTBOX_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0  # in seconds
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_RETRY_BACKOFF: float = 2.0  # in seconds, doubled on every attempt
+    OUTBOX_LEASE_SECONDS: int = 60
+    OUTBOX_RETENTION_HOURS: int = 24  # processed events are purged after this
+
+    # Idempotency-Key handling for POST requests
+    IDEMPOTENCY_TTL_HOURS: int = 24  # stored responses are replayed for this long
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # how long a concurrent duplicate waits for the first request
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # unfinished claims older than this are taken over
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 1024 * 1024  # larger bodies (e.g. streamed imports) are passed through unbuffered
+
+    # Read replicas for GET traffic, e.g. '["sqlite:///./replica1.db"]'
+    DATABASE_REPLICA_URLS: List[str] = []
+    REPLICA_STICKY_SECONDS: float = 5.0  # read-your-writes window after a user's own write
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 5.0  # in seconds
+
+    # Sampling profiler and slow-request capture
+    PROFILER_ENABLED: bool = True
+    PROFILER_TOKEN: str = ""  # X-Profile header / X-Profiler-Token value; empty disables on-demand profiling
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_SLOW_REQUEST_MS: float = 1000.0  # slower requests keep their stack samples and SQL
+    PROFILER_BUFFER_SIZE: int = 50  # profiles kept in memory, oldest dropped first
+    PROFILER_MAX_SECONDS: int = 300  # longest global profiling window
+
+    # Coalescing of identical concurrent reads
+    SINGLEFLIGHT_TIMEOUT: float = 2.0  # in seconds, after which waiters stop waiting on a flight
+
+    # Per-user sharding (DATABASE_URL is shard 0 and holds the directory)
+    DATABASE_SHARD_URLS: List[str] = []
+    SHARD_VIRTUAL_NODES: int = 64
+    SHARD_PIN_CACHE_SECONDS: float = 1.0  # how long a process may route a moving user to its old shard
+
+    # Archival of completed reminders and past events into the *_archive tables
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_RETENTION_DAYS: int = 30
+    ARCHIVE_BATCH_SIZE: int = 500  # rows moved per transaction
+    ARCHIVE_BATCH_PAUSE_MS: int = 50  # gap between batches so writers get the lock
+    ARCHIVE_INTERVAL_SECONDS: int = 3600
+
+    # Multi-worker launcher (python -m app.serve)
+    SERVE_HOST: str = "0.0.0.0"
+    SERVE_PORT: int = 8000
+    SERVE_WORKERS: int = 0  # 0 means one per available CPU core
+    SERVE_BACKLOG: int = 2048
+    SERVE_GRACEFUL_TIMEOUT: float = 30.0  # in seconds a stopping worker gets to finish in-flight requests
+
+    # Read-mostly data shared between workers; the launcher points this at a fresh dir under /dev/shm
+    SHARED_CACHE_DIR: str = ""
+    SHARED_CACHE_TTL_SECONDS: float = 300.0
+
+    # Per-user export and import
+    EXPORT_CHUNK_SIZE: int = 64 * 1024  # bytes of zip output per streamed chunk
+    EXPORT_FETCH_SIZE: int = 500  # rows fetched from the cursor at a time
+    IMPORT_BATCH_SIZE: int = 500  # rows inserted per transaction
+    IMPORT_SPOOL_MAX_BYTES: int = 8 * 1024 * 1024  # larger uploads are spooled to a temp file
+
+    # Note bodies
+    NOTE_SNIPPET_LENGTH: int = 160
+    NOTE_COMPRESSION_THRESHOLD: int = 4096  # bodies at least this many bytes are stored compressed
+    NOTE_COMPRESSION_CODEC: str = "zstd"  # falls back to zlib when zstandard is not installed
+
+    # Semantic note search
+    EMBEDDING_ENGINE: str = "hashing"  # or "package.module:ClassName" for a local model
+    EMBEDDING_DIM: int = 256
+    VECTOR_INDEX_DIR: str = "./vector_index"
+    VECTOR_IVF_THRESHOLD: int = 20000  # per-user vectors above which the approximate index is used
+    VECTOR_IVF_NPROBE: int = 8
+
+    # SQLite single-node profile, applied to file databases only
+    SQLITE_PROFILE: bool = True
+    SQLITE_WAL: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL + NORMAL skips the per-commit fsync; power loss may drop the latest commits, never corrupts
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456  # in bytes
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_WRITER_BATCH_SIZE: int = 64
+    SQLITE_GROUP_COMMIT_WINDOW_MS: float = 2.0
+
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from sqlalchemy import and_, delete, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from app.core.config import settings
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger("uvicorn.error")
+
+HEADER = b"idempotency-key"
+PURGE_INTERVAL = 300  # in seconds
+
+def fingerprint(scope, body: bytes) -> str:
+    # The caller's credentials are part of the fingerprint, so a key can never replay another user's response.
+    headers = dict(scope["headers"])
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""),
+                 headers.get(b"authorization", b""), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def caller(scope, body: bytes) -> str:
+    # Who is making the request: the presented credentials, plus the user_id the request acts
+    # for (query string or JSON body), which is all that identifies anonymous callers.
+    headers = dict(scope["headers"])
+    user_id = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("user_id", [""])[0]
+    if not user_id and body[:1] == b"{":
+        try:
+            user_id = json.loads(body).get("user_id", "")
+        except ValueError:
+            pass
+    return f"{headers.get(b'authorization', b'').decode('latin-1')}\0{user_id}"
+
+def scoped_key(scope, body: bytes, key: str) -> str:
+    # Keys are chosen by clients, so two callers (or two endpoints) can pick the same one;
+    # the stored key is scoped to the caller, method and path so they never collide.
+    digest = hashlib.sha256()
+    for part in (caller(scope, body), scope["method"], scope["path"], key):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    # A POST carrying an Idempotency-Key runs once; retries get the stored response back
+    # without reaching the endpoint, and concurrent duplicates wait for the first to finish.
+    def __init__(self, app, engine: Engine = None):
+        self.app = app
+        self._engine = engine
+        self._inflight: Dict[str, asyncio.Event] = {}
+        self._purged_at = 0.0
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from app.db.session import engine
+            self._engine = engine
+        return self._engine
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        key = dict(scope["headers"]).get(HEADER)
+        if key is None:
+            return await self.app(scope, receive, send)
+        key = key.decode("latin-1")
+        if not key or len(key) > 255:
+            return await JSONResponse({"detail": "Idempotency-Key must be 1-255 characters"}, 400)(scope, receive, send)
+
+        limit = settings.IDEMPOTENCY_MAX_BODY_BYTES
+        if int(dict(scope["headers"]).get(b"content-length", b"0") or 0) > limit:
+            return await self.app(scope, receive, send)
+        body, more_body = await _read_body(receive, limit)
+        if more_body or len(body) > limit:
+            # Too large to hold for fingerprinting: handled like a request without a key.
+            return await self.app(scope, _replaying(body, more_body, receive), send)
+        key = scoped_key(scope, body, key)
+        request_fingerprint = fingerprint(scope, body)
+        await self._maybe_purge()
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            state, record = await run_in_threadpool(self._claim, key, request_fingerprint)
+            if state != "in_progress":
+                break
+            if time.monotonic() >= deadline:
+                return await JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress"}, 409,
+                    headers={"Retry-After": "1"},
+                )(scope, receive, send)
+            await self._wait(key, deadline)
+
+        if state == "mismatch":
+            return await JSONResponse(
+                {"detail": "Idempotency-Key was already used with a different request"}, 422
+            )(scope, receive, send)
+        if state == "completed":
+            return await _replay(record, send)
+        await self._run_once(key, body, scope, receive, send)
+
+    async def _run_once(self, key: str, body: bytes, scope, receive, send):
+        done = self._inflight[key] = asyncio.Event()
+        status_code, headers, chunks = None, [], []
+
+        async def capture(message):
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in message.get("headers", [])]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, _replaying(body, False, receive), capture)
+        except BaseException:
+            await run_in_threadpool(self._release, key)
+            raise
+        else:
+            # Server errors are not stored, so the client's retry gets another attempt.
+            if status_code is None or status_code >= 500:
+                await run_in_threadpool(self._release, key)
+            else:
+                await run_in_threadpool(self._complete, key, status_code, headers, b"".join(chunks))
+        finally:
+            self._inflight.pop(key, None)
+            done.set()
+
+    async def _wait(self, key: str, deadline: float):
+        # Duplicates in this process wake up as soon as the first request ends; others poll.
+        event = self._inflight.get(key)
+        remaining = max(0.0, deadline - time.monotonic())
+        if event is None:
+            await asyncio.sleep(min(remaining, 0.25))
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout=remaining)
+        except asyncio.TimeoutError:
+            pass
+
+    def _claim(self, key: str, request_fingerprint: str) -> Tuple[str, Optional[IdempotencyKey]]:
+        now = datetime.utcnow()
+        table = IdempotencyKey.__table__
+        claim = table.insert().values(
+            key=key,
+            fingerprint=request_fingerprint,
+            status="in_progress",
+            created_at=now,
+            expires_at=now + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+        )
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(claim)
+            return "claimed", None
+        except IntegrityError:
+            pass
+        try:
+            with self.engine.begin() as connection:
+                record = connection.execute(select(table).where(table.c.key == key)).first()
+                if record is None or record.expires_at <= now:
+                    connection.execute(delete(table).where(and_(table.c.key == key, table.c.expires_at <= now)))
+                    connection.execute(claim)
+                    return "claimed", None
+                if record.fingerprint != request_fingerprint:
+                    return "mismatch", record
+                if record.status == "completed":
+                    return "completed", record
+                # Take over claims left behind by a crashed process.
+                stale = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+                taken = connection.execute(
+                    update(table)
+                    .where(and_(table.c.key == key, table.c.status == "in_progress", table.c.created_at < stale))
+                    .values(created_at=now)
+                ).rowcount
+                return ("claimed", None) if taken else ("in_progress", record)
+        except IntegrityError:
+            # Another request re-claimed the expired key first.
+            return "in_progress", None
+
+    def _complete(self, key: str, status_code: int, headers: List[List[str]], body: bytes):
+        table = IdempotencyKey.__table__
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(table).where(table.c.key == key).values(
+                    status="completed", status_code=status_code, headers=json.dumps(headers), body=body
+                )
+            )
+
+    def _release(self, key: str):
+        table = IdempotencyKey.__table__
+        with self.engine.begin() as connection:
+            connection.execute(delete(table).where(and_(table.c.key == key, table.c.status == "in_progress")))
+
+    async def _maybe_purge(self):
+        if time.monotonic() - self._purged_at < PURGE_INTERVAL:
+            return
+        self._purged_at = time.monotonic()
+        try:
+            await run_in_threadpool(self.purge_expired)
+        except Exception as exc:
+            logger.error(f"Purging expired idempotency keys failed: {exc}")
+
+    def purge_expired(self) -> int:
+        table = IdempotencyKey.__table__
+        with self.engine.begin() as connection:
+            return connection.execute(delete(table).where(table.c.expires_at <= datetime.utcnow())).rowcount
+
+
+async def _read_body(receive, limit: int) -> Tuple[bytes, bool]:
+    # Reads until the body ends or passes limit bytes; the flag says whether more is still to come.
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        chunks.append(chunk)
+        size += len(chunk)
+        more_body = message.get("more_body", False)
+        if not more_body or size > limit:
+            return b"".join(chunks), more_body
+
+def _replaying(body: bytes, more_body: bool, receive):
+    # A receive channel that hands the part of the body already read to the app, then the rest as it arrives.
+    pending = {"type": "http.request", "body": body, "more_body": more_body}
+
+    async def replay():
+        nonlocal pending
+        if pending is None:
+            return await receive()
+        message, pending = pending, None
+        return message
+    return replay
+
+async def _replay(record: IdempotencyKey, send):
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(record.headers or "[]")]
+    headers.append((b"idempotent-replayed", b"true"))
+    await send({"type": "http.response.start", "status": record.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": record.body or b""})
@@ -1,10 +1,15 @@
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
 import logging
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.profiling import ProfilingMiddleware, install_sql_capture
 
 logger = logging.getLogger("uvicorn.error")
 
 def add_middleware(app: FastAPI):
+    # Added first so CORS wraps it and replayed responses still get CORS headers.
+    app.add_middleware(IdempotencyMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],  # Adjust this in production
@@ -20,6 +25,10 @@ def add_middleware(app: FastAPI):
         logger.info(f"Response: {response.status_code}")
         return response
 
+    # Outermost, so profiles include the time spent in the middleware above.
+    app.add_middleware(ProfilingMiddleware)
+    install_sql_capture()
+
     @app.exception_handler(Exception)
     async def exception_handler(request, exc):
         logger.error(f"Unhandled error: {exc}")
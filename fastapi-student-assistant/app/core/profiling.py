@@ -0,0 +1,259 @@
+import asyncio
+import contextvars
+import functools
+import hmac
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+PROFILE_HEADER = b"x-profile"
+MAX_SQL_PER_REQUEST = 200
+
+# The trace of the request a piece of code is running for. Worker threads inherit it
+# through the copied context; traced() then registers the thread so the sampler can
+# attribute its stacks to the request.
+current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+
+
+class Trace:
+    # One profiled window: a request (forced by header or captured because it was slow) or a global run.
+    _ids = itertools.count(1)
+
+    def __init__(self, kind: str, method: str = None, path: str = None, forced: bool = False, until: float = None):
+        self.id = next(self._ids)
+        self.kind = kind
+        self.method = method
+        self.path = path
+        self.forced = forced
+        self.until = until
+        self.started_at = datetime.utcnow()
+        self.started = time.monotonic()
+        self.duration_ms: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.stacks: Counter = Counter()
+        self.sql: List[dict] = []
+
+    def sampling(self, now: float) -> bool:
+        # Unforced requests are only sampled once they have run past the slow threshold.
+        return self.forced or (now - self.started) * 1000 >= settings.PROFILER_SLOW_REQUEST_MS
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "status_code": self.status_code,
+            "samples": sum(self.stacks.copy().values()),
+            "sql_statements": len(self.sql),
+        }
+
+    def collapsed(self) -> str:
+        # Brendan Gregg's collapsed format, as read by flamegraph.pl and speedscope.
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.copy().most_common())
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def traced(fn):
+    # Wraps work handed to another thread (in the request's copied context): while it runs,
+    # the thread is registered under the request's trace, which the sampler cannot otherwise see.
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        trace = current_trace.get()
+        if trace is None:
+            return fn(*args, **kwargs)
+        thread_id = threading.get_ident()
+        previous = profiler.threads.get(thread_id)
+        profiler.threads[thread_id] = trace
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if previous is None:
+                profiler.threads.pop(thread_id, None)
+            else:
+                profiler.threads[thread_id] = previous
+
+    wrapper.traced = True
+    return wrapper
+
+def trace_sync_endpoints(app):
+    # FastAPI runs sync endpoints in its thread pool; call once all routes are added.
+    for route in app.routes:
+        dependant = getattr(route, "dependant", None)
+        if dependant is None or asyncio.iscoroutinefunction(dependant.call) or getattr(dependant.call, "traced", False):
+            continue
+        dependant.call = traced(dependant.call)
+
+
+class Profiler:
+    def __init__(self):
+        self.profiles: Deque[Trace] = deque(maxlen=settings.PROFILER_BUFFER_SIZE)
+        self.active: Dict[int, Trace] = {}
+        self.threads: Dict[int, Trace] = {}  # thread id -> trace of the traced() work it is running
+        self.global_trace: Optional[Trace] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()  # set when there is something to sample
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return bool(settings.PROFILER_TOKEN) and token is not None and hmac.compare_digest(token, settings.PROFILER_TOKEN)
+
+    def start_global(self, seconds: float) -> Trace:
+        trace = Trace("global", until=time.monotonic() + seconds, forced=True)
+        with self._lock:
+            if self.global_trace is not None:
+                self._finish(self.global_trace)
+            self.global_trace = trace
+        self._wake.set()
+        self._ensure_started()
+        return trace
+
+    def begin(self, trace: Trace):
+        with self._lock:
+            self.active[trace.id] = trace
+        self._wake.set()
+        self._ensure_started()
+
+    def end(self, trace: Trace, status_code: Optional[int]):
+        trace.duration_ms = round((time.monotonic() - trace.started) * 1000, 2)
+        trace.status_code = status_code
+        with self._lock:
+            self.active.pop(trace.id, None)
+        if trace.forced or trace.duration_ms >= settings.PROFILER_SLOW_REQUEST_MS:
+            if not trace.forced:
+                trace.kind = "slow"
+            self.profiles.append(trace)
+
+    def get(self, profile_id: int) -> Optional[Trace]:
+        if self.global_trace is not None and self.global_trace.id == profile_id:
+            return self.global_trace
+        return next((trace for trace in self.profiles if trace.id == profile_id), None)
+
+    def _finish(self, trace: Trace):
+        trace.duration_ms = round((time.monotonic() - trace.started) * 1000, 2)
+        self.profiles.append(trace)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        interval = settings.PROFILER_INTERVAL_MS / 1000
+        while True:
+            with self._lock:
+                # Cleared under the lock, so a trace begun after this check sets it again.
+                idle = self.global_trace is None and not self.active
+                if idle:
+                    self._wake.clear()
+            if idle:
+                self._wake.wait()
+                continue
+            time.sleep(interval)
+            now = time.monotonic()
+            with self._lock:
+                global_trace = self.global_trace
+                if global_trace is not None and now >= global_trace.until:
+                    self._finish(global_trace)
+                    self.global_trace = global_trace = None
+                sampled = {trace.id for trace in self.active.values() if trace.sampling(now)}
+            if global_trace is None and not sampled:
+                continue
+            self._sample(global_trace, sampled)
+
+    def _sample(self, global_trace: Optional[Trace], sampled: set):
+        me = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            frames.reverse()
+            stack = ";".join(_frame_label(f) for f in frames)
+            if global_trace is not None:
+                global_trace.stacks[stack] += 1
+            if sampled:
+                trace = self._trace_of(thread_id)
+                if trace is not None and trace.id in sampled:
+                    trace.stacks[stack] += 1
+
+    def _trace_of(self, thread_id: int) -> Optional[Trace]:
+        if thread_id == self.loop_thread and self.loop is not None:
+            # The event loop thread runs one request's task at a time.
+            task = asyncio.current_task(self.loop)
+            return task.get_context().get(current_trace) if task is not None else None
+        return self.threads.get(thread_id)
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    # Outermost middleware: every request gets a Trace for SQL capture and slow-request sampling.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILER_ENABLED:
+            return await self.app(scope, receive, send)
+        profiler.loop = asyncio.get_running_loop()
+        profiler.loop_thread = threading.get_ident()
+        token = dict(scope["headers"]).get(PROFILE_HEADER)
+        forced = token is not None and profiler.authorized(token.decode("latin-1"))
+        trace = Trace("request", scope["method"], scope["path"], forced=forced)
+        status_code = None
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if forced:
+                    message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", str(trace.id).encode())]}
+            await send(message)
+
+        reset = current_trace.set(trace)
+        profiler.begin(trace)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.end(trace, status_code)
+            current_trace.reset(reset)
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_trace.get() is not None:
+        conn.info.setdefault("profiler_started", []).append(time.perf_counter())
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    trace = current_trace.get()
+    if trace is None or not conn.info.get("profiler_started"):
+        return
+    elapsed = time.perf_counter() - conn.info["profiler_started"].pop()
+    if len(trace.sql) < MAX_SQL_PER_REQUEST:
+        trace.sql.append({"statement": statement[:1000], "duration_ms": round(elapsed * 1000, 3)})
+
+def install_sql_capture():
+    # Records every statement (truncated) with its duration on the running request's trace.
+    if not event.contains(Engine, "before_cursor_execute", _start_timer):
+        event.listen(Engine, "before_cursor_execute", _start_timer)
+        event.listen(Engine, "after_cursor_execute", _record_statement)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Set by the multi-worker launcher (app.serve) to send invalidations to the other workers.
+_publisher: Optional[Callable[[str, str], None]] = None
+
+caches: Dict[str, "SharedCache"] = {}
+
+
+class SharedCache:
+    # Read-mostly values (JSON-serializable) cached at two levels: decoded in this process, and
+    # encoded in a file under SHARED_CACHE_DIR (memory-backed, /dev/shm) that every worker maps,
+    # so one worker's load serves the others. Without SHARED_CACHE_DIR only the first level is used.
+    def __init__(self, name: str, ttl: float = None):
+        self.name = name
+        self.ttl = ttl if ttl is not None else settings.SHARED_CACHE_TTL_SECONDS
+        self._local: Dict[str, Tuple[float, Any]] = {}
+        # Bumped by every invalidation, so a load that started before one never stores its result.
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        caches[name] = self
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        now = time.time()
+        entry = self._local.get(key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return entry[1]
+        path = self._path(key)
+        if path is not None:
+            shared = _read_mapped(path)
+            if shared is not None and shared[0] + self.ttl > now:
+                self.shared_hits += 1
+                with self._lock:
+                    self._local[key] = (shared[0] + self.ttl, shared[1])
+                return shared[1]
+        self.misses += 1
+        generation = self._generation(key, path)
+        value = loader()
+        with self._lock:
+            # Invalidated while loading: this caller gets the value, but it is not cached.
+            if self._generation(key, path) != generation:
+                return value
+            if path is not None:
+                _write_atomic(path, json.dumps(value, default=str).encode("utf-8"))
+            self._local[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self, key: str):
+        # Drops the shared copy for everyone and tells the other workers to drop their decoded copies.
+        self.drop_local(key)
+        path = self._path(key)
+        if path is not None:
+            # Loads in flight in other workers see the shared generation change before they write.
+            _write_atomic(_generation_path(path), uuid.uuid4().hex.encode("ascii"))
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        if _publisher is not None:
+            _publisher(self.name, key)
+
+    def drop_local(self, key: str):
+        with self._lock:
+            self._local.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+            self._epoch += 1
+
+    def _generation(self, key: str, path: Optional[Path]) -> tuple:
+        shared = None
+        if path is not None:
+            try:
+                shared = _generation_path(path).read_bytes()
+            except FileNotFoundError:
+                pass
+        return self._epoch, self._generations.get(key, 0), shared
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "shared_hits": self.shared_hits, "misses": self.misses, "entries": len(self._local)}
+
+    def _path(self, key: str) -> Optional[Path]:
+        return shared_path(self.name, key)
+
+
+def shared_path(name: str, key: str) -> Optional[Path]:
+    # The file backing key in the name namespace under SHARED_CACHE_DIR, or None when there is no shared dir.
+    if not settings.SHARED_CACHE_DIR:
+        return None
+    directory = Path(settings.SHARED_CACHE_DIR) / name
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _generation_path(path: Path) -> Path:
+    return path.with_suffix(".gen")
+
+def _read_mapped(path: Path) -> Optional[Tuple[float, Any]]:
+    # Returns (written_at, value). The file is replaced, never modified, so a mapping is always consistent.
+    try:
+        with open(path, "rb") as f:
+            written_at = os.fstat(f.fileno()).st_mtime
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return written_at, json.loads(mapped[:])
+    except (FileNotFoundError, ValueError):
+        # ValueError: an empty file cannot be mapped.
+        return None
+
+def _write_atomic(path: Path, data: bytes):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def set_publisher(publisher: Optional[Callable[[str, str], None]]):
+    global _publisher
+    _publisher = publisher
+
+def apply_invalidation(name: str, key: str):
+    # Called for invalidations published by another worker.
+    cache = caches.get(name)
+    if cache is not None:
+        cache.drop_local(key)
+
+def stats() -> Dict[str, dict]:
+    return {name: cache.stats() for name, cache in caches.items()}
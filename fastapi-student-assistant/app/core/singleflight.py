@@ -0,0 +1,116 @@
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+class _Call:
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    # Concurrent calls with the same key share one execution; the leader runs it and every
+    # waiter gets the same result (or exception). Waiters give up on a flight after `timeout`
+    # and run the call themselves, so one stuck query cannot hold everyone behind it.
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None and call.deadline <= now:
+                # The flight overran its timeout; let new arrivals start a fresh one.
+                del self._calls[key]
+                call = None
+            if call is None:
+                call = self._calls[key] = _Call(now + self.timeout)
+                leader = True
+            else:
+                leader = False
+
+        if leader:
+            return self._lead(key, call, fn)
+        if not call.done.wait(max(0.0, call.deadline - now)):
+            with self._lock:
+                self.timeouts += 1
+                self.executions += 1
+            return fn()
+        with self._lock:
+            self.shared += 1
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _lead(self, key: Hashable, call: _Call, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.executions += 1
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "shared": self.shared,
+                "timeouts": self.timeouts,
+                "in_flight": len(self._calls),
+                "coalescing_ratio": round(self.shared / self.calls, 4) if self.calls else 0.0,
+            }
+
+
+groups: Dict[str, SingleFlight] = {}
+
+def _bind_key(service) -> Optional[str]:
+    # The database a service's session reads from; calls against different databases (replicas
+    # that lag differently, or shards) must not share a result.
+    db = getattr(service, "db", None)
+    try:
+        return str(db.get_bind().url)
+    except Exception:
+        return None
+
+def single_flight(timeout: float = None, key: Callable[..., Hashable] = None):
+    # For sync service methods: the key is built from the call's arguments and the session's
+    # bind, not from `self`, so requests with their own sessions on the same database still share
+    # one query. Results must be safe to share between requests (plain values or pydantic
+    # models, not session-bound ORM objects).
+    def decorator(fn):
+        group = groups[fn.__qualname__] = SingleFlight(
+            fn.__qualname__, timeout if timeout is not None else settings.SINGLEFLIGHT_TIMEOUT
+        )
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            call_key = (_bind_key(self), key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items()))))
+            return group.do(call_key, lambda: fn(self, *args, **kwargs))
+
+        wrapper.single_flight = group
+        return wrapper
+    return decorator
+
+def stats() -> Dict[str, dict]:
+    return {name: group.stats() for name, group in groups.items()}
@@ -1,10 +1,6 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+# Kept for older imports; the engine, sessions and SQLite tuning live in app.db.session.
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import engine, SessionLocal
 
-DATABASE_URL = "sqlite:///./app.db"
-
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base = declarative_base()
\ No newline at end of file
+DATABASE_URL = settings.DATABASE_URL
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""Move users' rows between shards while the app keeps serving everyone else.
+
+    python -m app.db.rebalance pin-all       # before adding a shard URL: pin users where their rows are
+    python -m app.db.rebalance plan          # pinned users the ring now places on another shard
+    python -m app.db.rebalance move --user-id 42 [--to 2]
+    python -m app.db.rebalance apply         # move every user listed by plan
+
+A move marks the user "moving" (their writes get 503 + Retry-After), waits for every
+process's pin cache to expire, copies the rows into the target in one transaction,
+repoints the pin and then deletes the source rows. Row ids are reassigned by the
+target shard (archived rows take theirs from the hot table's sequence there), so the
+user's note vectors are rebuilt afterwards.
+"""
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, distinct, select, union
+from sqlalchemy.orm import Session
+from app.db.sharding import ShardRouter
+from app.models.archive import ArchivedCalendarEvent, ArchivedReminder
+from app.models.calendar import CalendarEvent
+from app.models.career import Career
+from app.models.note import Note
+from app.models.reminder import Reminder
+from app.models.roadmap import Roadmap
+from app.services.archive import assign_archived_ids
+from app.services.career_stats import CareerStatsService
+
+# Every table whose rows belong to one user and therefore live on that user's shard.
+USER_TABLES = [
+    Note.__table__, Reminder.__table__, CalendarEvent.__table__, Career.__table__, Roadmap.__table__,
+    ArchivedReminder.__table__, ArchivedCalendarEvent.__table__,
+]
+
+def users_on_shard(router: ShardRouter, index: int) -> List[int]:
+    query = union(*(select(distinct(table.c.user_id)).where(table.c.user_id.isnot(None)) for table in USER_TABLES))
+    with router.shards[index].engine.connect() as connection:
+        return sorted(row[0] for row in connection.execute(query))
+
+def pin_all(router: ShardRouter) -> int:
+    # Run with the new DATABASE_SHARD_URLS before deploying them, so nobody's rows "disappear".
+    pinned = router.pins()
+    count = 0
+    for shard in router.shards:
+        for user_id in users_on_shard(router, shard.index):
+            if user_id not in pinned:
+                router.pin(user_id, shard.index)
+                count += 1
+    return count
+
+def plan(router: ShardRouter) -> List[Tuple[int, int, int]]:
+    return [
+        (user_id, shard, router.ring.node_for(user_id))
+        for user_id, shard in sorted(router.pins().items())
+        if router.ring.node_for(user_id) != shard
+    ]
+
+def move_user(
+    router: ShardRouter, user_id: int, target: Optional[int] = None, batch_size: int = 500, settle_seconds: float = None
+) -> Dict[str, int]:
+    source = router.shard_index(user_id)
+    target = router.ring.node_for(user_id) if target is None else target
+    if source == target:
+        return {}
+    router.pin(user_id, source, state="moving")
+    time.sleep(router.pin_cache_seconds + 0.5 if settle_seconds is None else settle_seconds)
+
+    moved: Dict[str, int] = {}
+    goals = set()
+    try:
+        with router.shards[source].engine.connect() as src, router.shards[target].engine.begin() as dst:
+            for table in USER_TABLES:
+                columns = [column for column in table.c if not column.primary_key]
+                rows = src.execution_options(stream_results=True).execute(
+                    select(*columns).where(table.c.user_id == user_id).order_by(*table.primary_key.columns)
+                ).mappings()
+                moved[table.name] = 0
+                while True:
+                    batch = rows.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    batch = [dict(row) for row in batch]
+                    assign_archived_ids(dst, table, batch)
+                    dst.execute(table.insert(), batch)
+                    moved[table.name] += len(batch)
+                    if table is Career.__table__:
+                        goals.update(row["goal"] for row in batch if row["goal"] is not None)
+            # Running totals are per shard; the moved goals are recounted on both sides.
+            CareerStatsService(dst).rebuild(user_ids=[user_id], goals=goals)
+    except Exception:
+        _assign(router, user_id, source)
+        raise
+
+    # The target is authoritative from here on.
+    _assign(router, user_id, target)
+    with router.shards[source].engine.begin() as connection:
+        for table in USER_TABLES:
+            connection.execute(delete(table).where(table.c.user_id == user_id))
+        CareerStatsService(connection).rebuild(user_ids=[user_id], goals=goals)
+    _reindex_notes(router.shards[target].session_factory(), user_id)
+    return moved
+
+def _assign(router: ShardRouter, user_id: int, shard: int):
+    # A pin is only needed when the shard differs from the ring's choice.
+    if router.ring.node_for(user_id) == shard:
+        router.unpin(user_id)
+    else:
+        router.pin(user_id, shard)
+
+def _reindex_notes(db: Session, user_id: int):
+    from app.services.note_search import NoteSearchService
+
+    try:
+        NoteSearchService(db).reindex_user(user_id)
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    from app.db.session import shard_router
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("pin-all")
+    commands.add_parser("plan")
+    move = commands.add_parser("move")
+    move.add_argument("--user-id", type=int, required=True)
+    move.add_argument("--to", type=int, default=None, help="target shard index (default: the ring's choice)")
+    commands.add_parser("apply")
+    args = parser.parse_args(argv)
+
+    if shard_router is None:
+        print("Sharding is off: set DATABASE_SHARD_URLS first.", file=sys.stderr)
+        return 1
+    if args.command == "pin-all":
+        print(f"Pinned {pin_all(shard_router)} users")
+    elif args.command == "plan":
+        for user_id, source, target in plan(shard_router):
+            print(f"user {user_id}: shard {source} -> {target}")
+    elif args.command == "move":
+        print(f"user {args.user_id}: {move_user(shard_router, args.user_id, args.to)}")
+    else:
+        for user_id, source, target in plan(shard_router):
+            print(f"user {user_id}: shard {source} -> {target} {move_user(shard_router, user_id, target)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
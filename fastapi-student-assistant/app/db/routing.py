@@ -0,0 +1,128 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.shared_cache import shared_path
+from app.db.sqlite import apply_sqlite_profile, is_sqlite
+
+logger = logging.getLogger("uvicorn.error")
+
+STICKY_MARKERS = "sticky-writes"  # shared cache namespace of the per-user last-write markers
+
+class Replica:
+    def __init__(self, url: str, engine: Engine):
+        self.url = url
+        self.engine = engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.healthy = True
+        self.checked_at = 0.0
+
+
+class SessionRouter:
+    def __init__(
+        self,
+        primary_factory: Callable[[], Session],
+        replica_urls: List[str],
+        sticky_seconds: float = 5.0,
+        health_check_interval: float = 5.0,
+    ):
+        self.primary_factory = primary_factory
+        self.replicas = [Replica(url, _replica_engine(url)) for url in replica_urls]
+        self.sticky_seconds = sticky_seconds
+        self.health_check_interval = health_check_interval
+        self._cursor = itertools.count()
+        self._recent_writes: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def read_session(self, user_id: Optional[int] = None) -> Session:
+        # A user who just wrote reads from the primary until replicas have had time to catch up.
+        if user_id is not None and self.is_sticky(user_id):
+            return self.primary_factory()
+        replica = self._next_healthy_replica()
+        if replica is None:
+            return self.primary_factory()
+        return replica.session_factory()
+
+    def mark_write(self, user_id: int):
+        # Under the multi-worker launcher the user's next read may hit another worker, so the write
+        # is also recorded as a marker file in the shared cache dir, whose mtime is the write time.
+        path = shared_path(STICKY_MARKERS, str(user_id))
+        if path is not None:
+            path.touch()
+        with self._lock:
+            self._recent_writes[user_id] = time.monotonic() + self.sticky_seconds
+            if len(self._recent_writes) > 10000:
+                now = time.monotonic()
+                self._recent_writes = {uid: until for uid, until in self._recent_writes.items() if until > now}
+
+    def is_sticky(self, user_id: int) -> bool:
+        until = self._recent_writes.get(user_id)
+        if until is not None and until > time.monotonic():
+            return True
+        path = shared_path(STICKY_MARKERS, str(user_id))
+        if path is None:
+            return False
+        try:
+            return os.stat(path).st_mtime + self.sticky_seconds > time.time()
+        except FileNotFoundError:
+            return False
+
+    def _next_healthy_replica(self) -> Optional[Replica]:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._cursor) % len(self.replicas)]
+            if self._is_healthy(replica):
+                return replica
+        return None
+
+    def _is_healthy(self, replica: Replica) -> bool:
+        now = time.monotonic()
+        if now - replica.checked_at < self.health_check_interval:
+            return replica.healthy
+        replica.checked_at = now
+        try:
+            with replica.engine.connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+            if not replica.healthy:
+                logger.info(f"Replica {replica.url} is healthy again")
+            replica.healthy = True
+        except Exception as exc:
+            if replica.healthy:
+                logger.error(f"Replica {replica.url} failed its health check: {exc}")
+            replica.healthy = False
+        return replica.healthy
+
+    def track_writes(self, target=Session):
+        # Remember which users a transaction wrote for, and make them sticky once it commits.
+        # The info key is per router, so routers tracking the same sessions don't consume each other's writes.
+        key = f"written_user_ids:{id(self)}"
+
+        @event.listens_for(target, "after_flush")
+        def collect_written_users(session, flush_context):
+            written = session.info.setdefault(key, set())
+            for obj in itertools.chain(session.new, session.dirty, session.deleted):
+                user_id = getattr(obj, "user_id", None)
+                if user_id is not None:
+                    written.add(user_id)
+
+        @event.listens_for(target, "after_commit")
+        def mark_written_users(session):
+            for user_id in session.info.pop(key, ()):
+                self.mark_write(user_id)
+
+        @event.listens_for(target, "after_rollback")
+        def forget_written_users(session):
+            session.info.pop(key, None)
+
+
+def _replica_engine(url: str) -> Engine:
+    if is_sqlite(url):
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        apply_sqlite_profile(engine, read_only=True)
+        return engine
+    return create_engine(url, pool_pre_ping=True)
@@ -1,13 +1,76 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from app.core.config import DATABASE_URL
+from typing import Any, Callable, List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session, sessionmaker, scoped_session
+from app.core.config import settings
+from app.db.routing import SessionRouter
+from app.db.sharding import Shard, ShardedWriter, ShardRouter, build_shard
+from app.db.sqlite import DirectWriter, SQLiteWriter, create_profiled_engines
+
+engine, read_engine, writer_engine = create_profiled_engines(settings.DATABASE_URL)
+SQLITE_PROFILE = writer_engine is not None
+read_engine = read_engine or engine
 
-engine = create_engine(DATABASE_URL)
 SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# GET traffic goes to replicas (round-robin, health-checked) unless the user wrote recently.
+session_router = SessionRouter(
+    ReadSessionLocal,
+    settings.DATABASE_REPLICA_URLS,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    health_check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL,
+)
+session_router.track_writes()
+
+# Single writer that serializes and group-commits writes from all services on SQLite.
+primary_writer = SQLiteWriter(writer_engine) if SQLITE_PROFILE else DirectWriter(SessionLocal)
+
+# With DATABASE_SHARD_URLS set, DATABASE_URL becomes shard 0 and user data is spread over all shards.
+shard_router = ShardRouter(
+    [Shard(0, settings.DATABASE_URL, engine, SessionLocal, ReadSessionLocal, primary_writer)]
+    + [build_shard(index, url) for index, url in enumerate(settings.DATABASE_SHARD_URLS, start=1)],
+    virtual_nodes=settings.SHARD_VIRTUAL_NODES,
+    pin_cache_seconds=settings.SHARD_PIN_CACHE_SECONDS,
+) if settings.DATABASE_SHARD_URLS else None
+
+writer = ShardedWriter(shard_router) if shard_router else primary_writer
+
+def request_user_id(request: Request) -> Optional[int]:
+    user_id = request.path_params.get("user_id") or request.query_params.get("user_id")
+    return int(user_id) if user_id and str(user_id).isdigit() else None
 
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    if shard_router is None:
+        db = SessionLocal()
+    else:
+        user_id = request_user_id(request)
+        if request.method != "GET":
+            shard_router.check_writable(user_id)
+        db = shard_router.session(user_id)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def open_read_session(user_id: Optional[int]):
+    if shard_router is None:
+        return session_router.read_session(user_id)
+    return shard_router.read_session(user_id)
+
+def get_read_db(request: Request):
+    db = open_read_session(request_user_id(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_writer():
+    return writer
+
+def get_fan_out(db: Session = Depends(get_read_db)) -> Callable[[Callable[..., List[Any]]], List[Any]]:
+    # fan_out(fn) runs fn(db) against every shard and concatenates the results. Unsharded, it runs
+    # on the request's read session, so overriding get_read_db also redirects it.
+    if shard_router is not None:
+        return shard_router.fan_out
+    return lambda fn: list(fn(db))
\ No newline at end of file
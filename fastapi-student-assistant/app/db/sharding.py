@@ -0,0 +1,150 @@
+import bisect
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.db.sqlite import DirectWriter, SQLiteWriter, create_profiled_engines
+from app.models.shard import ShardAssignment
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    # Shards are identified by their position in the settings list, so appending a shard
+    # only claims the ring segments of its own virtual nodes (~1/N of users move).
+    def __init__(self, nodes: int, virtual_nodes: int = 64):
+        points = sorted((_hash(f"shard-{node}#{v}"), node) for node in range(nodes) for v in range(virtual_nodes))
+        self._points = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, user_id: int) -> int:
+        position = bisect.bisect(self._points, _hash(f"user-{user_id}")) % len(self._points)
+        return self._nodes[position]
+
+
+class Shard:
+    def __init__(self, index: int, url: str, engine: Engine, session_factory, read_factory, writer):
+        self.index = index
+        self.url = url
+        self.engine = engine
+        self.session_factory = session_factory
+        self.read_factory = read_factory
+        self.writer = writer
+
+
+def build_shard(index: int, url: str) -> Shard:
+    engine, read_engine, writer_engine = create_profiled_engines(url)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    read_factory = sessionmaker(autocommit=False, autoflush=False, bind=read_engine or engine)
+    writer = SQLiteWriter(writer_engine) if writer_engine is not None else DirectWriter(session_factory)
+    return Shard(index, url, engine, session_factory, read_factory, writer)
+
+
+class ShardRouter:
+    # Shard 0 is also the directory: users, tips and the shard_assignments pins live there.
+    def __init__(self, shards: List[Shard], virtual_nodes: int = 64, pin_cache_seconds: float = 1.0):
+        self.shards = shards
+        self.ring = HashRing(len(shards), virtual_nodes)
+        self.pin_cache_seconds = pin_cache_seconds
+        self._pins: Dict[int, Tuple[Optional[int], str, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Shard:
+        return self.shards[0]
+
+    def shard_index(self, user_id: int) -> int:
+        # A pin (left by pin-all or a move) wins over the ring.
+        shard, _ = self._pin(user_id)
+        return shard if shard is not None else self.ring.node_for(user_id)
+
+    def shard_for(self, user_id: Optional[int]) -> Shard:
+        if user_id is None:
+            return self.directory
+        return self.shards[self.shard_index(user_id)]
+
+    def is_moving(self, user_id: Optional[int]) -> bool:
+        return user_id is not None and self._pin(user_id)[1] == "moving"
+
+    def check_writable(self, user_id: Optional[int]):
+        if self.is_moving(user_id):
+            raise HTTPException(
+                status_code=503, detail="User data is being moved, retry shortly", headers={"Retry-After": "2"}
+            )
+
+    def session(self, user_id: Optional[int]) -> Session:
+        return self.shard_for(user_id).session_factory()
+
+    def read_session(self, user_id: Optional[int]) -> Session:
+        return self.shard_for(user_id).read_factory()
+
+    def writer_for(self, user_id: Optional[int]):
+        self.check_writable(user_id)
+        return self.shard_for(user_id).writer
+
+    def fan_out(self, fn: Callable[[Session], List[Any]]) -> List[Any]:
+        # Admin queries without a user filter run on every shard in parallel; results are concatenated in shard order.
+        def run(shard: Shard) -> List[Any]:
+            db = shard.read_factory()
+            try:
+                return list(fn(db))
+            finally:
+                db.close()
+
+        with ThreadPoolExecutor(max_workers=len(self.shards)) as pool:
+            return [row for part in pool.map(run, self.shards) for row in part]
+
+    def _pin(self, user_id: int) -> Tuple[Optional[int], str]:
+        # Pins are cached briefly so every process notices a move within pin_cache_seconds.
+        now = time.monotonic()
+        cached = self._pins.get(user_id)
+        if cached is not None and cached[2] > now:
+            return cached[0], cached[1]
+        with self.directory.engine.connect() as connection:
+            row = connection.execute(
+                select(ShardAssignment.shard, ShardAssignment.state).where(ShardAssignment.user_id == user_id)
+            ).first()
+        shard, state = (row.shard, row.state) if row else (None, "active")
+        with self._lock:
+            if len(self._pins) > 100000:
+                self._pins.clear()
+            self._pins[user_id] = (shard, state, now + self.pin_cache_seconds)
+        return shard, state
+
+    def pin(self, user_id: int, shard: int, state: str = "active"):
+        with self.directory.engine.begin() as connection:
+            connection.execute(delete(ShardAssignment).where(ShardAssignment.user_id == user_id))
+            connection.execute(ShardAssignment.__table__.insert().values(user_id=user_id, shard=shard, state=state))
+        self._pins.pop(user_id, None)
+
+    def unpin(self, user_id: int):
+        with self.directory.engine.begin() as connection:
+            connection.execute(delete(ShardAssignment).where(ShardAssignment.user_id == user_id))
+        self._pins.pop(user_id, None)
+
+    def pins(self) -> Dict[int, int]:
+        with self.directory.engine.connect() as connection:
+            return dict(connection.execute(select(ShardAssignment.user_id, ShardAssignment.shard)).all())
+
+
+class ShardedWriter:
+    # Stands in for the single writer: endpoints call writer.for_user(user_id).run(...).
+    def __init__(self, router: ShardRouter):
+        self.router = router
+
+    def for_user(self, user_id: Optional[int]):
+        return self.router.writer_for(user_id)
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return self.router.directory.writer.run(fn, *args, **kwargs)
+
+    def stop(self):
+        for shard in self.router.shards:
+            shard.writer.stop()
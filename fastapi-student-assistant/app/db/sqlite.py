@@ -0,0 +1,214 @@
+import contextvars
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from app.core.config import settings
+from app.core.profiling import traced
+
+logger = logging.getLogger("uvicorn.error")
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+def apply_sqlite_profile(engine: Engine, read_only: bool = False, immediate: bool = False):
+    # Pragmas are per connection, so they are applied every time the pool opens one.
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        if immediate:
+            # Let SQLAlchemy emit BEGIN itself (see the "begin" hook below) instead of pysqlite.
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        if not read_only and settings.SQLITE_WAL:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    if immediate:
+        # Take the write lock when the transaction starts rather than on its first write,
+        # so a batch never has to upgrade a read lock and hit SQLITE_BUSY halfway through.
+        @event.listens_for(engine, "begin")
+        def begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def create_profiled_engines(url: str) -> Tuple[Engine, Engine, Optional[Engine]]:
+    # Returns (engine, read_engine, writer_engine); writer_engine is None outside the SQLite profile.
+    if not (settings.SQLITE_PROFILE and is_sqlite(url) and not is_memory_sqlite(url)):
+        return create_engine(url), None, None
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    apply_sqlite_profile(engine)
+    # Reads get their own query_only pool so they never queue behind the writer.
+    read_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+    )
+    apply_sqlite_profile(read_engine, read_only=True)
+    writer_engine = create_engine(
+        url, connect_args={"check_same_thread": False}, poolclass=QueuePool, pool_size=1, max_overflow=0
+    )
+    apply_sqlite_profile(writer_engine, immediate=True)
+    return engine, read_engine, writer_engine
+
+
+class GroupCommitSession(Session):
+    # Inside a writer batch, a service's commit() only flushes; the writer commits the batch once.
+    def commit(self):
+        if self.info.get("group_commit"):
+            self.flush()
+        else:
+            super().commit()
+
+
+class DirectWriter:
+    # Used for non-SQLite databases, which handle concurrent writers themselves.
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        db = self.session_factory()
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    def for_user(self, user_id: Optional[int]) -> "DirectWriter":
+        return self
+
+    def stop(self):
+        pass
+
+
+class SQLiteWriter:
+    def __init__(self, engine: Engine, max_batch: int = None, window: float = None):
+        self.engine = engine
+        self.max_batch = max_batch or settings.SQLITE_WRITER_BATCH_SIZE
+        self.window = window if window is not None else settings.SQLITE_GROUP_COMMIT_WINDOW_MS / 1000
+        self._session_factory = sessionmaker(
+            bind=engine, class_=GroupCommitSession, autocommit=False, autoflush=False, expire_on_commit=False
+        )
+        self._queue: "queue.Queue[Optional[Tuple[Callable, tuple, dict, Future, contextvars.Context]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        # fn(db, *args, **kwargs) runs on the writer thread; the caller blocks until its batch commits.
+        return self.submit(fn, *args, **kwargs).result()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        # Jobs run in the submitter's context, so request-scoped state (e.g. the profiler trace) follows them;
+        # traced() registers the writer thread with that trace while the job runs.
+        self._queue.put((fn, args, kwargs, future, contextvars.copy_context()))
+        return future
+
+    def for_user(self, user_id: Optional[int]) -> "SQLiteWriter":
+        return self
+
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="sqlite-writer", daemon=True)
+                    self._thread.start()
+
+    def _next_batch(self) -> Tuple[List[Tuple[Callable, tuple, dict, Future, contextvars.Context]], bool]:
+        job = self._queue.get()
+        if job is None:
+            return [], True
+        batch = [job]
+        stopping = False
+        while len(batch) < self.max_batch:
+            try:
+                job = self._queue.get(timeout=self.window) if self.window else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                stopping = True
+                break
+            batch.append(job)
+        return batch, stopping
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        groups = [[job for job in batch if job[3].set_running_or_notify_cancel()]]
+        while groups:
+            group = groups.pop(0)
+            if group:
+                groups[:0] = self._run_group(group)
+
+    def _run_group(self, jobs) -> list:
+        # Runs the jobs in one transaction, each in its own savepoint, and resolves their futures.
+        # If the transaction itself breaks, the job that broke it fails and the jobs it took down
+        # are returned as a group to run again; after a failed commit each one is rerun on its own.
+        db = self._session_factory()
+        db.info["group_commit"] = True
+        done, current = [], None
+        try:
+            for index, job in enumerate(jobs):
+                current = job
+                fn, args, kwargs, future, context = job
+                savepoint = db.begin_nested()
+                try:
+                    result = context.run(traced(fn), db, *args, **kwargs)
+                except BaseException as exc:
+                    future.set_exception(exc)
+                    # A failed flush leaves the savepoint inactive, but it still has to be rolled back.
+                    savepoint.rollback()
+                    continue
+                if savepoint.is_active:
+                    savepoint.commit()
+                done.append((job, result))
+            current = None
+            db.info["group_commit"] = False
+            db.commit()
+        except Exception as exc:
+            logger.error(f"SQLite group commit of {len(jobs)} writes failed: {exc}")
+            db.rollback()
+            if current is not None:
+                if not current[3].done():
+                    current[3].set_exception(exc)
+                return [[job for job, _ in done] + jobs[index + 1:]]
+            if len(done) == 1:
+                done[0][0][3].set_exception(exc)
+                return []
+            return [[job] for job, _ in done]
+        finally:
+            # Results leave the writer thread as detached objects with their loaded state.
+            db.expunge_all()
+            db.close()
+        for job, result in done:
+            job[3].set_result(result)
+        return []
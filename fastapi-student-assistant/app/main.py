@@ -2,14 +2,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
-from app.api.v1.api import api_router
-from app.core.middleware import setup_middleware
+from app.api.v1.api import router as api_router
+from app.core.middleware import add_middleware
+from app.core.config import settings
+from app.core.profiling import trace_sync_endpoints
+from app.db.session import SessionLocal, primary_writer, shard_router, writer
+from app.services.archive import Archiver
+from app.services.outbox import OutboxWorker
 
 # Initialize FastAPI app
 app = FastAPI(title="AI-Powered Student Assistant")
 
 # Setup middleware
-setup_middleware(app)
+add_middleware(app)
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
@@ -27,14 +32,40 @@ async def readiness_check():
 async def version():
     return {"version": "1.0.0"}
 
+# Lets the profiler attribute thread-pool work to the request it runs for
+trace_sync_endpoints(app)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Events are written in the same transaction as the rows, so every shard drains its own outbox.
+outbox_workers = (
+    [OutboxWorker(shard.session_factory) for shard in shard_router.shards] if shard_router else [OutboxWorker(SessionLocal)]
+)
+archivers = [Archiver(shard.writer) for shard in shard_router.shards] if shard_router else [Archiver(primary_writer)]
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting up the application...")
+    if settings.OUTBOX_ENABLED:
+        for outbox_worker in outbox_workers:
+            await outbox_worker.start()
+    if settings.ARCHIVE_ENABLED:
+        for archiver in archivers:
+            await archiver.start()
+
+async def stop_background_jobs():
+    for outbox_worker in outbox_workers:
+        await outbox_worker.stop()
+    for archiver in archivers:
+        await archiver.stop()
+
+# The multi-worker launcher stops them in a worker that is being replaced (see app.serve)
+app.state.stop_background_jobs = stop_background_jobs
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    logger.info("Shutting down the application...")
\ No newline at end of file
+    logger.info("Shutting down the application...")
+    await stop_background_jobs()
+    writer.stop()
\ No newline at end of file
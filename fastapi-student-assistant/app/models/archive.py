@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
+from datetime import datetime
+from app.db.base import Base
+
+# Cold copies of rows moved out of the hot tables by the archiver. The original id is kept
+# (clients already hold it); the hot tables never reuse ids, so it stays unique across both.
+
+class ArchivedReminder(Base):
+    __tablename__ = 'reminders_archive'
+
+    archive_id = Column(Integer, primary_key=True)
+    id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    title = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    is_recurring = Column(Boolean, default=False)
+    completed = Column(Boolean, nullable=False, default=False)
+    reminder_time = Column(DateTime)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_reminders_archive_user_id_reminder_time", "user_id", "reminder_time"),
+    )
+
+
+class ArchivedCalendarEvent(Base):
+    __tablename__ = 'calendar_events_archive'
+
+    archive_id = Column(Integer, primary_key=True)
+    id = Column(Integer, nullable=False)
+    user_id = Column(Integer)
+    title = Column(String)
+    description = Column(String, nullable=True)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    category = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_calendar_events_archive_user_id_start_time", "user_id", "start_time"),
+    )
\ No newline at end of file
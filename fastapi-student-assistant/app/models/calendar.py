@@ -1,17 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime
-from sqlalchemy.ext.declarative import declarative_base
-
-Base = declarative_base()
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from app.db.base import Base
 
 class CalendarEvent(Base):
     __tablename__ = 'calendar_events'
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)
+    user_id = Column(Integer)
     title = Column(String, index=True)
     description = Column(String, nullable=True)
     start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, nullable=False)
     category = Column(String, nullable=True)  # For color-coded categories
     created_at = Column(DateTime, nullable=False)
-    updated_at = Column(DateTime, nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime, nullable=False)
+
+    # Daily and weekly planners filter on user_id plus a start_time range.
+    __table_args__ = (
+        Index("ix_calendar_events_user_id_start_time", "user_id", "start_time"),
+        Index("ix_calendar_events_end_time", "end_time"),  # archiver
+        # Archived events keep their id, so SQLite must never hand a deleted one out again.
+        {"sqlite_autoincrement": True},
+    )
\ No newline at end of file
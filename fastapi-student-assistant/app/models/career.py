@@ -1,14 +1,46 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, JSON, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
+HISTOGRAM_BUCKETS = 10  # progress 0-9, 10-19, ..., 90-100
+
 class Career(Base):
     __tablename__ = "careers"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     goal = Column(String, index=True)
-    progress = Column(String, default="Not Started")
-    resources = Column(String, default="[]")  # JSON string for resources
+    progress = Column(Float, nullable=False, default=0.0)  # percent, 100 means completed
+    resources = Column(JSON, nullable=False, default=list)
+
+    user = relationship("User", back_populates="careers")
+
+
+class ProgressStats:
+    # Running totals, kept up to date by CareerStatsService on every career write.
+    goals = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    progress_sum = Column(Float, nullable=False, default=0.0)
+    bucket_0 = Column(Integer, nullable=False, default=0)
+    bucket_1 = Column(Integer, nullable=False, default=0)
+    bucket_2 = Column(Integer, nullable=False, default=0)
+    bucket_3 = Column(Integer, nullable=False, default=0)
+    bucket_4 = Column(Integer, nullable=False, default=0)
+    bucket_5 = Column(Integer, nullable=False, default=0)
+    bucket_6 = Column(Integer, nullable=False, default=0)
+    bucket_7 = Column(Integer, nullable=False, default=0)
+    bucket_8 = Column(Integer, nullable=False, default=0)
+    bucket_9 = Column(Integer, nullable=False, default=0)
+
+
+class CareerUserStats(ProgressStats, Base):
+    __tablename__ = "career_user_stats"
+
+    user_id = Column(Integer, primary_key=True)
+
+
+class CareerGoalStats(ProgressStats, Base):
+    # With sharding each shard holds the totals of its own users.
+    __tablename__ = "career_goal_stats"
 
-    user = relationship("User", back_populates="careers")
\ No newline at end of file
+    goal = Column(String, primary_key=True)
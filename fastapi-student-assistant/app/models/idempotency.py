@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, LargeBinary
+from datetime import datetime
+from app.db.base import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)  # sha256 of the caller, method, path and the client's Idempotency-Key
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request it was first used with
+    status = Column(String, nullable=False, default="in_progress")  # in_progress, completed
+    status_code = Column(Integer, nullable=True)
+    headers = Column(Text, nullable=True)  # JSON list of [name, value]
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
\ No newline at end of file
@@ -1,15 +1,24 @@
-from sqlalchemy import Column, Integer, String, Text
-from sqlalchemy.ext.declarative import declarative_base
-
-Base = declarative_base()
+from sqlalchemy import Column, Integer, String, Text, LargeBinary, Index
+from sqlalchemy.orm import deferred
+from app.db.base import Base
 
 class Note(Base):
     __tablename__ = 'notes'
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)
+    user_id = Column(Integer)
     title = Column(String, index=True)
-    content = Column(Text)
-    tags = Column(String, index=True)  # Comma-separated tags for filtering
+    # Bodies are only loaded on the detail view; large ones live compressed in content_blob.
+    # Read them through NoteService.read_content, never directly.
+    content = deferred(Column(Text))
+    content_blob = deferred(Column(LargeBinary, nullable=True))
+    content_codec = Column(String, nullable=True)  # None, "zlib" or "zstd"
+    snippet = Column(String, nullable=True)  # server-computed preview for list views
+    tags = Column(String)  # Comma-separated tags for filtering
     created_at = Column(Integer)  # Timestamp for creation
-    updated_at = Column(Integer)  # Timestamp for last update
\ No newline at end of file
+    updated_at = Column(Integer)  # Timestamp for last update
+
+    # Matches the NoteService list query, with or without a tag filter (tags are matched inside the list).
+    __table_args__ = (
+        Index("ix_notes_user_id_created_at", "user_id", "created_at"),
+    )
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from app.db.base import Base
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic = Column(String, nullable=False)  # e.g. "note.created"
+    aggregate_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, nullable=True)
+    payload = Column(Text, nullable=False, default="{}")  # JSON string
+    idempotency_key = Column(String, nullable=False, unique=True)
+    status = Column(String, nullable=False, default="pending")  # pending, processing, done, failed
+    claim_token = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbox_events_status_available_at", "status", "available_at"),
+    )
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, topic={self.topic}, status={self.status})>"
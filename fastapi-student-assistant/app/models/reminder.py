@@ -1,8 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from datetime import datetime
-
-Base = declarative_base()
+from app.db.base import Base
 
 class Reminder(Base):
     __tablename__ = 'reminders'
@@ -12,6 +10,14 @@ class Reminder(Base):
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
     is_recurring = Column(Boolean, default=False)
+    completed = Column(Boolean, nullable=False, default=False)
     reminder_time = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_reminders_user_id_reminder_time", "user_id", "reminder_time"),
+        Index("ix_reminders_completed_reminder_time", "completed", "reminder_time"),  # archiver
+        # Archived reminders keep their id, so SQLite must never hand a deleted one out again.
+        {"sqlite_autoincrement": True},
+    )
\ No newline at end of file
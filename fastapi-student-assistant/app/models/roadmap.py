@@ -6,7 +6,7 @@ class Roadmap(Base):
     __tablename__ = "roadmaps"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     title = Column(String, index=True)
     description = Column(String)
     milestones = Column(String)  # This could be a JSON string or a separate model
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.db.base import Base
+
+class ShardAssignment(Base):
+    # Lives on the directory shard (shard 0). Pins a user to a shard regardless of the hash ring.
+    __tablename__ = "shard_assignments"
+
+    user_id = Column(Integer, primary_key=True)
+    shard = Column(Integer, nullable=False)
+    state = Column(String, nullable=False, default="active")  # active, moving
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class User(Base):
@@ -10,4 +11,7 @@ class User(Base):
     full_name = Column(String, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
-    is_verified = Column(Boolean, default=False)
\ No newline at end of file
+    is_verified = Column(Boolean, default=False)
+
+    careers = relationship("Career", back_populates="user")
+    roadmaps = relationship("Roadmap", back_populates="user")
\ No newline at end of file
@@ -21,6 +21,10 @@ class CalendarEvent(CalendarEventBase):
     class Config:
         orm_mode = True
 
+class CalendarResponse(CalendarEvent):
+    user_id: int
+    archived: bool = False
+
 class DailyPlannerResponse(BaseModel):
     date: datetime
     events: List[CalendarEvent]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, confloat, validator
 from typing import List, Optional
 
 class CareerGoal(BaseModel):
@@ -16,4 +16,36 @@ class CareerGoalUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     progress: Optional[float] = None
-    resources: Optional[List[str]] = None
\ No newline at end of file
+    resources: Optional[List[str]] = None
+
+class CareerCreate(BaseModel):
+    user_id: int
+    goal: str
+    progress: confloat(ge=0, le=100) = 0.0  # percent
+    resources: List[str] = []
+
+class CareerUpdate(BaseModel):
+    goal: Optional[str] = None
+    progress: Optional[confloat(ge=0, le=100)] = None
+    resources: Optional[List[str]] = None
+
+    @validator("goal", "progress", "resources", pre=True)
+    def not_null(cls, value):
+        # Leave a field out to keep it; progress and resources are NOT NULL columns.
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+class CareerRead(CareerCreate):
+    id: int
+
+    class Config:
+        orm_mode = True
+
+class CareerStats(BaseModel):
+    user_id: Optional[int] = None
+    goal: Optional[str] = None
+    goals: int
+    completed: int
+    average_progress: float
+    histogram: List[int]  # goal counts per 10% of progress, the last bucket includes 100
\ No newline at end of file
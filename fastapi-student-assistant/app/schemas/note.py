@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from typing import Optional
 from datetime import datetime
 
@@ -13,10 +13,39 @@ class NoteCreate(NoteBase):
 class NoteUpdate(NoteBase):
     pass
 
+def split_tags(value):
+    # Note.tags is stored as a comma-separated string
+    if isinstance(value, str):
+        return [tag for tag in value.split(",") if tag]
+    return value
+
 class Note(NoteBase):
     id: int
     created_at: datetime
     updated_at: datetime
 
+    _split_tags = validator("tags", pre=True, allow_reuse=True)(split_tags)
+
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class NoteRead(Note):
+    user_id: int
+
+# List views carry a stored snippet instead of the full body; use /notes/{note_id} for content.
+class NoteSummary(BaseModel):
+    id: int
+    user_id: int
+    title: str
+    tags: Optional[list[str]] = None
+    snippet: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    _split_tags = validator("tags", pre=True, allow_reuse=True)(split_tags)
+
+    class Config:
+        orm_mode = True
+
+class NoteSearchResult(NoteSummary):
+    score: float
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from datetime import datetime
 from typing import Optional, List
 
@@ -11,8 +11,19 @@ class ReminderBase(BaseModel):
 class ReminderCreate(ReminderBase):
     pass
 
-class ReminderUpdate(ReminderBase):
-    completed: Optional[bool] = False
+class ReminderUpdate(BaseModel):
+    # Partial update: only the fields sent are changed.
+    title: Optional[str] = None
+    description: Optional[str] = None
+    due_date: Optional[datetime] = None
+    completed: Optional[bool] = None
+
+    @validator("title", "due_date", "completed", pre=True)
+    def not_null(cls, value):
+        # These columns are NOT NULL: leave a field out to keep it.
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
 
 class Reminder(ReminderBase):
     id: int
@@ -21,5 +32,18 @@ class Reminder(ReminderBase):
     class Config:
         orm_mode = True
 
+class ReminderOut(BaseModel):
+    id: int
+    user_id: int
+    title: str
+    description: Optional[str] = None
+    reminder_time: datetime
+    is_recurring: bool = False
+    completed: bool = False
+    archived: bool = False
+
+    class Config:
+        orm_mode = True
+
 class ReminderList(BaseModel):
     reminders: List[Reminder]
\ No newline at end of file
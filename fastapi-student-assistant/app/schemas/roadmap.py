@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+import json
+from pydantic import BaseModel, validator
 from typing import List, Optional
 
 class Milestone(BaseModel):
@@ -17,6 +18,16 @@ class RoadmapResponse(BaseModel):
     title: str
     milestones: List[Milestone]
 
+    # Roadmap.milestones is stored as a JSON string
+    @validator("milestones", pre=True)
+    def parse_milestones(cls, value):
+        if isinstance(value, str):
+            return json.loads(value or "[]")
+        return value
+
+    class Config:
+        orm_mode = True
+
 class RoadmapUpdate(BaseModel):
     title: Optional[str] = None
     milestones: Optional[List[Milestone]] = None
\ No newline at end of file
@@ -12,4 +12,7 @@ class Tip(TipBase):
     id: int
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class TipResponse(Tip):
+    pass
\ No newline at end of file
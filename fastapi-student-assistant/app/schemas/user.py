@@ -15,4 +15,9 @@ class User(UserBase):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+# Identity carried in an access token, resolved to a User by security.get_current_user
+class UserInDB(BaseModel):
+    username: str
+    hashed_password: Optional[str] = None
\ No newline at end of file
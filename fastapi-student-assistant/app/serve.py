@@ -0,0 +1,362 @@
+"""Production launcher: one master process and a fork of the app per CPU core.
+
+    python -m app.serve [--host 0.0.0.0] [--port 8000] [--workers N]
+
+The master imports the app once and binds the listening socket; workers are forked
+from it, so they share the socket and the preloaded code copy-on-write. Workers send
+cache invalidations to the master over a socketpair and it relays them to the others.
+
+    SIGHUP           replace the workers one at a time (each old worker drains first)
+    SIGTERM, SIGINT  drain and stop every worker, then exit
+
+Only worker 0 runs the background jobs (outbox and archiver). The outbox handlers
+write the vector index files, which are locked per process, not across processes,
+so on a rolling restart the old worker 0 stops its jobs before its replacement starts.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import selectors
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.core import shared_cache
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+MIN_WORKER_LIFETIME = 1.0  # in seconds; a worker dying sooner is restarted after a pause
+
+
+class Worker:
+    def __init__(self, slot: int, pid: int, channel: socket.socket):
+        self.slot = slot
+        self.pid = pid
+        self.channel = channel
+        self.started = time.monotonic()
+        self.ready = False
+        self.background_stopped = False
+        self.stopping = False
+        self.buffer = b""
+
+
+class Master:
+    def __init__(self, app_path: str, host: str, port: int, workers: int, graceful_timeout: float):
+        self.app_path = app_path
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.graceful_timeout = graceful_timeout
+        self.workers: Dict[int, Worker] = {}
+        self.selector = selectors.DefaultSelector()
+        self.signals: List[int] = []
+        self.shutting_down = False
+        self.app = None
+        self.sock: Optional[socket.socket] = None
+        self._own_cache_dir: Optional[str] = None
+
+    def run(self) -> int:
+        if not settings.SHARED_CACHE_DIR:
+            self._own_cache_dir = settings.SHARED_CACHE_DIR = tempfile.mkdtemp(prefix="student-assistant-", dir=_shm_dir())
+        self.app = _load_app(self.app_path)
+        # No pooled connection may be shared between forked processes.
+        _dispose_engines()
+        self.sock = _bind(self.host, self.port)
+        wakeup_r, wakeup_w = socket.socketpair()
+        wakeup_r.setblocking(False)
+        wakeup_w.setblocking(False)
+        signal.set_wakeup_fd(wakeup_w.fileno())
+        self.selector.register(wakeup_r, selectors.EVENT_READ, None)
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(signum, self._on_signal)
+
+        logger.info(f"Master {os.getpid()} listening on {self.host}:{self.port} with {self.worker_count} workers")
+        try:
+            for slot in range(self.worker_count):
+                self._spawn(slot)
+            while not self.shutting_down:
+                self._pump(1.0)
+                self._handle_signals()
+                self._respawn_missing()
+            self._stop_all()
+        finally:
+            signal.set_wakeup_fd(-1)
+            self.sock.close()
+            if self._own_cache_dir:
+                shutil.rmtree(self._own_cache_dir, ignore_errors=True)
+        return 0
+
+    def _on_signal(self, signum, frame):
+        self.signals.append(signum)
+
+    def _handle_signals(self):
+        while self.signals:
+            signum = self.signals.pop(0)
+            if signum == signal.SIGHUP:
+                logger.info("SIGHUP: rolling restart")
+                self._rolling_restart()
+            elif signum in (signal.SIGTERM, signal.SIGINT):
+                self.shutting_down = True
+
+    def _spawn(self, slot: int) -> Worker:
+        master_end, worker_end = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            master_end.close()
+            code = 0
+            try:
+                self._run_worker(slot, worker_end)
+            except BaseException:
+                logger.exception(f"Worker {slot} crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        worker_end.close()
+        master_end.setblocking(False)
+        worker = self.workers[pid] = Worker(slot, pid, master_end)
+        self.selector.register(master_end, selectors.EVENT_READ, worker)
+        logger.info(f"Started worker {slot} (pid {pid})")
+        return worker
+
+    def _run_worker(self, slot: int, channel: socket.socket):
+        import uvicorn
+
+        signal.set_wakeup_fd(-1)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        self.selector.close()
+        for worker in self.workers.values():
+            worker.channel.close()
+        if slot != 0:
+            settings.OUTBOX_ENABLED = False
+            settings.ARCHIVE_ENABLED = False
+
+        send_lock = threading.Lock()
+
+        def send(message: dict):
+            with send_lock:
+                channel.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+        loop: Optional[asyncio.AbstractEventLoop] = None
+
+        async def on_ready():
+            nonlocal loop
+            loop = asyncio.get_running_loop()
+            send({"type": "ready"})
+
+        def stop_background_jobs():
+            # Runs on the listener thread; the jobs are tasks on the server's event loop.
+            stop = getattr(self.app.state, "stop_background_jobs", None)
+            try:
+                if stop is not None and loop is not None:
+                    asyncio.run_coroutine_threadsafe(stop(), loop).result(timeout=self.graceful_timeout)
+            except Exception:
+                logger.exception(f"Worker {slot} could not stop its background jobs")
+            send({"type": "background-stopped"})
+
+        shared_cache.set_publisher(lambda name, key: send({"type": "invalidate", "cache": name, "key": key}))
+        threading.Thread(
+            target=_listen, args=(channel, stop_background_jobs), name="master-channel", daemon=True
+        ).start()
+        self.app.router.on_startup.append(on_ready)
+        uvicorn.Server(uvicorn.Config(self.app, lifespan="on")).run(sockets=[self.sock])
+
+    def _pump(self, timeout: float):
+        # Reads worker messages and relays invalidations; also wakes up on signals.
+        for key, _ in self.selector.select(timeout):
+            worker = key.data
+            if worker is None:
+                try:
+                    key.fileobj.recv(4096)
+                except BlockingIOError:
+                    pass
+                continue
+            try:
+                data = worker.channel.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                data = b""
+            if not data:
+                self.selector.unregister(worker.channel)
+                continue
+            worker.buffer += data
+            *lines, worker.buffer = worker.buffer.split(b"\n")
+            for line in lines:
+                self._handle_message(worker, json.loads(line))
+        self._reap()
+
+    def _handle_message(self, sender: Worker, message: dict):
+        if message["type"] == "ready":
+            sender.ready = True
+        elif message["type"] == "background-stopped":
+            sender.background_stopped = True
+        elif message["type"] == "invalidate":
+            for worker in list(self.workers.values()):
+                if worker is not sender and not worker.stopping:
+                    _send(worker, message)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            try:
+                self.selector.unregister(worker.channel)
+            except (KeyError, ValueError):
+                pass
+            worker.channel.close()
+            if not worker.stopping:
+                logger.error(f"Worker {worker.slot} (pid {pid}) exited unexpectedly with status {status}")
+                if time.monotonic() - worker.started < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)
+
+    def _respawn_missing(self):
+        running = {worker.slot for worker in self.workers.values() if not worker.stopping}
+        for slot in range(self.worker_count):
+            if slot not in running:
+                self._spawn(slot)
+
+    def _rolling_restart(self):
+        # The replacement must be serving before the old worker stops, so capacity never drops by more than one.
+        for old in sorted(self.workers.values(), key=lambda w: w.slot):
+            if old.stopping or self.shutting_down:
+                continue
+            old.stopping = True
+            if old.slot == 0:
+                # The replacement starts its own outbox and archiver, and the two must never overlap.
+                self._stop_background_jobs(old)
+            new = self._spawn(old.slot)
+            deadline = time.monotonic() + self.graceful_timeout
+            while not new.ready and new.pid in self.workers and time.monotonic() < deadline:
+                self._pump(0.1)
+            self._stop([old])
+
+    def _stop_background_jobs(self, worker: Worker):
+        _send(worker, {"type": "stop-background"})
+        deadline = time.monotonic() + self.graceful_timeout
+        while not worker.background_stopped and worker.pid in self.workers and time.monotonic() < deadline:
+            self._pump(0.1)
+        if not worker.background_stopped and worker.pid in self.workers:
+            # Without an answer there is no telling whether the jobs stopped; take the worker down first.
+            logger.warning(f"Worker {worker.slot} (pid {worker.pid}) did not stop its background jobs, stopping it")
+            self._stop([worker])
+
+    def _stop_all(self):
+        for worker in self.workers.values():
+            worker.stopping = True
+        self._stop(list(self.workers.values()))
+
+    def _stop(self, workers: List[Worker]):
+        # uvicorn stops accepting on SIGTERM and finishes in-flight requests; stragglers are killed.
+        for worker in workers:
+            _kill(worker.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while any(worker.pid in self.workers for worker in workers) and time.monotonic() < deadline:
+            self._pump(0.1)
+        for worker in workers:
+            if worker.pid in self.workers:
+                logger.warning(f"Worker {worker.slot} (pid {worker.pid}) did not stop in time, killing it")
+                _kill(worker.pid, signal.SIGKILL)
+        while any(worker.pid in self.workers for worker in workers):
+            self._pump(0.1)
+
+
+def _send(worker: Worker, message: dict):
+    # Master side; the channel is non-blocking only for the selector.
+    try:
+        worker.channel.setblocking(True)
+        worker.channel.sendall(json.dumps(message).encode("utf-8") + b"\n")
+    except OSError:
+        pass
+    finally:
+        worker.channel.setblocking(False)
+
+def _listen(channel: socket.socket, stop_background_jobs: Callable[[], None]):
+    # Worker side: handles messages from the master until the channel closes.
+    buffer = b""
+    while True:
+        try:
+            data = channel.recv(65536)
+        except OSError:
+            return
+        if not data:
+            return
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            message = json.loads(line)
+            if message["type"] == "invalidate":
+                shared_cache.apply_invalidation(message["cache"], message["key"])
+            elif message["type"] == "stop-background":
+                stop_background_jobs()
+
+def _kill(pid: int, signum: int):
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+def _load_app(app_path: str):
+    module_name, _, attr = app_path.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "app")
+
+def _dispose_engines():
+    from app.db import session
+
+    engines = {session.engine, session.read_engine, session.writer_engine}
+    engines.update(replica.engine for replica in session.session_router.replicas)
+    if session.shard_router is not None:
+        engines.update(shard.engine for shard in session.shard_router.shards)
+    for engine in engines:
+        if engine is not None:
+            engine.dispose()
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(settings.SERVE_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+def _shm_dir() -> Optional[str]:
+    return "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+def default_workers() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="app.main:app")
+    parser.add_argument("--host", default=settings.SERVE_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVE_WORKERS or default_workers())
+    parser.add_argument("--graceful-timeout", type=float, default=settings.SERVE_GRACEFUL_TIMEOUT)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    return Master(args.app, args.host, args.port, args.workers, args.graceful_timeout).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
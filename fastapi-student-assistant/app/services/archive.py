@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func, literal, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.archive import ArchivedCalendarEvent, ArchivedReminder
+from app.models.calendar import CalendarEvent
+from app.models.reminder import Reminder
+
+logger = logging.getLogger("uvicorn.error")
+
+# Hot table -> its archive. Archived rows keep an id handed out by the hot table.
+ARCHIVES = {
+    Reminder.__table__: ArchivedReminder.__table__,
+    CalendarEvent.__table__: ArchivedCalendarEvent.__table__,
+}
+
+def reserve_ids(db, hot, count: int) -> List[int]:
+    # Takes count ids from the hot table's sequence in the caller's transaction (Session or Connection).
+    dialect = db.dialect if isinstance(db, Connection) else db.get_bind().dialect
+    if dialect.name != "sqlite":
+        return list(db.execute(
+            select(func.nextval(f"{hot.name}_id_seq")).select_from(func.generate_series(1, count))
+        ).scalars())
+    params = {"name": hot.name, "count": count}
+    if not db.execute(text("UPDATE sqlite_sequence SET seq = seq + :count WHERE name = :name"), params).rowcount:
+        # Nothing was ever inserted into the hot table: start after every id seen so far.
+        last = db.execute(text(
+            f"SELECT max(id) FROM (SELECT max(id) AS id FROM {hot.name} UNION ALL SELECT max(id) FROM {ARCHIVES[hot].name})"
+        )).scalar() or 0
+        db.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {"name": hot.name, "seq": last + count})
+    end = db.execute(text("SELECT seq FROM sqlite_sequence WHERE name = :name"), params).scalar()
+    return list(range(end - count + 1, end + 1))
+
+def assign_archived_ids(db, table, rows: List[dict]):
+    # Archived rows copied in from elsewhere (an import, a shard move) get fresh ids from the
+    # hot table, so they can never share one with a hot row here, now or later.
+    hot = next((hot for hot, archive in ARCHIVES.items() if archive is table), None)
+    if hot is not None and rows:
+        for row, new_id in zip(rows, reserve_ids(db, hot, len(rows))):
+            row["id"] = new_id
+
+
+class ArchiveService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def archive_reminders(self, cutoff: datetime, batch_size: int) -> int:
+        # Only completed reminders whose time has long passed; open ones stay hot however old they are.
+        return self._move(
+            Reminder, ArchivedReminder,
+            and_(Reminder.completed.is_(True), Reminder.reminder_time < cutoff), Reminder.reminder_time, batch_size,
+        )
+
+    def archive_events(self, cutoff: datetime, batch_size: int) -> int:
+        return self._move(
+            CalendarEvent, ArchivedCalendarEvent, CalendarEvent.end_time < cutoff, CalendarEvent.end_time, batch_size
+        )
+
+    def _move(self, hot, cold, condition, order_by, batch_size: int) -> int:
+        ids = [row.id for row in self.db.query(hot.id).filter(condition).order_by(order_by).limit(batch_size)]
+        if not ids:
+            return 0
+        columns = [column.name for column in hot.__table__.c]
+        self.db.execute(
+            cold.__table__.insert().from_select(
+                columns + ["archived_at"],
+                select(*hot.__table__.c, literal(datetime.utcnow(), cold.archived_at.type)).where(hot.id.in_(ids)),
+            )
+        )
+        self.db.query(hot).filter(hot.id.in_(ids)).delete(synchronize_session=False)
+        self.db.commit()
+        return len(ids)
+
+
+class Archiver:
+    # Moves cold rows in small batches through the writer, pausing between batches,
+    # so writes from requests never wait behind one long archival transaction.
+    def __init__(
+        self,
+        writer,
+        batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+        interval: float = settings.ARCHIVE_INTERVAL_SECONDS,
+        retention: timedelta = timedelta(days=settings.ARCHIVE_RETENTION_DAYS),
+        pause: float = settings.ARCHIVE_BATCH_PAUSE_MS / 1000,
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retention = retention
+        self.pause = pause
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping.is_set():
+            try:
+                moved = await loop.run_in_executor(None, self.run_once)
+                if any(moved.values()):
+                    logger.info(f"Archived {moved}")
+            except Exception as exc:
+                logger.error(f"Archiving failed: {exc}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def run_once(self) -> Dict[str, int]:
+        cutoff = datetime.utcnow() - self.retention
+        moved = {"reminders": 0, "calendar_events": 0}
+        for name, method in (("reminders", ArchiveService.archive_reminders), ("calendar_events", ArchiveService.archive_events)):
+            while not (self._stopping and self._stopping.is_set()):
+                count = self.writer.run(lambda db: method(ArchiveService(db), cutoff, self.batch_size))
+                moved[name] += count
+                if count < self.batch_size:
+                    break
+                time.sleep(self.pause)
+        return moved
@@ -1,41 +1,75 @@
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import literal, select, union_all
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from app.models.calendar import Calendar
-from app.schemas.calendar import CalendarCreate, CalendarUpdate
+from app.models.archive import ArchivedCalendarEvent
+from app.models.calendar import CalendarEvent
+from app.schemas.calendar import CalendarEventCreate, CalendarEventUpdate
+from app.services.outbox import OutboxService
 
 class CalendarService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_event(self, event: CalendarCreate):
-        db_event = Calendar(**event.dict())
+    def create_event(self, event: CalendarEventCreate, user_id: int):
+        now = datetime.utcnow()
+        db_event = CalendarEvent(**event.dict(), user_id=user_id, created_at=now, updated_at=now)
         self.db.add(db_event)
+        self.db.flush()
+        OutboxService(self.db).enqueue("calendar_event.created", {"id": db_event.id, "user_id": db_event.user_id},
+                                       aggregate_id=db_event.id, user_id=db_event.user_id)
         self.db.commit()
         self.db.refresh(db_event)
         return db_event
 
+    def _events_between(self, user_id: int, start: datetime, end: datetime, include_archived: bool = False):
+        # Range on start_time keeps the (user_id, start_time) index usable for both filter and order.
+        if not include_archived:
+            return (
+                self.db.query(CalendarEvent)
+                .filter(CalendarEvent.user_id == user_id, CalendarEvent.start_time >= start, CalendarEvent.start_time < end)
+                .order_by(CalendarEvent.start_time)
+                .all()
+            )
+        query = union_all(*(
+            select(
+                model.id, model.user_id, model.title, model.description, model.start_time, model.end_time,
+                model.category, literal(archived).label("archived"),
+            ).where(model.user_id == user_id, model.start_time >= start, model.start_time < end)
+            for model, archived in ((CalendarEvent, False), (ArchivedCalendarEvent, True))
+        ))
+        return self.db.execute(query.order_by("start_time")).all()
+
+    def get_events(self, user_id: int, start: datetime, end: datetime, include_archived: bool = False):
+        return self._events_between(user_id, start, end, include_archived)
+
     def get_daily_events(self, user_id: int):
-        return self.db.query(Calendar).filter(Calendar.user_id == user_id, Calendar.date == date.today()).all()
+        start = datetime.combine(date.today(), time.min)
+        return self._events_between(user_id, start, start + timedelta(days=1))
 
     def get_weekly_events(self, user_id: int):
         start_date = date.today() - timedelta(days=date.today().weekday())
-        end_date = start_date + timedelta(days=7)
-        return self.db.query(Calendar).filter(Calendar.user_id == user_id, Calendar.date >= start_date, Calendar.date < end_date).all()
+        start = datetime.combine(start_date, time.min)
+        return self._events_between(user_id, start, start + timedelta(days=7))
 
-    def update_event(self, event_id: int, event_update: CalendarUpdate):
-        db_event = self.db.query(Calendar).filter(Calendar.id == event_id).first()
+    def update_event(self, event_id: int, event_update: CalendarEventUpdate):
+        db_event = self.db.query(CalendarEvent).filter(CalendarEvent.id == event_id).first()
         if not db_event:
             raise HTTPException(status_code=404, detail="Event not found")
         for key, value in event_update.dict(exclude_unset=True).items():
             setattr(db_event, key, value)
+        OutboxService(self.db).enqueue("calendar_event.updated", {"id": db_event.id, "user_id": db_event.user_id},
+                                       aggregate_id=db_event.id, user_id=db_event.user_id)
         self.db.commit()
         self.db.refresh(db_event)
         return db_event
 
     def delete_event(self, event_id: int):
-        db_event = self.db.query(Calendar).filter(Calendar.id == event_id).first()
+        db_event = self.db.query(CalendarEvent).filter(CalendarEvent.id == event_id).first()
         if not db_event:
             raise HTTPException(status_code=404, detail="Event not found")
         self.db.delete(db_event)
+        OutboxService(self.db).enqueue("calendar_event.deleted", {"id": event_id, "user_id": db_event.user_id},
+                                       aggregate_id=event_id, user_id=db_event.user_id)
         self.db.commit()
         return {"detail": "Event deleted successfully"}
\ No newline at end of file
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app.models.career import Career
 from app.schemas.career import CareerCreate, CareerUpdate
+from app.services.career_stats import CareerStatsService
 
 class CareerService:
     def __init__(self, db: Session):
@@ -9,6 +10,7 @@ class CareerService:
     def create_career_goal(self, career_goal: CareerCreate):
         db_career = Career(**career_goal.dict())
         self.db.add(db_career)
+        CareerStatsService(self.db).record(db_career.user_id, None, (db_career.goal, db_career.progress))
         self.db.commit()
         self.db.refresh(db_career)
         return db_career
@@ -16,20 +18,32 @@ class CareerService:
     def get_career_goals(self, user_id: int):
         return self.db.query(Career).filter(Career.user_id == user_id).all()
 
-    def update_career_goal(self, career_id: int, career_update: CareerUpdate):
-        db_career = self.db.query(Career).filter(Career.id == career_id).first()
+    def get_all_career_goals(self):
+        return self.db.query(Career).order_by(Career.user_id, Career.id).all()
+
+    def update_career_goal(self, career_id: int, career_update: CareerUpdate, user_id: int = None):
+        db_career = self._find(career_id, user_id)
         if db_career:
+            old = (db_career.goal, db_career.progress)
             for key, value in career_update.dict(exclude_unset=True).items():
                 setattr(db_career, key, value)
+            CareerStatsService(self.db).record(db_career.user_id, old, (db_career.goal, db_career.progress))
             self.db.commit()
             self.db.refresh(db_career)
             return db_career
         return None
 
-    def delete_career_goal(self, career_id: int):
-        db_career = self.db.query(Career).filter(Career.id == career_id).first()
+    def delete_career_goal(self, career_id: int, user_id: int = None):
+        db_career = self._find(career_id, user_id)
         if db_career:
             self.db.delete(db_career)
+            CareerStatsService(self.db).record(db_career.user_id, (db_career.goal, db_career.progress), None)
             self.db.commit()
             return db_career
-        return None
\ No newline at end of file
+        return None
+
+    def _find(self, career_id: int, user_id: int = None):
+        query = self.db.query(Career).filter(Career.id == career_id)
+        if user_id is not None:
+            query = query.filter(Career.user_id == user_id)
+        return query.first()
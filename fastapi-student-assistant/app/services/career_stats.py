@@ -0,0 +1,122 @@
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from app.models.career import HISTOGRAM_BUCKETS, Career, CareerGoalStats, CareerUserStats
+
+COMPLETE = 100.0
+BUCKET_WIDTH = COMPLETE / HISTOGRAM_BUCKETS
+BUCKET_COLUMNS = [f"bucket_{i}" for i in range(HISTOGRAM_BUCKETS)]
+STAT_COLUMNS = ["goals", "completed", "progress_sum"] + BUCKET_COLUMNS
+
+# (goal, progress) of a career row before or after a write; None when it did not / no longer exists.
+GoalState = Optional[Tuple[Optional[str], float]]
+
+def bucket_of(progress: float) -> int:
+    return max(0, min(int(progress // BUCKET_WIDTH), HISTOGRAM_BUCKETS - 1))
+
+def _contribution(progress: float, sign: int) -> Counter:
+    return Counter({
+        "goals": sign,
+        "completed": sign if progress >= COMPLETE else 0,
+        "progress_sum": sign * progress,
+        f"bucket_{bucket_of(progress)}": sign,
+    })
+
+def _aggregates(progress) -> list:
+    # The same totals as _contribution, computed over existing rows.
+    buckets = [
+        func.coalesce(func.sum(case(
+            (progress >= i * BUCKET_WIDTH if i == HISTOGRAM_BUCKETS - 1
+             else and_(progress >= i * BUCKET_WIDTH, progress < (i + 1) * BUCKET_WIDTH), 1),
+            else_=0,
+        )), 0)
+        for i in range(HISTOGRAM_BUCKETS)
+    ]
+    return [
+        func.count(),
+        func.coalesce(func.sum(case((progress >= COMPLETE, 1), else_=0)), 0),
+        func.coalesce(func.sum(progress), 0.0),
+    ] + buckets
+
+
+class CareerStatsService:
+    # Works on a Session or a Connection and never commits: the totals change in the caller's transaction.
+    def __init__(self, db):
+        self.db = db
+
+    def record(self, user_id: Optional[int], old: GoalState, new: GoalState):
+        user_delta = Counter()
+        goal_deltas = {}
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            goal, progress = state
+            contribution = _contribution(progress, sign)
+            user_delta.update(contribution)
+            if goal is not None:
+                goal_deltas.setdefault(goal, Counter()).update(contribution)
+        if user_id is not None:
+            self._bump(CareerUserStats.__table__, user_id, user_delta)
+        for goal, delta in goal_deltas.items():
+            self._bump(CareerGoalStats.__table__, goal, delta)
+
+    def _bump(self, table, key, delta: Counter):
+        delta = {name: amount for name, amount in delta.items() if amount}
+        if not delta:
+            return
+        key_column = next(iter(table.primary_key.columns))
+        increment = update(table).where(key_column == key).values(
+            {name: table.c[name] + amount for name, amount in delta.items()}
+        )
+        if self.db.execute(increment).rowcount:
+            return
+        try:
+            with self.db.begin_nested():
+                self.db.execute(table.insert().values({key_column.name: key, **dict.fromkeys(STAT_COLUMNS, 0), **delta}))
+        except IntegrityError:
+            # A concurrent write created the row first.
+            self.db.execute(increment)
+
+    def rebuild(self, user_ids: Iterable[int] = None, goals: Iterable[str] = None):
+        # Recomputes the totals from the careers table, for the given users and goals or (None) for all of them.
+        careers = Career.__table__
+        for table, key, keys in (
+            (CareerUserStats.__table__, careers.c.user_id, user_ids),
+            (CareerGoalStats.__table__, careers.c.goal, goals),
+        ):
+            key_column = next(iter(table.primary_key.columns))
+            query = select(key, *_aggregates(careers.c.progress)).where(key.isnot(None)).group_by(key)
+            clear = delete(table)
+            if keys is not None:
+                keys = list(keys)
+                if not keys:
+                    continue
+                query = query.where(key.in_(keys))
+                clear = clear.where(key_column.in_(keys))
+            self.db.execute(clear)
+            self.db.execute(table.insert().from_select([key_column.name] + STAT_COLUMNS, query))
+
+    def user_stats(self, user_id: int):
+        table = CareerUserStats.__table__
+        return self.db.execute(select(table).where(table.c.user_id == user_id)).first()
+
+    def goal_stats(self, goal: str):
+        table = CareerGoalStats.__table__
+        return self.db.execute(select(table).where(table.c.goal == goal)).first()
+
+
+def summarize(rows: List) -> dict:
+    # Adds up stats rows (one per shard for a goal) into the /career/stats response.
+    totals = Counter()
+    for row in rows:
+        if row is not None:
+            totals.update({name: row._mapping[name] for name in STAT_COLUMNS})
+    goals = totals["goals"]
+    return {
+        "goals": goals,
+        "completed": totals["completed"],
+        "average_progress": round(totals["progress_sum"] / goals, 2) if goals else 0.0,
+        "histogram": [totals[name] for name in BUCKET_COLUMNS],
+    }
@@ -0,0 +1,56 @@
+import hashlib
+import importlib
+import re
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+from app.core.config import settings
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+class EmbeddingEngine(ABC):
+    # Engines turn texts into an (n, dim) float32 matrix of L2-normalised rows.
+    dim: int
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        ...
+
+
+class HashingEmbedder(EmbeddingEngine):
+    # Deterministic feature-hashing vectorizer: no model download, stable across processes.
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vectors[row, (value >> 1) % self.dim] += sign
+        # Sub-linear term frequency, then unit length so a dot product is the cosine similarity.
+        np.copyto(vectors, np.sign(vectors) * np.log1p(np.abs(vectors)))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+_engine: EmbeddingEngine = None
+
+def get_embedding_engine() -> EmbeddingEngine:
+    # EMBEDDING_ENGINE is "hashing" or a "package.module:ClassName" path to a local engine.
+    global _engine
+    if _engine is None:
+        if settings.EMBEDDING_ENGINE == "hashing":
+            _engine = HashingEmbedder(dim=settings.EMBEDDING_DIM)
+        else:
+            module_name, class_name = settings.EMBEDDING_ENGINE.split(":")
+            _engine = getattr(importlib.import_module(module_name), class_name)()
+    return _engine
@@ -0,0 +1,50 @@
+from typing import List, Tuple
+from sqlalchemy.orm import Session
+from app.models.note import Note
+from app.services.embeddings import get_embedding_engine
+from app.services.notes import NoteService
+from app.services.outbox import register_handler
+from app.services.vector_index import vector_store
+
+class NoteSearchService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(self, user_id: int, query: str, k: int = 10) -> List[Tuple[Note, float]]:
+        vector = get_embedding_engine().embed([query])[0]
+        hits = vector_store.search(user_id, vector, k)
+        if not hits:
+            return []
+        notes = {
+            note.id: note
+            for note in self.db.query(Note).filter(Note.user_id == user_id, Note.id.in_([note_id for note_id, _ in hits]))
+        }
+        return [(notes[note_id], score) for note_id, score in hits if note_id in notes]
+
+    def index_note(self, note: Note):
+        content = NoteService(self.db).read_content(note)
+        text = f"{note.title or ''}\n{note.tags or ''}\n{content or ''}"
+        vector_store.upsert(note.user_id, note.id, get_embedding_engine().embed([text])[0])
+
+    def reindex_user(self, user_id: int):
+        # Rebuilds a user's vectors from scratch, e.g. after their notes got new ids (shard move, import).
+        vector_store.drop(user_id)
+        for note in self.db.query(Note).filter(Note.user_id == user_id).yield_per(500):
+            self.index_note(note)
+
+
+# Notes are embedded asynchronously by the outbox worker, right after the write commits.
+@register_handler("note.created")
+@register_handler("note.updated")
+def index_note_on_write(db: Session, event, payload: dict):
+    note = db.query(Note).filter(Note.id == payload["id"]).first()
+    if note is not None:
+        NoteSearchService(db).index_note(note)
+
+@register_handler("note.deleted")
+def remove_note_from_index(db: Session, event, payload: dict):
+    vector_store.remove(payload["user_id"], payload["id"])
+
+@register_handler("notes.imported")
+def reindex_imported_notes(db: Session, event, payload: dict):
+    NoteSearchService(db).reindex_user(payload["user_id"])
\ No newline at end of file
@@ -1,33 +1,90 @@
-from sqlalchemy.orm import Session
+import time
+from sqlalchemy import literal
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException
+from app.core.compression import compress, decompress
+from app.core.config import settings
 from app.models.note import Note
 from app.schemas.note import NoteCreate, NoteUpdate
+from app.services.outbox import OutboxService
+
+def make_snippet(text: str, length: int = None) -> str:
+    length = length or settings.NOTE_SNIPPET_LENGTH
+    text = " ".join((text or "").split())
+    return text if len(text) <= length else text[:length - 1].rstrip() + "…"
+
+def content_columns(text: str) -> dict:
+    data = (text or "").encode("utf-8")
+    codec = None
+    if len(data) >= settings.NOTE_COMPRESSION_THRESHOLD:
+        codec, payload = compress(data)
+    if codec is None:
+        return {"content": text, "content_blob": None, "content_codec": None, "snippet": make_snippet(text)}
+    return {"content": None, "content_blob": payload, "content_codec": codec, "snippet": make_snippet(text)}
+
+def _note_columns(data: dict) -> dict:
+    # Note.tags is stored as a comma-separated string
+    if data.get("tags") is not None:
+        data["tags"] = ",".join(data["tags"])
+    if "content" in data:
+        data.update(content_columns(data.pop("content")))
+    return data
 
 class NoteService:
     def __init__(self, db: Session):
         self.db = db
 
     def create_note(self, note: NoteCreate, user_id: int) -> Note:
-        db_note = Note(**note.dict(), user_id=user_id)
+        now = int(time.time())
+        db_note = Note(**_note_columns(note.dict()), user_id=user_id, created_at=now, updated_at=now)
         self.db.add(db_note)
+        self.db.flush()
+        OutboxService(self.db).enqueue("note.created", {"id": db_note.id, "user_id": user_id},
+                                       aggregate_id=db_note.id, user_id=user_id)
         self.db.commit()
         self.db.refresh(db_note)
+        self.read_content(db_note)
         return db_note
 
     def get_notes(self, user_id: int, tag: str = None):
         query = self.db.query(Note).filter(Note.user_id == user_id)
         if tag:
-            query = query.filter(Note.tag == tag)
-        return query.all()
+            # One tag anywhere in the comma-separated list; the (user_id, created_at) index narrows to the user.
+            query = query.filter((literal(",") + Note.tags + ",").contains(f",{tag},", autoescape=True))
+        return query.order_by(Note.created_at.desc()).all()
+
+    def get_note(self, note_id: int, user_id: int) -> Note:
+        note = (
+            self.db.query(Note)
+            .options(undefer(Note.content), undefer(Note.content_blob))
+            .filter(Note.id == note_id, Note.user_id == user_id)
+            .first()
+        )
+        if note is not None:
+            self.read_content(note)
+        return note
+
+    def read_content(self, note: Note) -> str:
+        # Decompresses into note.content without marking the note dirty.
+        if note.content_codec:
+            text = decompress(note.content_codec, note.content_blob).decode("utf-8")
+            set_committed_value(note, "content", text)
+            return text
+        return note.content
 
     def update_note(self, note_id: int, note: NoteUpdate, user_id: int) -> Note:
         db_note = self.db.query(Note).filter(Note.id == note_id, Note.user_id == user_id).first()
         if not db_note:
             raise HTTPException(status_code=404, detail="Note not found")
-        for key, value in note.dict(exclude_unset=True).items():
+        for key, value in _note_columns(note.dict(exclude_unset=True)).items():
             setattr(db_note, key, value)
+        db_note.updated_at = int(time.time())
+        OutboxService(self.db).enqueue("note.updated", {"id": db_note.id, "user_id": user_id},
+                                       aggregate_id=db_note.id, user_id=user_id)
         self.db.commit()
         self.db.refresh(db_note)
+        self.read_content(db_note)
         return db_note
 
     def delete_note(self, note_id: int, user_id: int):
@@ -35,5 +92,7 @@ class NoteService:
         if not db_note:
             raise HTTPException(status_code=404, detail="Note not found")
         self.db.delete(db_note)
+        OutboxService(self.db).enqueue("note.deleted", {"id": note_id, "user_id": user_id},
+                                       aggregate_id=note_id, user_id=user_id)
         self.db.commit()
         return {"detail": "Note deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.outbox import OutboxEvent
+
+logger = logging.getLogger("uvicorn.error")
+
+# Handlers receive the worker's session, the event row and its decoded payload.
+# Anything they write through the session commits together with the "done" marker,
+# so handlers must be idempotent on event.idempotency_key for external side-effects.
+OutboxHandler = Callable[[Session, OutboxEvent, dict], None]
+
+_handlers: Dict[str, List[OutboxHandler]] = {}
+
+def register_handler(topic: str):
+    def decorator(func: OutboxHandler) -> OutboxHandler:
+        _handlers.setdefault(topic, []).append(func)
+        return func
+    return decorator
+
+def get_handlers(topic: str) -> List[OutboxHandler]:
+    return _handlers.get(topic, [])
+
+
+class OutboxService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, topic: str, payload: dict, aggregate_id: int = None, user_id: int = None,
+                idempotency_key: str = None) -> OutboxEvent:
+        # Only adds the event to the caller's session; it is committed with the domain write.
+        event = OutboxEvent(
+            topic=topic,
+            aggregate_id=aggregate_id,
+            user_id=user_id,
+            payload=json.dumps(payload, default=str),
+            idempotency_key=idempotency_key or f"{topic}:{aggregate_id}:{uuid.uuid4().hex}",
+            status="pending",
+            attempts=0,
+            available_at=datetime.utcnow(),
+            created_at=datetime.utcnow(),
+        )
+        self.db.add(event)
+        return event
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        poll_interval: float = settings.OUTBOX_POLL_INTERVAL,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+        retry_backoff: float = settings.OUTBOX_RETRY_BACKOFF,
+        lease_seconds: int = settings.OUTBOX_LEASE_SECONDS,
+        retention: timedelta = timedelta(hours=settings.OUTBOX_RETENTION_HOURS),
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self.retention = retention
+        self._last_purge = datetime.utcnow()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping.is_set():
+            try:
+                processed = await loop.run_in_executor(None, self.drain_once)
+            except Exception as exc:
+                logger.error(f"Outbox drain failed: {exc}")
+                processed = 0
+            if processed == 0 and datetime.utcnow() - self._last_purge > timedelta(hours=1):
+                self._last_purge = datetime.utcnow()
+                await loop.run_in_executor(None, self.purge_processed, self.retention)
+            # A full batch means there is probably more work waiting, so go again right away.
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def drain_once(self) -> int:
+        db = self.session_factory()
+        try:
+            event_ids = self._claim_batch(db)
+            for event_id in event_ids:
+                self._process(db, event_id)
+            return len(event_ids)
+        finally:
+            db.close()
+
+    def _claim_batch(self, db: Session) -> List[int]:
+        # Rows stuck in "processing" past their lease (e.g. after a crash) are claimed again.
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        candidates = [
+            row.id
+            for row in db.query(OutboxEvent.id)
+            .filter(OutboxEvent.status.in_(("pending", "processing")), OutboxEvent.available_at <= now)
+            .order_by(OutboxEvent.available_at, OutboxEvent.id)
+            .limit(self.batch_size)
+        ]
+        if not candidates:
+            return []
+        db.query(OutboxEvent).filter(
+            OutboxEvent.id.in_(candidates),
+            OutboxEvent.status.in_(("pending", "processing")),
+            OutboxEvent.available_at <= now,
+        ).update(
+            {
+                OutboxEvent.status: "processing",
+                OutboxEvent.claim_token: token,
+                OutboxEvent.available_at: now + timedelta(seconds=self.lease_seconds),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        return [
+            row.id
+            for row in db.query(OutboxEvent.id)
+            .filter(OutboxEvent.claim_token == token, OutboxEvent.status == "processing")
+            .order_by(OutboxEvent.id)
+        ]
+
+    def _process(self, db: Session, event_id: int):
+        event = db.query(OutboxEvent).filter(OutboxEvent.id == event_id).first()
+        if event is None:
+            return
+        try:
+            payload = json.loads(event.payload or "{}")
+            for handler in get_handlers(event.topic):
+                handler(db, event, payload)
+            event.status = "done"
+            event.processed_at = datetime.utcnow()
+            event.last_error = None
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            event = db.query(OutboxEvent).filter(OutboxEvent.id == event_id).first()
+            event.attempts += 1
+            event.last_error = repr(exc)
+            if event.attempts >= self.max_attempts:
+                event.status = "failed"
+                logger.error(f"Outbox event {event.idempotency_key} failed permanently: {exc}")
+            else:
+                event.status = "pending"
+                delay = self.retry_backoff * (2 ** (event.attempts - 1))
+                event.available_at = datetime.utcnow() + timedelta(seconds=delay)
+            db.commit()
+
+    def purge_processed(self, older_than: timedelta) -> int:
+        db = self.session_factory()
+        try:
+            deleted = db.query(OutboxEvent).filter(
+                OutboxEvent.status == "done",
+                OutboxEvent.processed_at < datetime.utcnow() - older_than,
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
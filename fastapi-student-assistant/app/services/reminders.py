@@ -1,35 +1,72 @@
+from datetime import datetime
+from sqlalchemy import literal, select, union_all
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from app.models.archive import ArchivedReminder
 from app.models.reminder import Reminder
 from app.schemas.reminder import ReminderCreate, ReminderUpdate
+from app.services.outbox import OutboxService
+
+def _reminder_columns(data: dict) -> dict:
+    # The schema calls the reminder time "due_date" and carries user_id itself
+    data.pop("user_id", None)
+    if "due_date" in data:
+        data["reminder_time"] = data.pop("due_date")
+    return data
 
 class ReminderService:
     def __init__(self, db: Session):
         self.db = db
 
     def create_reminder(self, reminder: ReminderCreate, user_id: int) -> Reminder:
-        db_reminder = Reminder(**reminder.dict(), user_id=user_id)
+        db_reminder = Reminder(**_reminder_columns(reminder.dict()), user_id=user_id)
         self.db.add(db_reminder)
+        self.db.flush()
+        OutboxService(self.db).enqueue("reminder.created", {"id": db_reminder.id, "user_id": user_id},
+                                       aggregate_id=db_reminder.id, user_id=user_id)
         self.db.commit()
         self.db.refresh(db_reminder)
         return db_reminder
 
-    def get_reminders(self, user_id: int):
-        return self.db.query(Reminder).filter(Reminder.user_id == user_id).all()
+    def get_reminders(self, user_id: int, include_archived: bool = False):
+        if not include_archived:
+            return self.db.query(Reminder).filter(Reminder.user_id == user_id).order_by(Reminder.reminder_time).all()
+        # History view: hot and archived rows come back as one list, flagged by "archived".
+        query = union_all(*(
+            select(
+                model.id, model.user_id, model.title, model.description, model.reminder_time,
+                model.is_recurring, model.completed, literal(archived).label("archived"),
+            ).where(model.user_id == user_id)
+            for model, archived in ((Reminder, False), (ArchivedReminder, True))
+        ))
+        return self.db.execute(query.order_by("reminder_time")).all()
+
+    def get_followups(self, user_id: int):
+        # Follow-ups are the reminders that are still ahead of the user.
+        return (
+            self.db.query(Reminder)
+            .filter(Reminder.user_id == user_id, Reminder.reminder_time >= datetime.utcnow())
+            .order_by(Reminder.reminder_time)
+            .all()
+        )
 
-    def delete_reminder(self, reminder_id: int):
-        reminder = self.db.query(Reminder).filter(Reminder.id == reminder_id).first()
+    def delete_reminder(self, reminder_id: int, user_id: int):
+        reminder = self.db.query(Reminder).filter(Reminder.id == reminder_id, Reminder.user_id == user_id).first()
         if reminder is None:
             raise HTTPException(status_code=404, detail="Reminder not found")
         self.db.delete(reminder)
+        OutboxService(self.db).enqueue("reminder.deleted", {"id": reminder_id, "user_id": user_id},
+                                       aggregate_id=reminder_id, user_id=user_id)
         self.db.commit()
 
-    def update_reminder(self, reminder_id: int, reminder_update: ReminderUpdate):
-        reminder = self.db.query(Reminder).filter(Reminder.id == reminder_id).first()
+    def update_reminder(self, reminder_id: int, reminder_update: ReminderUpdate, user_id: int):
+        reminder = self.db.query(Reminder).filter(Reminder.id == reminder_id, Reminder.user_id == user_id).first()
         if reminder is None:
             raise HTTPException(status_code=404, detail="Reminder not found")
-        for key, value in reminder_update.dict(exclude_unset=True).items():
+        for key, value in _reminder_columns(reminder_update.dict(exclude_unset=True)).items():
             setattr(reminder, key, value)
+        OutboxService(self.db).enqueue("reminder.updated", {"id": reminder.id, "user_id": reminder.user_id},
+                                       aggregate_id=reminder.id, user_id=reminder.user_id)
         self.db.commit()
         self.db.refresh(reminder)
         return reminder
\ No newline at end of file
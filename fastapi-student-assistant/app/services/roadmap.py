@@ -1,18 +1,27 @@
+import json
 from sqlalchemy.orm import Session
+from app.core.singleflight import single_flight
 from app.models.roadmap import Roadmap
 from app.schemas.roadmap import RoadmapCreate, RoadmapResponse
 
+def _columns(roadmap_data: RoadmapCreate) -> dict:
+    # Roadmap.milestones is a String column holding the milestones as JSON.
+    values = roadmap_data.dict()
+    values["milestones"] = json.dumps(values["milestones"])
+    return values
+
 class RoadmapService:
     def __init__(self, db: Session):
         self.db = db
 
     def create_roadmap(self, roadmap_data: RoadmapCreate) -> RoadmapResponse:
-        roadmap = Roadmap(**roadmap_data.dict())
+        roadmap = Roadmap(**_columns(roadmap_data))
         self.db.add(roadmap)
         self.db.commit()
         self.db.refresh(roadmap)
         return RoadmapResponse.from_orm(roadmap)
 
+    @single_flight()
     def get_roadmap(self, user_id: int) -> RoadmapResponse:
         roadmap = self.db.query(Roadmap).filter(Roadmap.user_id == user_id).first()
         if roadmap:
@@ -22,7 +31,7 @@ class RoadmapService:
     def update_roadmap(self, user_id: int, roadmap_data: RoadmapCreate) -> RoadmapResponse:
         roadmap = self.db.query(Roadmap).filter(Roadmap.user_id == user_id).first()
         if roadmap:
-            for key, value in roadmap_data.dict().items():
+            for key, value in _columns(roadmap_data).items():
                 setattr(roadmap, key, value)
             self.db.commit()
             self.db.refresh(roadmap)
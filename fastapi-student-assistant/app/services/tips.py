@@ -1,18 +1,28 @@
 from sqlalchemy.orm import Session
+from app.core.shared_cache import SharedCache
+from app.core.singleflight import single_flight
 from app.models.tip import Tip
 from app.schemas.tip import TipCreate, TipResponse
 
+# Tips change rarely and are the same for everyone, so workers share one cached copy per topic.
+tips_cache = SharedCache("tips")
+
 class TipService:
     def __init__(self, db: Session):
         self.db = db
 
     def get_tips(self, topic: str):
+        return [TipResponse(**tip) for tip in tips_cache.get_or_load(topic, lambda: self.load_tips(topic))]
+
+    @single_flight()
+    def load_tips(self, topic: str):
         tips = self.db.query(Tip).filter(Tip.topic == topic).all()
-        return tips
+        return [TipResponse.from_orm(tip).dict() for tip in tips]
 
     def create_tip(self, tip_data: TipCreate):
         new_tip = Tip(**tip_data.dict())
         self.db.add(new_tip)
         self.db.commit()
         self.db.refresh(new_tip)
-        return TipResponse.from_orm(new_tip)
\ No newline at end of file
+        tips_cache.invalidate(new_tip.topic)
+        return TipResponse.from_orm(new_tip)
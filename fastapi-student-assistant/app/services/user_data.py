@@ -0,0 +1,200 @@
+import io
+import json
+import zipfile
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List
+
+from fastapi import HTTPException
+from sqlalchemy import JSON, DateTime, select
+from sqlalchemy.orm import Session
+from app.core.compression import decompress
+from app.core.config import settings
+from app.models.archive import ArchivedCalendarEvent, ArchivedReminder
+from app.models.calendar import CalendarEvent
+from app.models.career import Career
+from app.models.note import Note
+from app.models.reminder import Reminder
+from app.models.roadmap import Roadmap
+from app.services.archive import ARCHIVES, assign_archived_ids
+from app.services.career_stats import CareerStatsService
+from app.services.notes import content_columns
+from app.services.outbox import OutboxService
+
+FORMAT_VERSION = 1
+
+# One "<table>.ndjson" member per table, one JSON object per row.
+EXPORT_MODELS = [Note, Reminder, ArchivedReminder, CalendarEvent, ArchivedCalendarEvent, Career, Roadmap]
+EXPORT_TABLES = {model.__tablename__: model.__table__ for model in EXPORT_MODELS}
+
+# Note bodies are exported as plain text; storage details are rebuilt on import.
+NOTE_STORAGE_COLUMNS = {"content_blob", "content_codec", "snippet"}
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class _ChunkBuffer:
+    # Write-only, non-seekable sink: zipfile then writes data descriptors instead of seeking back.
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks, self.size = [], 0
+        return data
+
+
+class UserDataService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def export_zip(self, user_id: int, chunk_size: int = None) -> Iterator[bytes]:
+        # Rows are read through a streaming cursor and the archive is handed out in chunks
+        # as it is written, so memory stays flat however much data the user has.
+        chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+        buffer = _ChunkBuffer()
+        counts: Dict[str, int] = {}
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, table in EXPORT_TABLES.items():
+                counts[name] = 0
+                with archive.open(f"{name}.ndjson", "w") as member:
+                    for rows in self._stream(table, user_id):
+                        member.write("".join(self._line(name, row) for row in rows).encode("utf-8"))
+                        counts[name] += len(rows)
+                        if buffer.size >= chunk_size:
+                            yield buffer.drain()
+            manifest = {"version": FORMAT_VERSION, "user_id": user_id,
+                        "exported_at": datetime.utcnow().isoformat(), "counts": counts}
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+        yield buffer.drain()
+
+    def _stream(self, table, user_id: int) -> Iterator[List]:
+        query = select(table).where(table.c.user_id == user_id).order_by(*table.primary_key.columns)
+        result = self.db.connection().execution_options(stream_results=True).execute(query)
+        try:
+            yield from result.mappings().partitions(settings.EXPORT_FETCH_SIZE)
+        finally:
+            result.close()
+
+    @staticmethod
+    def _line(name: str, row) -> str:
+        record = {key: _json_value(value) for key, value in row.items()}
+        if name == Note.__tablename__:
+            if record["content_codec"]:
+                record["content"] = decompress(record["content_codec"], record["content_blob"]).decode("utf-8")
+            for column in NOTE_STORAGE_COLUMNS:
+                record.pop(column, None)
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class UserDataImporter:
+    # Reads an export member by member and line by line, inserting in batches of its own
+    # transactions through the writer. Ids are reassigned (archived rows' too, from the hot
+    # table's sequence) and user_id is forced to the target.
+    # The whole upload is validated in a first pass, so a bad line is reported before any row
+    # is stored and a retry of the corrected file cannot duplicate an earlier partial import.
+    def __init__(self, writer, batch_size: int = None):
+        self.writer = writer
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+
+    def import_zip(self, fileobj: BinaryIO, user_id: int) -> Dict[str, int]:
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Upload is not a zip archive")
+        with archive:
+            members = set(archive.namelist()) - {"manifest.json"}
+            unknown = sorted(members - {f"{name}.ndjson" for name in EXPORT_TABLES})
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown archive members: {', '.join(unknown)}")
+            tables = {name: table for name, table in EXPORT_TABLES.items() if f"{name}.ndjson" in members}
+            for name, table in tables.items():
+                for _ in self._rows(archive, name, table, user_id):
+                    pass
+            counts = {name: self._import_table(archive, name, table, user_id) for name, table in tables.items()}
+        if counts.get(Career.__tablename__):
+            self.writer.run(lambda db: self._rebuild_career_stats(db, user_id))
+        if counts.get(Note.__tablename__):
+            # The vector index is rebuilt off the request path.
+            self.writer.run(lambda db: self._enqueue_reindex(db, user_id))
+        return counts
+
+    def _import_table(self, archive: zipfile.ZipFile, name: str, table, user_id: int) -> int:
+        imported, batch = 0, []
+        for row in self._rows(archive, name, table, user_id):
+            # An executemany takes its columns from the first row, so rows with other keys start a new batch.
+            if batch and row.keys() != batch[0].keys():
+                imported += self._insert(table, batch)
+                batch = []
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                imported += self._insert(table, batch)
+                batch = []
+        if batch:
+            imported += self._insert(table, batch)
+        return imported
+
+    def _rows(self, archive: zipfile.ZipFile, name: str, table, user_id: int) -> Iterator[dict]:
+        skip = {column.name for column in table.primary_key.columns}
+        if table in ARCHIVES.values():
+            skip.add("id")
+        datetimes = {column.name for column in table.c if isinstance(column.type, DateTime)}
+        with archive.open(f"{name}.ndjson") as raw:
+            for line_number, line in enumerate(io.TextIOWrapper(raw, encoding="utf-8"), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield self._row(name, table, json.loads(line), skip, datetimes, user_id)
+                except (TypeError, ValueError) as exc:
+                    raise HTTPException(status_code=400, detail=f"{name}.ndjson line {line_number}: {exc}")
+
+    @staticmethod
+    def _row(name: str, table, record: dict, skip: set, datetimes: set, user_id: int) -> dict:
+        if not isinstance(record, dict):
+            raise TypeError("expected a JSON object")
+        row = {key: value for key, value in record.items() if key in table.c and key not in skip}
+        for key in datetimes & row.keys():
+            if isinstance(row[key], str):
+                row[key] = datetime.fromisoformat(row[key])
+        if name == Note.__tablename__:
+            row.update(content_columns(row.get("content")))
+        row["user_id"] = user_id
+        # Checked here rather than left to the database, so they are reported as a bad line.
+        for column in table.c:
+            if column.name in skip:
+                continue
+            value = row.get(column.name)
+            if value is None and not column.nullable and (column.name in row or column.default is None):
+                raise ValueError(f"{column.name} is required")
+            if isinstance(value, (dict, list)) and not isinstance(column.type, JSON):
+                raise TypeError(f"{column.name} must be a single value")
+        return row
+
+    def _insert(self, table, batch: List[dict]) -> int:
+        def insert(db: Session):
+            assign_archived_ids(db, table, batch)
+            db.execute(table.insert(), batch)
+            db.commit()
+            return len(batch)
+        return self.writer.run(insert)
+
+    @staticmethod
+    def _rebuild_career_stats(db: Session, user_id: int):
+        goals = [goal for (goal,) in db.query(Career.goal).filter(Career.user_id == user_id).distinct()]
+        CareerStatsService(db).rebuild(user_ids=[user_id], goals=goals)
+        db.commit()
+
+    @staticmethod
+    def _enqueue_reindex(db: Session, user_id: int):
+        OutboxService(db).enqueue("notes.imported", {"user_id": user_id}, aggregate_id=user_id, user_id=user_id)
+        db.commit()
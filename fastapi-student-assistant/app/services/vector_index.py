@@ -0,0 +1,198 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from app.core.config import settings
+
+DELETED = -1
+
+def record_dtype(dim: int) -> np.dtype:
+    # One fixed-size record per vector, so a single file can be swapped atomically on compaction.
+    return np.dtype([("id", "<i8"), ("vec", "<f4", (dim,))])
+
+
+class IVFIndex:
+    # Inverted-file index: k-means centroids over the rows present at build time.
+    def __init__(self, centroids: np.ndarray, order: np.ndarray, bounds: np.ndarray, built_rows: int):
+        self.centroids = centroids
+        self.order = order
+        self.bounds = bounds
+        self.built_rows = built_rows
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, iterations: int = 8, seed: int = 0) -> "IVFIndex":
+        rows = len(vectors)
+        nlist = max(1, int(np.sqrt(rows)))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(vectors[np.sort(rng.choice(rows, size=min(rows, nlist * 40), replace=False))])
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            sums[empty] = centroids[empty]
+            norms[empty] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+        assignment = np.concatenate([
+            np.argmax(np.asarray(vectors[start:start + 65536]) @ centroids.T, axis=1)
+            for start in range(0, rows, 65536)
+        ])
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        return cls(centroids, order, bounds, rows)
+
+    def candidates(self, query: np.ndarray, nprobe: int, total_rows: int) -> np.ndarray:
+        probes = np.argsort(self.centroids @ query)[::-1][:nprobe]
+        parts = [self.order[self.bounds[c]:self.bounds[c + 1]] for c in probes]
+        # Rows appended since the build are not in any list yet, so they are always scanned.
+        parts.append(np.arange(self.built_rows, total_rows))
+        return np.sort(np.concatenate(parts))
+
+
+class UserVectorIndex:
+    def __init__(self, path: Path, dim: int):
+        self.path = path
+        self.dim = dim
+        self.dtype = record_dtype(dim)
+        self.lock = threading.RLock()
+        self._records: Optional[np.ndarray] = None
+        self._stat: Optional[Tuple[int, int]] = None
+        self._ivf: Optional[IVFIndex] = None
+        self._building = False
+
+    def _load(self) -> np.ndarray:
+        # Reopen the memory map only when the file changed (another writer, worker or compaction).
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._records, self._stat, self._ivf = np.zeros(0, dtype=self.dtype), None, None
+            return self._records
+        key = (stat.st_ino, stat.st_size)
+        if key != self._stat:
+            rows = stat.st_size // self.dtype.itemsize
+            self._records = np.memmap(self.path, dtype=self.dtype, mode="r+", shape=(rows,)) if rows else np.zeros(0, dtype=self.dtype)
+            if self._stat is None or key[0] != self._stat[0]:
+                self._ivf = None
+            self._stat = key
+        return self._records
+
+    def __len__(self) -> int:
+        with self.lock:
+            return int(np.count_nonzero(self._load()["id"] != DELETED))
+
+    def upsert(self, note_id: int, vector: np.ndarray):
+        with self.lock:
+            self._tombstone(note_id)
+            record = np.zeros(1, dtype=self.dtype)
+            record["id"] = note_id
+            record["vec"] = vector
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as handle:
+                handle.write(record.tobytes())
+            self._maybe_compact()
+
+    def remove(self, note_id: int):
+        with self.lock:
+            self._tombstone(note_id)
+            self._maybe_compact()
+
+    def _tombstone(self, note_id: int):
+        records = self._load()
+        if len(records):
+            hits = np.nonzero(records["id"] == note_id)[0]
+            if len(hits):
+                records["id"][hits] = DELETED
+                records.flush()
+
+    def _maybe_compact(self):
+        records = self._load()
+        deleted = int(np.count_nonzero(records["id"] == DELETED))
+        if deleted < 1000 or deleted < len(records) // 4:
+            return
+        alive = np.asarray(records[records["id"] != DELETED])
+        tmp = self.path.with_suffix(".tmp")
+        alive.tofile(tmp)
+        os.replace(tmp, self.path)
+        self._load()
+
+    def _refresh_ivf(self):
+        # The k-means build runs outside the lock, so upserts and other searches carry on meanwhile
+        # (with the previous IVF, or an exact scan); it is swapped in unless the file was replaced.
+        with self.lock:
+            records = self._load()
+            rows = len(records)
+            if self._building or rows < settings.VECTOR_IVF_THRESHOLD:
+                return
+            if self._ivf is not None and rows <= self._ivf.built_rows * 1.25:
+                return
+            self._building, inode = True, self._stat[0]
+        ivf = None
+        try:
+            # The mapping is a snapshot of the first rows; later appends go to a new one.
+            ivf = IVFIndex.build(records["vec"])
+        finally:
+            with self.lock:
+                self._building = False
+                if ivf is not None and self._stat is not None and self._stat[0] == inode:
+                    self._ivf = ivf
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        self._refresh_ivf()
+        with self.lock:
+            records = self._load()
+            rows = len(records)
+            if rows == 0:
+                return []
+            vectors = records["vec"]
+            if rows >= settings.VECTOR_IVF_THRESHOLD and self._ivf is not None:
+                positions = self._ivf.candidates(query, settings.VECTOR_IVF_NPROBE, rows)
+                ids = records["id"][positions]
+                scores = vectors[positions] @ query
+            else:
+                ids = np.asarray(records["id"])
+                scores = vectors @ query
+        scores = np.where(ids == DELETED, -np.inf, scores)
+        k = min(k, int(np.count_nonzero(ids != DELETED)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+
+class VectorStore:
+    # Per-user memory-mapped float32 matrices under one directory.
+    def __init__(self, directory: str, dim: int):
+        self.directory = Path(directory)
+        self.dim = dim
+        self._indexes: Dict[int, UserVectorIndex] = {}
+        self._lock = threading.Lock()
+
+    def index_for(self, user_id: int) -> UserVectorIndex:
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = self._indexes[user_id] = UserVectorIndex(self.directory / f"{user_id}.vec", self.dim)
+            return index
+
+    def upsert(self, user_id: int, note_id: int, vector: np.ndarray):
+        self.index_for(user_id).upsert(note_id, vector)
+
+    def remove(self, user_id: int, note_id: int):
+        self.index_for(user_id).remove(note_id)
+
+    def drop(self, user_id: int):
+        index = self.index_for(user_id)
+        with index.lock:
+            index.path.unlink(missing_ok=True)
+            index._load()
+
+    def search(self, user_id: int, query: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        return self.index_for(user_id).search(query, k)
+
+
+vector_store = VectorStore(settings.VECTOR_INDEX_DIR, settings.EMBEDDING_DIM)
@@ -0,0 +1,123 @@
+"""Service-level micro-benchmarks (pytest-benchmark).
+
+Run explicitly, they are not collected by the default test run:
+
+    pytest benchmarks/bench_services.py --benchmark-json=benchmarks/results/services.json
+    pytest benchmarks/bench_services.py --benchmark-compare=0001 --benchmark-compare-fail=mean:10%
+"""
+import random
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks import seed
+from app.schemas.note import NoteCreate
+from app.schemas.reminder import ReminderCreate
+from app.services.calendar import CalendarService
+from app.services.career import CareerService
+from app.services.career_stats import CareerStatsService
+from app.services.notes import NoteService
+from app.services.reminders import ReminderService
+from app.services.roadmap import RoadmapService
+from app.services.tips import TipService
+from app.services.embeddings import HashingEmbedder
+from app.services.vector_index import VectorStore, record_dtype
+
+SEARCH_NOTES = 100_000
+
+
+@pytest.fixture(scope="module")
+def session_factory():
+    with seed.working_copy() as url:
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user_ids():
+    rng = random.Random(seed.SEED)
+    return lambda: rng.randint(1, seed.USERS)
+
+
+def test_note_get_notes(benchmark, db, user_ids):
+    benchmark(lambda: NoteService(db).get_notes(user_id=user_ids()))
+
+
+def test_note_get_notes_by_tag(benchmark, db, user_ids):
+    benchmark(lambda: NoteService(db).get_notes(user_id=user_ids(), tag="visa"))
+
+
+def test_note_create(benchmark, db, user_ids):
+    note = NoteCreate(title="Benchmark", content="Remember to bring the I-20.", tags=None)
+    benchmark(lambda: NoteService(db).create_note(note, user_id=user_ids()))
+
+
+def test_reminder_get_reminders(benchmark, db, user_ids):
+    benchmark(lambda: ReminderService(db).get_reminders(user_id=user_ids()))
+
+
+def test_reminder_create(benchmark, db, user_ids):
+    def create():
+        user_id = user_ids()
+        reminder = ReminderCreate(title="Benchmark", due_date="2030-01-01T09:00:00", user_id=user_id)
+        return ReminderService(db).create_reminder(reminder, user_id=user_id)
+    benchmark(create)
+
+
+def test_calendar_get_daily_events(benchmark, db, user_ids):
+    benchmark(lambda: CalendarService(db).get_daily_events(user_id=user_ids()))
+
+
+def test_calendar_get_weekly_events(benchmark, db, user_ids):
+    benchmark(lambda: CalendarService(db).get_weekly_events(user_id=user_ids()))
+
+
+def test_career_get_goals(benchmark, db, user_ids):
+    benchmark(lambda: CareerService(db).get_career_goals(user_id=user_ids()))
+
+
+def test_career_user_stats(benchmark, db, user_ids):
+    benchmark(lambda: CareerStatsService(db).user_stats(user_id=user_ids()))
+
+
+def test_roadmap_get_roadmap(benchmark, db, user_ids):
+    benchmark(lambda: RoadmapService(db).get_roadmap(user_id=user_ids()))
+
+
+def test_tips_get_tips(benchmark, db):
+    rng = random.Random(seed.SEED)
+    benchmark(lambda: TipService(db).get_tips(topic=rng.choice(seed.TIP_TOPICS)))
+
+
+@pytest.fixture(scope="module")
+def vector_store(tmp_path_factory):
+    # 100k notes for one user, written straight into the memory-mapped record file.
+    embedder = HashingEmbedder()
+    rng = np.random.default_rng(seed.SEED)
+    words = ("visa interview passport bank account rent lease exam midterm class job resume "
+             "internship doctor insurance phone license transcript scholarship advisor").split()
+    texts = [" ".join(rng.choice(words, 8)) for _ in range(SEARCH_NOTES)]
+    records = np.zeros(SEARCH_NOTES, dtype=record_dtype(embedder.dim))
+    records["id"] = np.arange(1, SEARCH_NOTES + 1)
+    records["vec"] = embedder.embed(texts)
+    directory = tmp_path_factory.mktemp("vectors")
+    records.tofile(directory / "1.vec")
+    store = VectorStore(directory, embedder.dim)
+    store.search(1, embedder.embed(["warm up"])[0])  # builds the approximate index
+    return embedder, store
+
+
+def test_note_semantic_search_100k(benchmark, vector_store):
+    embedder, store = vector_store
+    query = embedder.embed(["visa interview docs"])[0]
+    benchmark(lambda: store.search(1, query, k=10))
\ No newline at end of file
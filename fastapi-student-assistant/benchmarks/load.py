@@ -0,0 +1,230 @@
+"""In-process ASGI load generator reporting latency percentiles and RPS per route.
+
+    python -m benchmarks.load --out benchmarks/results/load.json
+    python -m benchmarks.load --baseline benchmarks/baseline/load.json --max-regression 10
+
+Requests go straight to the ASGI app through httpx, so the numbers measure the
+application and database, not the network or server.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks import seed
+from app.db.session import get_db, get_read_db, get_writer
+from app.db.sqlite import SQLiteWriter, apply_sqlite_profile
+
+
+@dataclass
+class RouteSpec:
+    method: str
+    path: str
+    build: Callable[[random.Random], dict]  # returns kwargs for httpx: url params, json, ...
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def _user(rng: random.Random) -> int:
+    return rng.randint(1, seed.USERS)
+
+
+def _when(rng: random.Random) -> str:
+    return (datetime.utcnow() + timedelta(hours=rng.randint(1, 24 * 14))).isoformat()
+
+
+ROUTES: List[RouteSpec] = [
+    RouteSpec("GET", "/health", lambda rng: {}),
+    RouteSpec("GET", "/ready", lambda rng: {}),
+    RouteSpec("GET", "/version", lambda rng: {}),
+    RouteSpec("GET", "/api/v1/health/health", lambda rng: {}),
+    RouteSpec("GET", "/api/v1/tips/tips", lambda rng: {"params": {"topic": rng.choice(seed.TIP_TOPICS)}}),
+    RouteSpec("GET", "/api/v1/roadmap/{user_id}", lambda rng: {"path": {"user_id": _user(rng)}}),
+    RouteSpec("POST", "/api/v1/roadmap/", lambda rng: {"json": {
+        "user_id": _user(rng), "title": "Second semester", "milestones": [{"title": "Find an internship"}]}}),
+    RouteSpec("GET", "/api/v1/career/goals", lambda rng: {}),
+    RouteSpec("POST", "/api/v1/career/goals", lambda rng: {"json": {"user_id": _user(rng), "goal": "Data Scientist"}}),
+    RouteSpec("GET", "/api/v1/career/stats", lambda rng: {"params": {"user_id": _user(rng)}}),
+    RouteSpec("GET", "/api/v1/notes/", lambda rng: {"params": {"user_id": _user(rng), "tag": rng.choice(seed.TAGS)}}),
+    RouteSpec("GET", "/api/v1/notes/{note_id}", lambda rng: {
+        "path": {"note_id": rng.randint(1, seed.NOTES)}, "params": {"user_id": _user(rng)}}),
+    RouteSpec("POST", "/api/v1/notes/", lambda rng: {"params": {"user_id": _user(rng)}, "json": {
+        "title": "Load test", "content": "Bring passport and I-20.", "tags": [rng.choice(seed.TAGS)]}}),
+    RouteSpec("DELETE", "/api/v1/notes/{note_id}", lambda rng: {
+        "path": {"note_id": rng.randint(1, seed.NOTES)}, "params": {"user_id": _user(rng)}}),
+    RouteSpec("GET", "/api/v1/reminders/{user_id}", lambda rng: {"path": {"user_id": _user(rng)}}),
+    RouteSpec("POST", "/api/v1/reminders/", lambda rng: {"json": {
+        "title": "Submit form", "due_date": _when(rng), "user_id": _user(rng)}}),
+    RouteSpec("DELETE", "/api/v1/reminders/{id}", lambda rng: {
+        "path": {"id": rng.randint(1, seed.REMINDERS)}, "params": {"user_id": _user(rng)}}),
+    RouteSpec("GET", "/api/v1/calendar/daily/{user_id}", lambda rng: {"path": {"user_id": _user(rng)}}),
+    RouteSpec("GET", "/api/v1/calendar/weekly/{user_id}", lambda rng: {"path": {"user_id": _user(rng)}}),
+    RouteSpec("POST", "/api/v1/calendar/events", lambda rng: {"params": {"user_id": _user(rng)}, "json": {
+        "title": "Study session", "start_time": _when(rng), "end_time": _when(rng)}}),
+    RouteSpec("GET", "/api/v1/followups/{user_id}", lambda rng: {"path": {"user_id": _user(rng)}}),
+    RouteSpec("POST", "/api/v1/followups/", lambda rng: {"json": {
+        "title": "Email advisor", "due_date": _when(rng), "user_id": _user(rng)}}),
+    RouteSpec("POST", "/api/v1/voice/voice/speech-to-text", lambda rng: {"json": {"audio_url": "https://example.com/a.wav"}}),
+    RouteSpec("POST", "/api/v1/voice/voice/text-to-speech", lambda rng: {"json": {"text": "Hello"}}),
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def _drive(client: httpx.AsyncClient, spec: RouteSpec, requests: int, concurrency: int, rng: random.Random) -> dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            kwargs = spec.build(rng)
+            url = spec.path.format(**kwargs.pop("path", {}))
+            started = time.perf_counter()
+            try:
+                response = await client.request(spec.method, url, **kwargs)
+                statuses[str(response.status_code)] += 1
+            except Exception as exc:
+                statuses[type(exc).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "404")))
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": dict(statuses),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+async def run(requests: int, concurrency: int, routes: Optional[List[str]] = None) -> dict:
+    with seed.working_copy() as url:
+        return await _run(url, requests, concurrency, routes)
+
+
+async def _run(url: str, requests: int, concurrency: int, routes: Optional[List[str]]) -> dict:
+    from app.main import app
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    apply_sqlite_profile(engine)
+    writer_engine = create_engine(url, connect_args={"check_same_thread": False})
+    apply_sqlite_profile(writer_engine, immediate=True)
+    BenchSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    bench_writer = SQLiteWriter(writer_engine)
+
+    def get_bench_db():
+        db = BenchSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_bench_db
+    app.dependency_overrides[get_read_db] = get_bench_db
+    app.dependency_overrides[get_writer] = lambda: bench_writer
+    rng = random.Random(seed.SEED)
+    results: Dict[str, dict] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for spec in ROUTES:
+            if routes and spec.name not in routes:
+                continue
+            await _drive(client, spec, min(requests, 20), concurrency, rng)  # warm-up
+            results[spec.name] = await _drive(client, spec, requests, concurrency, rng)
+    app.dependency_overrides.clear()
+    bench_writer.stop()
+    engine.dispose()
+    writer_engine.dispose()
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "users": seed.USERS,
+            "notes": seed.NOTES,
+            "reminders": seed.REMINDERS,
+            "events": seed.EVENTS,
+            "requests_per_route": requests,
+            "concurrency": concurrency,
+        },
+        "routes": results,
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> List[str]:
+    regressions = []
+    for name, now in sorted(current["routes"].items()):
+        before = baseline.get("routes", {}).get(name)
+        if before is None:
+            print(f"{name:45} new route")
+            continue
+        p95_delta = _delta(before["p95_ms"], now["p95_ms"])
+        rps_delta = _delta(before["rps"], now["rps"])
+        print(f"{name:45} p95 {before['p95_ms']:>9.3f} -> {now['p95_ms']:>9.3f} ms ({p95_delta:+6.1f}%)"
+              f"  rps {before['rps']:>9.2f} -> {now['rps']:>9.2f} ({rps_delta:+6.1f}%)")
+        if p95_delta > max_regression or rps_delta < -max_regression:
+            regressions.append(name)
+    return regressions
+
+
+def _delta(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--route", action="append", help='only run this route, e.g. "GET /api/v1/notes/"')
+    parser.add_argument("--out", default=str(seed.BENCH_DIR / "results" / "load.json"))
+    parser.add_argument("--baseline", help="previous results file to diff against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="allowed p95/RPS change in percent")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.requests, args.concurrency, args.route))
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2, sort_keys=True))
+    print(f"wrote {out}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.max_regression)
+        if regressions:
+            print("regressions: " + ", ".join(regressions))
+            return 1
+    else:
+        for name, stats in results["routes"].items():
+            print(f"{name:45} p50 {stats['p50_ms']:>8.3f}  p95 {stats['p95_ms']:>8.3f}  p99 {stats['p99_ms']:>8.3f} ms"
+                  f"  {stats['rps']:>9.2f} rps  errors {stats['errors']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
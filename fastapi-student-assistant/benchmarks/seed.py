@@ -0,0 +1,153 @@
+"""Seed a SQLite database with realistic data volumes for benchmarking.
+
+Volumes default to 10k users and 1M notes, reminders and calendar events.
+Set BENCH_SCALE (e.g. 0.01) to shrink everything proportionally for quick runs.
+The seeded file is reused as long as the recorded volumes match; benchmarks run
+against a throwaway copy of it (see working_copy) so writes never leak into the cache.
+"""
+import os
+import random
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import create_engine, text
+
+from app.db.base import Base
+from app.models import user, tip, roadmap, career, note, reminder, calendar, outbox  # noqa: F401 register tables
+from app.services.career_stats import CareerStatsService
+from app.services.notes import content_columns
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_DIR = BENCH_DIR / ".data"
+SCALE = float(os.getenv("BENCH_SCALE", "1"))
+
+USERS = max(1, int(10_000 * SCALE))
+NOTES = max(1, int(1_000_000 * SCALE))
+REMINDERS = max(1, int(1_000_000 * SCALE))
+EVENTS = max(1, int(1_000_000 * SCALE))
+GOALS_PER_USER = 3
+TIP_TOPICS = ["driver_license", "visa", "banking", "healthcare", "housing", "taxes", "jobs", "phone"]
+TIPS_PER_TOPIC = 50
+TAGS = ["visa", "bank", "exam", "job", "housing", "health"]
+
+CHUNK = 10_000
+SEED = 1234
+
+
+def database_path() -> Path:
+    return DATA_DIR / f"bench_{USERS}u_{NOTES}n.db"
+
+
+def database_url() -> str:
+    return f"sqlite:///{database_path()}"
+
+
+def _chunks(rows, size=CHUNK):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(conn, table, rows):
+    for batch in _chunks(rows):
+        conn.execute(table.insert(), batch)
+
+
+def _volumes() -> str:
+    return f"{USERS}:{NOTES}:{REMINDERS}:{EVENTS}"
+
+
+def seed(force: bool = False) -> str:
+    path = database_path()
+    url = database_url()
+    engine = create_engine(url)
+    if path.exists() and not force:
+        with engine.connect() as conn:
+            row = conn.execute(text("SELECT value FROM bench_meta WHERE key = 'volumes'")).first()
+        if row is not None and row[0] == _volumes():
+            engine.dispose()
+            return url
+    engine.dispose()
+
+    DATA_DIR.mkdir(exist_ok=True)
+    if path.exists():
+        path.unlink()
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    rng = random.Random(SEED)
+    now = datetime.utcnow()
+    epoch = int(now.timestamp())
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        _insert(conn, user.User.__table__, (
+            {"id": u, "username": f"user{u}", "email": f"user{u}@example.com", "full_name": f"User {u}",
+             "hashed_password": "x", "is_active": True, "is_verified": True}
+            for u in range(1, USERS + 1)
+        ))
+        _insert(conn, note.Note.__table__, (
+            {"user_id": rng.randint(1, USERS), "title": f"Note {i}",
+             # Mostly short notes with a long tail of large bodies that get compressed.
+             **content_columns("Lorem ipsum dolor sit amet. " * int(rng.paretovariate(1.2) * 20)),
+             "tags": rng.choice(TAGS), "created_at": epoch - i, "updated_at": epoch - i}
+            for i in range(NOTES)
+        ))
+        _insert(conn, reminder.Reminder.__table__, (
+            {"user_id": rng.randint(1, USERS), "title": f"Reminder {i}", "description": "Submit the form",
+             "is_recurring": i % 7 == 0, "reminder_time": now + timedelta(minutes=rng.randint(-60 * 24 * 365, 60 * 24 * 30)),
+             "created_at": now, "updated_at": now}
+            for i in range(REMINDERS)
+        ))
+        _insert(conn, calendar.CalendarEvent.__table__, (
+            _event(rng, i, now) for i in range(EVENTS)
+        ))
+        _insert(conn, career.Career.__table__, (
+            {"user_id": u, "goal": f"Goal {g}", "progress": float(rng.choice((0, 10, 25, 50, 75, 100))), "resources": []}
+            for u in range(1, USERS + 1) for g in range(GOALS_PER_USER)
+        ))
+        CareerStatsService(conn).rebuild()
+        _insert(conn, roadmap.Roadmap.__table__, (
+            {"user_id": u, "title": "First semester", "description": "Settling in",
+             "milestones": '[{"title": "Open a bank account", "completed": false}]',
+             "created_at": epoch, "updated_at": epoch}
+            for u in range(1, USERS + 1)
+        ))
+        _insert(conn, tip.Tip.__table__, (
+            {"topic": topic, "content": f"{topic} tip {i}"} for topic in TIP_TOPICS for i in range(TIPS_PER_TOPIC)
+        ))
+        conn.exec_driver_sql("CREATE TABLE bench_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(text("INSERT INTO bench_meta (key, value) VALUES ('volumes', :v)"), {"v": _volumes()})
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return url
+
+
+@contextmanager
+def working_copy() -> Iterator[str]:
+    # Seeds if needed, then yields the URL of a per-run copy that is deleted afterwards.
+    seed()
+    with tempfile.TemporaryDirectory(prefix="run-", dir=DATA_DIR) as run_dir:
+        path = Path(run_dir) / database_path().name
+        shutil.copyfile(database_path(), path)
+        yield f"sqlite:///{path}"
+
+
+def _event(rng, i, now):
+    start = now + timedelta(hours=rng.randint(-24 * 180, 24 * 30))
+    return {"user_id": rng.randint(1, USERS), "title": f"Event {i}", "description": None,
+            "start_time": start, "end_time": start + timedelta(hours=1), "category": rng.choice(["class", "work", None]),
+            "created_at": now, "updated_at": now}
+
+
+if __name__ == "__main__":
+    print(seed(force=True))
\ No newline at end of file
@@ -0,0 +1,47 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.db.session import get_read_db
+from app.main import app
+from app.schemas.career import CareerCreate
+from app.services.career import CareerService
+
+
+@pytest.fixture
+def api(session_factory):
+    db = session_factory()
+    try:
+        for user_id, goal in ((1, "nurse"), (2, "dev"), (2, "nurse")):
+            CareerService(db).create_career_goal(CareerCreate(user_id=user_id, goal=goal, progress=50))
+    finally:
+        db.close()
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = get_test_db
+    yield app
+    app.dependency_overrides.clear()
+
+
+def get(app, path, params=None):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, params=params)
+    return asyncio.run(request())
+
+
+def test_unfiltered_queries_read_the_overridden_database(api):
+    response = get(api, "/api/v1/career/goals")
+    assert response.status_code == 200
+    assert [(goal["user_id"], goal["goal"]) for goal in response.json()] == [(1, "nurse"), (2, "dev"), (2, "nurse")]
+
+    stats = get(api, "/api/v1/career/stats", params={"goal": "nurse"}).json()
+    assert (stats["goals"], stats["average_progress"]) == (2, 50.0)
@@ -1,8 +1,31 @@
 from pytest import fixture
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 from app.main import app
+from app.db.base import Base
+from app.models import archive, calendar, career, idempotency, note, outbox, reminder, roadmap, shard, tip, user  # noqa: F401 register tables
 
 @fixture(scope="module")
 def test_client():
     client = TestClient(app)
-    yield client
\ No newline at end of file
+    yield client
+
+@fixture
+def make_database(tmp_path):
+    # make_database("name.db") -> engine on a new SQLite file in tmp_path with every table created.
+    engines = []
+
+    def make(name: str = "test.db"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+@fixture
+def session_factory(make_database):
+    return sessionmaker(bind=make_database())
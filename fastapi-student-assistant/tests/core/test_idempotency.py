@@ -0,0 +1,116 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware
+
+
+@pytest.fixture
+def app(make_database):
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware, engine=make_database("idempotency.db"))
+    app.state.calls = 0
+
+    @app.post("/notes/")
+    async def create_note(payload: dict):
+        app.state.calls += 1
+        await asyncio.sleep(0.05)
+        return {"id": app.state.calls, **payload}
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        app.state.calls += 1
+        return {"size": len(await request.body())}
+
+    @app.post("/broken")
+    async def broken():
+        app.state.calls += 1
+        raise RuntimeError("boom")
+
+    return app
+
+
+def post(app, *requests):
+    async def send_all():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post(path, **kwargs) for path, kwargs in requests))
+    return asyncio.run(send_all())
+
+
+def test_retry_replays_the_stored_response(app):
+    request = ("/notes/", {"json": {"title": "visa"}, "headers": {"Idempotency-Key": "k1"}})
+    first, = post(app, request)
+    second, = post(app, request)
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json() == {"id": 1, "title": "visa"}
+    assert second.headers["idempotent-replayed"] == "true"
+    assert app.state.calls == 1
+
+
+def test_concurrent_duplicates_wait_for_the_first(app):
+    request = ("/notes/", {"json": {"title": "visa"}, "headers": {"Idempotency-Key": "k2"}})
+    responses = post(app, *[request] * 5)
+    assert {r.json()["id"] for r in responses} == {1}
+    assert app.state.calls == 1
+
+
+def test_key_reused_with_another_body_is_rejected(app):
+    post(app, ("/notes/", {"json": {"title": "visa"}, "headers": {"Idempotency-Key": "k3"}}))
+    response, = post(app, ("/notes/", {"json": {"title": "bank"}, "headers": {"Idempotency-Key": "k3"}}))
+    assert response.status_code == 422
+    assert app.state.calls == 1
+
+
+def test_requests_without_a_key_and_server_errors_are_not_stored(app):
+    post(app, ("/notes/", {"json": {}}), ("/notes/", {"json": {}}))
+    assert app.state.calls == 2
+    request = ("/broken", {"headers": {"Idempotency-Key": "k4"}})
+    first, = post(app, request)
+    second, = post(app, request)
+    assert first.status_code == second.status_code == 500
+    assert app.state.calls == 4
+
+
+def test_keys_are_scoped_to_the_caller_and_path(app):
+    headers = {"Idempotency-Key": "k4"}
+    responses = post(
+        app,
+        ("/notes/", {"params": {"user_id": 1}, "json": {"title": "visa"}, "headers": headers}),
+        ("/notes/", {"params": {"user_id": 2}, "json": {"title": "visa"}, "headers": headers}),
+        ("/notes/", {"json": {"title": "visa"}, "headers": {**headers, "Authorization": "Bearer other"}}),
+    )
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert "idempotent-replayed" not in {name for r in responses for name in r.headers}
+    assert app.state.calls == 3
+
+    response, = post(app, ("/broken", {"headers": headers}))
+    assert response.status_code == 500
+    assert app.state.calls == 4
+
+
+def test_large_bodies_are_streamed_through_without_a_replay(app, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_MAX_BODY_BYTES", 1000)
+
+    async def chunked():
+        for _ in range(5):
+            yield b"x" * 500
+
+    headers = {"Idempotency-Key": "k5"}
+    responses = post(
+        app,
+        ("/upload", {"content": b"x" * 2500, "headers": headers}),
+        ("/upload", {"content": chunked(), "headers": headers}),
+    )
+    assert [r.json() for r in responses] == [{"size": 2500}] * 2
+    assert "idempotent-replayed" not in {name for r in responses for name in r.headers}
+    assert app.state.calls == 2
+
+    small = ("/upload", {"content": b"x" * 500, "headers": headers})
+    post(app, small)
+    response, = post(app, small)
+    assert response.headers["idempotent-replayed"] == "true"
+    assert app.state.calls == 3
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.api.v1.endpoints import profiler as profiler_endpoints
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware, install_sql_capture, profiler, trace_sync_endpoints
+from app.db.sqlite import SQLiteWriter
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_TOKEN", "secret")
+    monkeypatch.setattr(settings, "PROFILER_SLOW_REQUEST_MS", 100.0)
+    monkeypatch.setattr(settings, "PROFILER_INTERVAL_MS", 2.0)
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}", connect_args={"check_same_thread": False})
+    install_sql_capture()
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(profiler_endpoints.router, prefix="/admin/profiler")
+
+    @app.get("/busy")
+    def busy_endpoint(ms: int = 200):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        time.sleep(ms / 1000)
+        return {"ok": True}
+
+    writer = SQLiteWriter(engine, window=0)
+
+    def slow_write(db):
+        time.sleep(0.1)
+
+    @app.get("/write")
+    def write_endpoint():
+        writer.run(slow_write)
+        return {"ok": True}
+
+    trace_sync_endpoints(app)
+    yield app
+    writer.stop()
+    engine.dispose()
+
+
+def get(app, path, headers=None):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(request())
+
+
+def test_profile_header_samples_the_request_and_records_sql(app):
+    response = get(app, "/busy?ms=50", headers={"X-Profile": "secret"})
+    trace = profiler.get(int(response.headers["x-profile-id"]))
+    assert trace.kind == "request" and trace.status_code == 200
+    assert trace.sql[0]["statement"] == "SELECT 1"
+    assert any("busy_endpoint" in stack for stack in trace.stacks)
+    assert "x-profile-id" not in get(app, "/busy?ms=0", headers={"X-Profile": "wrong"}).headers
+
+
+def test_writer_jobs_are_attributed_to_their_request(app):
+    response = get(app, "/write", headers={"X-Profile": "secret"})
+    trace = profiler.get(int(response.headers["x-profile-id"]))
+    assert any("slow_write" in stack for stack in trace.stacks)
+    assert profiler.threads == {}
+
+
+def test_only_slow_requests_are_kept(app):
+    before = {trace.id for trace in profiler.profiles}
+    get(app, "/busy?ms=0")
+    get(app, "/busy?ms=250")
+    captured = [trace for trace in profiler.profiles if trace.id not in before]
+    assert [trace.kind for trace in captured] == ["slow"]
+    assert captured[0].duration_ms >= 250
+    assert any("busy_endpoint" in stack for stack in captured[0].stacks)
+
+
+def test_global_profile_is_downloadable_as_collapsed_stacks(app):
+    assert get(app, "/admin/profiler/").status_code == 403
+    headers = {"X-Profiler-Token": "secret"}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as client:
+            started = (await client.post("/admin/profiler/start", params={"seconds": 0.2})).json()
+            await client.get("/busy", params={"ms": 300})
+            return started, await client.get(f"/admin/profiler/{started['id']}/collapsed")
+
+    started, collapsed = asyncio.run(run())
+    assert started["kind"] == "global"
+    lines = collapsed.text.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("busy_endpoint" in line for line in lines)
+
+
+def test_sampler_sleeps_while_nothing_is_profiled(app):
+    get(app, "/busy?ms=0")
+    deadline = time.monotonic() + 1
+    while profiler._wake.is_set() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not profiler._wake.is_set() and profiler._thread.is_alive()
+
+    response = get(app, "/busy?ms=50", headers={"X-Profile": "secret"})
+    assert profiler.get(int(response.headers["x-profile-id"])).stacks
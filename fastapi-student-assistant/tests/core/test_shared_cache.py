@@ -0,0 +1,121 @@
+import json
+import selectors
+import socket
+import threading
+
+import pytest
+
+from app.core import shared_cache
+from app.core.config import settings
+from app.core.shared_cache import SharedCache
+from app.serve import Master, Worker
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SHARED_CACHE_DIR", str(tmp_path))
+    yield tmp_path
+    shared_cache.set_publisher(None)
+
+
+def test_one_worker_loads_for_everyone(cache_dir):
+    loads = []
+    worker_a, worker_b = SharedCache("tips-test", ttl=60), SharedCache("tips-test", ttl=60)
+
+    def loader():
+        loads.append(1)
+        return [{"topic": "visa", "content": "renew early", "id": 1}]
+
+    assert worker_a.get_or_load("visa", loader) == worker_b.get_or_load("visa", loader)
+    assert len(loads) == 1
+    assert worker_b.stats()["shared_hits"] == 1
+    worker_b.get_or_load("visa", loader)
+    assert worker_b.stats()["hits"] == 1
+
+
+def test_invalidate_drops_shared_copy_and_notifies_other_workers(cache_dir):
+    published = []
+    shared_cache.set_publisher(lambda name, key: published.append((name, key)))
+    writer, reader = SharedCache("tips-test", ttl=60), SharedCache("tips-test", ttl=60)
+    reader.get_or_load("visa", lambda: ["old"])
+
+    writer.invalidate("visa")
+    assert published == [("tips-test", "visa")]
+    assert [path.suffix for path in (cache_dir / "tips-test").iterdir()] == [".gen"]
+
+    # What the other worker's listener does with the relayed message.
+    shared_cache.apply_invalidation(*published[0])
+    assert reader.get_or_load("visa", lambda: ["new"]) == ["new"]
+
+
+def test_load_in_flight_during_an_invalidation_is_not_cached(cache_dir):
+    worker_a, worker_b = SharedCache("tips-test", ttl=60), SharedCache("tips-test", ttl=60)
+
+    def stale_loader():
+        # Another worker changes the tips and invalidates while this load is still running.
+        worker_b.invalidate("visa")
+        return ["stale"]
+
+    assert worker_a.get_or_load("visa", stale_loader) == ["stale"]
+    assert worker_a.get_or_load("visa", lambda: ["fresh"]) == ["fresh"]
+    assert worker_b.get_or_load("visa", lambda: ["unused"]) == ["fresh"]
+
+    def locally_invalidated_loader():
+        worker_a.invalidate("bank")
+        return ["stale"]
+
+    worker_a.get_or_load("bank", locally_invalidated_loader)
+    assert worker_a.get_or_load("bank", lambda: ["fresh"]) == ["fresh"]
+
+
+def test_master_relays_invalidations_to_the_other_workers():
+    master = Master("app.main:app", "127.0.0.1", 0, workers=3, graceful_timeout=1)
+    pairs = [socket.socketpair() for _ in range(3)]
+    workers = [Worker(slot, 1000 + slot, master_end) for slot, (master_end, _) in enumerate(pairs)]
+    workers[2].stopping = True
+    master.workers = {worker.pid: worker for worker in workers}
+
+    master._handle_message(workers[0], {"type": "invalidate", "cache": "tips", "key": "visa"})
+
+    pairs[1][1].settimeout(1)
+    assert json.loads(pairs[1][1].recv(4096)) == {"type": "invalidate", "cache": "tips", "key": "visa"}
+    for _, worker_end in (pairs[0], pairs[2]):
+        worker_end.setblocking(False)
+        with pytest.raises(BlockingIOError):
+            worker_end.recv(4096)
+    for master_end, worker_end in pairs:
+        master_end.close()
+        worker_end.close()
+
+
+
+def test_rolling_restart_stops_background_jobs_before_replacing_worker_0(monkeypatch):
+    master = Master("app.main:app", "127.0.0.1", 0, workers=1, graceful_timeout=1)
+    master_end, worker_end = socket.socketpair()
+    master_end.setblocking(False)
+    old = Worker(0, 1000, master_end)
+    master.workers = {old.pid: old}
+    master.selector.register(master_end, selectors.EVENT_READ, old)
+    events = []
+
+    def worker_side():
+        events.append(json.loads(worker_end.recv(4096))["type"])
+        worker_end.sendall(b'{"type": "background-stopped"}\n')
+
+    def spawn(slot):
+        events.append("spawn")
+        new = master.workers[2000] = Worker(slot, 2000, None)
+        new.ready = True
+        return new
+
+    monkeypatch.setattr(master, "_spawn", spawn)
+    monkeypatch.setattr(master, "_stop", lambda workers: events.append("stop"))
+    monkeypatch.setattr(master, "_reap", lambda: None)
+    listener = threading.Thread(target=worker_side)
+    listener.start()
+    master._rolling_restart()
+    listener.join(1)
+    assert events == ["stop-background", "spawn", "stop"]
+    master.selector.close()
+    master_end.close()
+    worker_end.close()
@@ -0,0 +1,113 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.singleflight import SingleFlight, single_flight
+
+
+def run_concurrently(count, fn):
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return [future.result() for future in [pool.submit(call) for _ in range(count)]]
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    flight = SingleFlight("tips", timeout=5)
+    executions = []
+
+    def query():
+        executions.append(1)
+        time.sleep(0.1)
+        return ["tip"]
+
+    results = run_concurrently(20, lambda: flight.do("visa", query))
+    assert results == [["tip"]] * 20
+    assert len(executions) == 1
+    stats = flight.stats()
+    assert stats["calls"] == 20 and stats["executions"] == 1 and stats["shared"] == 19
+    assert stats["coalescing_ratio"] == 0.95 and stats["in_flight"] == 0
+
+
+def test_waiters_run_the_call_themselves_after_the_timeout():
+    flight = SingleFlight("slow", timeout=0.05)
+    executions = []
+
+    def query():
+        executions.append(1)
+        time.sleep(0.3 if len(executions) == 1 else 0)
+        return len(executions)
+
+    results = run_concurrently(5, lambda: flight.do("key", query))
+    assert len(executions) == 5
+    assert flight.stats()["timeouts"] == 4
+    assert sorted(results)[-1] == 5
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight("broken", timeout=5)
+
+    def query():
+        time.sleep(0.1)
+        raise ValueError("db down")
+
+    def call():
+        with pytest.raises(ValueError):
+            flight.do("key", query)
+        return True
+
+    assert all(run_concurrently(5, call))
+    assert flight.stats()["executions"] == 1
+
+
+def test_decorator_keys_on_arguments_not_on_the_instance():
+    class Service:
+        executions = 0
+
+        def __init__(self, db):
+            self.db = db
+
+        @single_flight(timeout=5)
+        def get(self, topic):
+            Service.executions += 1
+            time.sleep(0.1)
+            return topic.upper()
+
+    results = run_concurrently(10, lambda: Service(db=object()).get(topic="visa"))
+    assert results == ["VISA"] * 10
+    assert Service.executions == 1
+    assert Service(None).get("bank") == "BANK"
+    assert Service.get.single_flight.stats()["calls"] == 11
+
+
+def test_decorator_does_not_share_results_across_databases(tmp_path):
+    class Service:
+        def __init__(self, db):
+            self.db = db
+
+        @single_flight(timeout=5)
+        def get(self, topic):
+            time.sleep(0.1)
+            return self.db.get_bind().url.database
+
+    engines = [create_engine(f"sqlite:///{tmp_path / name}") for name in ("a.db", "b.db")]
+    turns = itertools.count()
+
+    def call():
+        db = Session(bind=engines[next(turns) % 2])
+        return db.get_bind().url.database, Service(db).get(topic="visa")
+
+    results = run_concurrently(10, call)
+    for engine in engines:
+        engine.dispose()
+    assert all(expected == got for expected, got in results)
+    assert Service.get.single_flight.stats()["executions"] == 2
@@ -0,0 +1,118 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import user, tip, roadmap, career, note, reminder, calendar
+from app.services.archive import ArchiveService
+from app.services.calendar import CalendarService
+from app.services.career import CareerService
+from app.services.career_stats import CareerStatsService
+from app.services.notes import NoteService
+from app.services.outbox import OutboxWorker
+from app.services.reminders import ReminderService
+from app.services.roadmap import RoadmapService
+from app.services.tips import TipService
+
+USERS = 50
+ROWS_PER_USER = 20
+
+# A plain "SCAN <table>" (optionally over some index) means every row is visited.
+FULL_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+@pytest.fixture
+def engine(make_database):
+    engine = make_database("plans.db")
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(user.User.__table__.insert(), [
+            {"id": u, "username": f"user{u}", "email": f"user{u}@example.com"} for u in range(1, USERS + 1)
+        ])
+        conn.execute(note.Note.__table__.insert(), [
+            {"user_id": u, "title": f"note {i}", "content": "body", "tags": "visa" if i % 2 else "bank",
+             "created_at": i, "updated_at": i}
+            for u in range(1, USERS + 1) for i in range(ROWS_PER_USER)
+        ])
+        conn.execute(reminder.Reminder.__table__.insert(), [
+            {"user_id": u, "title": f"reminder {i}", "reminder_time": now + timedelta(hours=i)}
+            for u in range(1, USERS + 1) for i in range(ROWS_PER_USER)
+        ])
+        conn.execute(calendar.CalendarEvent.__table__.insert(), [
+            {"user_id": u, "title": f"event {i}", "start_time": now + timedelta(hours=i),
+             "end_time": now + timedelta(hours=i + 1), "created_at": now, "updated_at": now}
+            for u in range(1, USERS + 1) for i in range(ROWS_PER_USER)
+        ])
+        conn.execute(career.Career.__table__.insert(), [
+            {"user_id": u, "goal": f"goal {i}"} for u in range(1, USERS + 1) for i in range(3)
+        ])
+        conn.execute(roadmap.Roadmap.__table__.insert(), [
+            {"user_id": u, "title": "plan", "milestones": "[]"} for u in range(1, USERS + 1)
+        ])
+        conn.execute(tip.Tip.__table__.insert(), [
+            {"topic": f"topic{i % 10}", "content": "tip"} for i in range(200)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    return engine
+
+
+def capture_statements(engine, call):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("INSERT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    db = sessionmaker(bind=engine)()
+    try:
+        call(db)
+    finally:
+        db.rollback()
+        db.close()
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def full_scans(engine, statements):
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            scans.extend(f"{row[-1]}  <-  {statement}" for row in plan if FULL_SCAN.match(row[-1]))
+    return scans
+
+
+HOT_QUERIES = {
+    "NoteService.get_notes": lambda db: NoteService(db).get_notes(user_id=7),
+    "NoteService.get_notes[tag]": lambda db: NoteService(db).get_notes(user_id=7, tag="visa"),
+    "NoteService.get_note": lambda db: NoteService(db).get_note(note_id=3, user_id=1),
+    "NoteService.delete_note": lambda db: NoteService(db).delete_note(note_id=3, user_id=1),
+    "ReminderService.get_reminders": lambda db: ReminderService(db).get_reminders(user_id=7),
+    "ReminderService.get_reminders[archived]": lambda db: ReminderService(db).get_reminders(user_id=7, include_archived=True),
+    "ReminderService.delete_reminder": lambda db: ReminderService(db).delete_reminder(reminder_id=3, user_id=1),
+    "CalendarService.get_daily_events": lambda db: CalendarService(db).get_daily_events(user_id=7),
+    "CalendarService.get_weekly_events": lambda db: CalendarService(db).get_weekly_events(user_id=7),
+    "CalendarService.delete_event": lambda db: CalendarService(db).delete_event(event_id=3),
+    "CalendarService.get_events[archived]": lambda db: CalendarService(db).get_events(
+        user_id=7, start=datetime(2020, 1, 1), end=datetime(2030, 1, 1), include_archived=True),
+    "ArchiveService.archive_reminders": lambda db: ArchiveService(db).archive_reminders(datetime.utcnow(), 100),
+    "ArchiveService.archive_events": lambda db: ArchiveService(db).archive_events(datetime.utcnow(), 100),
+    "CareerService.get_career_goals": lambda db: CareerService(db).get_career_goals(user_id=7),
+    "CareerStatsService.user_stats": lambda db: CareerStatsService(db).user_stats(user_id=7),
+    "CareerStatsService.goal_stats": lambda db: CareerStatsService(db).goal_stats(goal="goal 1"),
+    "CareerStatsService.rebuild": lambda db: CareerStatsService(db).rebuild(user_ids=[7], goals=["goal 1"]),
+    "RoadmapService.get_roadmap": lambda db: RoadmapService(db).get_roadmap(user_id=7),
+    "TipService.load_tips": lambda db: TipService(db).load_tips(topic="topic3"),
+    "OutboxWorker._claim_batch": lambda db: OutboxWorker(lambda: db)._claim_batch(db),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(engine, name):
+    statements = capture_statements(engine, HOT_QUERIES[name])
+    assert statements, f"{name} issued no queries"
+    scans = full_scans(engine, statements)
+    assert not scans, f"{name} falls back to a full table scan:\n" + "\n".join(scans)
\ No newline at end of file
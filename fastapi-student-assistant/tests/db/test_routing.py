@@ -0,0 +1,82 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.db.routing import SessionRouter
+from app.models.note import Note
+
+
+def database_name(session):
+    return session.get_bind().url.database
+
+
+@pytest.fixture
+def databases(session_factory, tmp_path):
+    # One primary and two replicas, all plain SQLite files with the same schema.
+    primary = Path(session_factory.kw["bind"].url.database)
+    replicas = []
+    for i in (1, 2):
+        replica = tmp_path / f"replica{i}.db"
+        shutil.copy(primary, replica)
+        replicas.append(replica)
+    return primary, replicas
+
+
+@pytest.fixture
+def primary_factory(databases, session_factory):
+    return session_factory
+
+
+def test_reads_round_robin_across_replicas(databases, primary_factory):
+    _, replicas = databases
+    router = SessionRouter(primary_factory, [f"sqlite:///{path}" for path in replicas])
+    used = [database_name(router.read_session()) for _ in range(4)]
+    assert used == [str(replicas[0]), str(replicas[1]), str(replicas[0]), str(replicas[1])]
+
+
+def test_unhealthy_replica_is_skipped(databases, primary_factory, tmp_path):
+    primary, replicas = databases
+    missing = f"sqlite:///file:{tmp_path / 'gone.db'}?mode=ro&uri=true"
+    router = SessionRouter(primary_factory, [missing, f"sqlite:///{replicas[0]}"])
+    used = {database_name(router.read_session()) for _ in range(4)}
+    assert used == {str(replicas[0])}
+
+
+def test_no_healthy_replica_falls_back_to_primary(databases, primary_factory, tmp_path):
+    primary, _ = databases
+    missing = f"sqlite:///file:{tmp_path / 'gone.db'}?mode=ro&uri=true"
+    router = SessionRouter(primary_factory, [missing])
+    assert database_name(router.read_session()) == str(primary)
+
+
+def test_user_reads_own_writes_from_primary(databases, primary_factory):
+    primary, replicas = databases
+    router = SessionRouter(primary_factory, [f"sqlite:///{path}" for path in replicas], sticky_seconds=60)
+    router.track_writes(primary_factory)
+
+    db = primary_factory()
+    db.add(Note(user_id=7, title="visa", content="I-20", tags="visa", created_at=1, updated_at=1))
+    db.commit()
+    db.close()
+
+    assert database_name(router.read_session(user_id=7)) == str(primary)
+    assert database_name(router.read_session(user_id=8)) != str(primary)
+
+
+def test_stickiness_expires(databases, primary_factory):
+    primary, replicas = databases
+    router = SessionRouter(primary_factory, [f"sqlite:///{replicas[0]}"], sticky_seconds=0)
+    router.mark_write(7)
+    assert database_name(router.read_session(user_id=7)) == str(replicas[0])
+
+def test_stickiness_is_shared_between_workers(databases, primary_factory, tmp_path, monkeypatch):
+    # Two routers stand in for two worker processes sharing SHARED_CACHE_DIR.
+    primary, replicas = databases
+    monkeypatch.setattr(settings, "SHARED_CACHE_DIR", str(tmp_path / "shared"))
+    writing = SessionRouter(primary_factory, [f"sqlite:///{replicas[0]}"], sticky_seconds=60)
+    reading = SessionRouter(primary_factory, [f"sqlite:///{replicas[0]}"], sticky_seconds=60)
+    writing.mark_write(7)
+    assert database_name(reading.read_session(user_id=7)) == str(primary)
+    assert database_name(reading.read_session(user_id=8)) == str(replicas[0])
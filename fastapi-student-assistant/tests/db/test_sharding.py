@@ -0,0 +1,148 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.db.rebalance import move_user, pin_all, plan
+from app.db.sharding import HashRing, ShardRouter, build_shard
+from app.models.archive import ArchivedReminder
+from app.models.career import Career
+from app.models.note import Note
+from app.models.reminder import Reminder
+from app.services.career import CareerService
+from app.services.vector_index import vector_store
+
+
+def make_router(make_database, count):
+    # Each shard opens its own engines on a database file that already has the schema.
+    shards = [build_shard(index, str(make_database(f"shard{index}.db").url)) for index in range(count)]
+    return ShardRouter(shards, virtual_nodes=64, pin_cache_seconds=0)
+
+
+@pytest.fixture
+def router(make_database, tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "directory", tmp_path / "vectors")
+    router = make_router(make_database, 3)
+    yield router
+    for built in router.shards:
+        built.writer.stop()
+        built.engine.dispose()
+
+
+def add_goal(router, user_id, goal="goal"):
+    def write(db):
+        db.add(Career(user_id=user_id, goal=goal))
+        db.commit()
+
+    router.writer_for(user_id).run(write)
+
+
+def test_adding_a_shard_only_moves_users_onto_it():
+    before, after = HashRing(3), HashRing(4)
+    moved = [uid for uid in range(10000) if before.node_for(uid) != after.node_for(uid)]
+    assert all(after.node_for(uid) == 3 for uid in moved)
+    assert 0.15 < len(moved) / 10000 < 0.35
+
+
+def test_users_are_routed_to_their_shard_and_fanned_out(router):
+    for user_id in range(1, 31):
+        add_goal(router, user_id)
+
+    for user_id in range(1, 31):
+        db = router.read_session(user_id)
+        try:
+            assert db.query(Career).filter(Career.user_id == user_id).count() == 1
+            assert db.get_bind().url.database.endswith(f"shard{router.ring.node_for(user_id)}.db")
+        finally:
+            db.close()
+    assert len({router.shard_index(uid) for uid in range(1, 31)}) == 3
+
+    goals = router.fan_out(lambda db: CareerService(db).get_all_career_goals())
+    assert sorted(goal.user_id for goal in goals) == list(range(1, 31))
+
+
+def test_move_user_copies_rows_then_deletes_the_source(router):
+    user_id = 7
+    source = router.shard_index(user_id)
+    target = (source + 1) % 3
+    now = datetime.utcnow()
+
+    def seed(db):
+        db.add(Career(user_id=user_id, goal="nurse"))
+        db.add(Note(user_id=user_id, title="visa", content="renew the visa", created_at=now, updated_at=now))
+        db.commit()
+
+    router.writer_for(user_id).run(seed)
+    moved = move_user(router, user_id, target, settle_seconds=0)
+
+    assert moved["careers"] == 1 and moved["notes"] == 1
+    assert router.shard_index(user_id) == target
+    assert router.pins() == {user_id: target}
+    db = router.session(user_id)
+    try:
+        assert db.query(Career).filter(Career.user_id == user_id).one().goal == "nurse"
+        assert db.query(Note).filter(Note.user_id == user_id).one().content == "renew the visa"
+    finally:
+        db.close()
+    db = router.shards[source].session_factory()
+    try:
+        assert db.query(Career).filter(Career.user_id == user_id).count() == 0
+    finally:
+        db.close()
+    assert len(vector_store.index_for(user_id)) == 1
+
+
+def test_moving_users_cannot_write(router):
+    router.pin(5, router.shard_index(5), state="moving")
+    with pytest.raises(HTTPException) as exc:
+        router.writer_for(5)
+    assert exc.value.status_code == 503
+    router.writer_for(6)
+
+
+def test_pin_all_keeps_existing_users_in_place_when_a_shard_is_added(make_database, tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "directory", tmp_path / "vectors")
+    small = make_router(make_database, 2)
+    for user_id in range(1, 41):
+        add_goal(small, user_id)
+    placement = {uid: small.shard_index(uid) for uid in range(1, 41)}
+    for built in small.shards:
+        built.writer.stop()
+        built.engine.dispose()
+
+    grown = make_router(make_database, 3)
+    pin_all(grown)
+    assert {uid: grown.shard_index(uid) for uid in range(1, 41)} == placement
+
+    pending = plan(grown)
+    assert pending and all(target == 2 for _, _, target in pending)
+    for user_id, _, target in pending:
+        move_user(grown, user_id, target, settle_seconds=0)
+    assert plan(grown) == []
+    assert all(grown.shard_index(uid) == grown.ring.node_for(uid) for uid in range(1, 41))
+    for built in grown.shards:
+        built.writer.stop()
+        built.engine.dispose()
+
+
+def test_moved_archive_rows_never_share_an_id_on_the_target(router):
+    user_id = 7
+    source = router.shard_index(user_id)
+    target = (source + 1) % 3
+    now = datetime.utcnow()
+    with router.shards[target].engine.begin() as connection:
+        for i in range(4):
+            connection.execute(Reminder.__table__.insert(), {"user_id": 100 + i, "title": "hot", "reminder_time": now})
+    with router.shards[source].engine.begin() as connection:
+        connection.execute(ArchivedReminder.__table__.insert(), [
+            {"id": 3, "user_id": user_id, "title": "archived", "completed": True, "reminder_time": now},
+            {"id": 9, "user_id": user_id, "title": "archived", "completed": True, "reminder_time": now},
+        ])
+
+    assert move_user(router, user_id, target, settle_seconds=0)["reminders_archive"] == 2
+    with router.shards[target].engine.begin() as connection:
+        connection.execute(Reminder.__table__.insert(), {"user_id": 200, "title": "new", "reminder_time": now})
+        ids = [row.id for table in (Reminder.__table__, ArchivedReminder.__table__)
+               for row in connection.execute(select(table.c.id))]
+    assert len(ids) == 7 and len(set(ids)) == 7
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import declarative_base
+
+from app.db.sqlite import SQLiteWriter, apply_sqlite_profile
+
+Base = declarative_base()
+
+
+class Parent(Base):
+    __tablename__ = "parents"
+
+    id = Column(Integer, primary_key=True)
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    parent_id = Column(Integer, ForeignKey("parents.id", deferrable=True, initially="DEFERRED"))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'writer.db'}", connect_args={"check_same_thread": False})
+    apply_sqlite_profile(engine, immediate=True)
+
+    @event.listens_for(engine, "connect")
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def writer(engine):
+    # A long window so every job submitted below lands in the same batch.
+    writer = SQLiteWriter(engine, window=0.2)
+    yield writer
+    writer.stop()
+
+
+def insert(db, name, parent_id=None):
+    db.add(Item(name=name, parent_id=parent_id))
+    db.commit()
+    return name
+
+
+def stored(engine):
+    with engine.connect() as conn:
+        return sorted(name for (name,) in conn.execute(text("SELECT name FROM items")))
+
+
+def test_failing_job_mid_batch_only_fails_itself(engine, writer):
+    futures = [writer.submit(insert, "a"), writer.submit(insert, None), writer.submit(insert, "b")]
+
+    assert futures[0].result(timeout=5) == "a"
+    with pytest.raises(IntegrityError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == "b"
+    assert stored(engine) == ["a", "b"]
+
+
+def test_failing_commit_reruns_the_other_jobs(engine, writer):
+    # The dangling parent_id is only checked when the batch commits.
+    futures = [writer.submit(insert, "a"), writer.submit(insert, "orphan", 42), writer.submit(insert, "b")]
+
+    assert futures[0].result(timeout=5) == "a"
+    with pytest.raises(IntegrityError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == "b"
+    assert stored(engine) == ["a", "b"]
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.db.sqlite import DirectWriter
+from app.models.archive import ArchivedCalendarEvent, ArchivedReminder
+from app.models.calendar import CalendarEvent
+from app.models.reminder import Reminder
+from app.schemas.reminder import ReminderCreate, ReminderOut, ReminderUpdate
+from app.services.archive import Archiver
+from app.services.calendar import CalendarService
+from app.services.reminders import ReminderService
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    now = datetime.utcnow()
+    with session_factory.kw["bind"].begin() as conn:
+        conn.execute(Reminder.__table__.insert(), [
+            {"user_id": 1, "title": f"old done {i}", "completed": True, "reminder_time": now - timedelta(days=60 + i)}
+            for i in range(7)
+        ] + [
+            {"user_id": 1, "title": "old open", "completed": False, "reminder_time": now - timedelta(days=90)},
+            {"user_id": 1, "title": "upcoming", "completed": False, "reminder_time": now + timedelta(days=1)},
+        ])
+        conn.execute(CalendarEvent.__table__.insert(), [
+            {"user_id": 1, "title": title, "start_time": start, "end_time": start + timedelta(hours=1),
+             "created_at": now, "updated_at": now}
+            for title, start in (("past", now - timedelta(days=45)), ("soon", now + timedelta(days=2)))
+        ])
+    return session_factory
+
+
+def test_archiver_moves_cold_rows_in_batches(session_factory):
+    archiver = Archiver(DirectWriter(session_factory), batch_size=3, retention=timedelta(days=30), pause=0)
+    assert archiver.run_once() == {"reminders": 7, "calendar_events": 1}
+    assert archiver.run_once() == {"reminders": 0, "calendar_events": 0}
+
+    db = session_factory()
+    try:
+        assert sorted(r.title for r in db.query(Reminder)) == ["old open", "upcoming"]
+        assert db.query(ArchivedReminder).count() == 7
+        assert [e.title for e in db.query(CalendarEvent)] == ["soon"]
+        assert [e.title for e in db.query(ArchivedCalendarEvent)] == ["past"]
+    finally:
+        db.close()
+
+
+def test_include_archived_unions_the_archive(session_factory):
+    Archiver(DirectWriter(session_factory), retention=timedelta(days=30), pause=0).run_once()
+    db = session_factory()
+    try:
+        assert len(ReminderService(db).get_reminders(user_id=1)) == 2
+        history = [ReminderOut.from_orm(row) for row in ReminderService(db).get_reminders(user_id=1, include_archived=True)]
+        assert len(history) == 9
+        assert [r.reminder_time for r in history] == sorted(r.reminder_time for r in history)
+        assert sum(r.archived for r in history) == 7 and history[-1].title == "upcoming"
+
+        now = datetime.utcnow()
+        events = CalendarService(db).get_events(1, now - timedelta(days=60), now + timedelta(days=7), include_archived=True)
+        assert [(e.title, e.archived) for e in events] == [("past", True), ("soon", False)]
+        assert [e.title for e in CalendarService(db).get_events(1, now - timedelta(days=60), now + timedelta(days=7))] == ["soon"]
+    finally:
+        db.close()
+
+
+def test_completed_reminders_are_archived_and_ids_never_reused(session_factory):
+    db = session_factory()
+    try:
+        old_open = db.query(Reminder).filter(Reminder.title == "old open").one()
+        ReminderService(db).update_reminder(old_open.id, ReminderUpdate(completed=True), user_id=1)
+        with pytest.raises(HTTPException):
+            ReminderService(db).update_reminder(old_open.id, ReminderUpdate(completed=True), user_id=2)
+        with pytest.raises(ValidationError):
+            ReminderUpdate(title=None)
+        upcoming = db.query(Reminder).filter(Reminder.title == "upcoming").one()
+        ReminderService(db).delete_reminder(upcoming.id, user_id=1)
+    finally:
+        db.close()
+
+    Archiver(DirectWriter(session_factory), retention=timedelta(days=30), pause=0).run_once()
+    db = session_factory()
+    try:
+        assert db.query(ArchivedReminder).filter(ArchivedReminder.title == "old open").count() == 1
+        # Every reminder left the hot table; a new one must not take an archived id.
+        assert db.query(Reminder).count() == 0
+        latest = max(r.id for r in ReminderService(db).get_reminders(user_id=1, include_archived=True))
+        created = ReminderService(db).create_reminder(
+            ReminderCreate(user_id=1, title="new", due_date=datetime.utcnow()), user_id=1)
+        history = ReminderService(db).get_reminders(user_id=1, include_archived=True)
+        assert created.id > latest
+        assert len({r.id for r in history}) == len(history)
+    finally:
+        db.close()
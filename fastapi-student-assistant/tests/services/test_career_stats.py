@@ -0,0 +1,63 @@
+import pytest
+from pydantic import ValidationError
+
+from app.models.career import CareerGoalStats, CareerUserStats
+from app.schemas.career import CareerCreate, CareerUpdate
+from app.services.career import CareerService
+from app.services.career_stats import CareerStatsService, summarize
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def _snapshot(db):
+    rows = [tuple(row) for model in (CareerUserStats, CareerGoalStats)
+            for row in db.execute(model.__table__.select()).fetchall()]
+    return sorted(rows, key=repr)
+
+
+def test_writes_keep_totals_in_step_with_a_rebuild(db):
+    service = CareerService(db)
+    nurse = service.create_career_goal(CareerCreate(user_id=1, goal="nurse", progress=20))
+    dev = service.create_career_goal(CareerCreate(user_id=1, goal="dev", resources=["cs50"]))
+    service.create_career_goal(CareerCreate(user_id=2, goal="dev", progress=100))
+    service.update_career_goal(dev.id, CareerUpdate(progress=55.5))
+    service.update_career_goal(nurse.id, CareerUpdate(goal="midwife", progress=100))
+    service.delete_career_goal(dev.id, user_id=1)
+
+    stats = CareerStatsService(db)
+    assert summarize([stats.user_stats(1)]) == {
+        "goals": 1, "completed": 1, "average_progress": 100.0, "histogram": [0] * 9 + [1],
+    }
+    assert summarize([stats.goal_stats("dev")])["goals"] == 1
+    assert summarize([stats.goal_stats("nurse")])["goals"] == 0
+
+    incremental = _snapshot(db)
+    stats.rebuild()
+    db.commit()
+    rebuilt = _snapshot(db)
+    # A rebuild drops rows whose count reached zero; the incremental path keeps them at zero.
+    assert [row for row in incremental if row[1] != 0] == rebuilt
+
+
+@pytest.mark.parametrize("field", ["goal", "progress", "resources"])
+def test_update_rejects_explicit_nulls(field):
+    with pytest.raises(ValidationError):
+        CareerUpdate(**{field: None})
+    assert CareerUpdate(progress=40).dict(exclude_unset=True) == {"progress": 40}
+
+
+def test_summarize_adds_up_shards():
+    class Row:
+        def __init__(self, **values):
+            self._mapping = {"goals": 0, "completed": 0, "progress_sum": 0.0,
+                             **{f"bucket_{i}": 0 for i in range(10)}, **values}
+
+    total = summarize([Row(goals=2, progress_sum=30.0, bucket_1=2), None, Row(goals=1, completed=1, progress_sum=100.0, bucket_9=1)])
+    assert total["goals"] == 3
+    assert total["average_progress"] == round(130 / 3, 2)
+    assert total["histogram"][1] == 2 and total["histogram"][9] == 1
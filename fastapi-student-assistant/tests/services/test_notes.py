@@ -0,0 +1,20 @@
+from app.schemas.note import NoteCreate
+from app.services.notes import NoteService
+
+
+def test_tag_filter_matches_one_tag_of_several(session_factory):
+    db = session_factory()
+    try:
+        service = NoteService(db)
+        for title, tags in (("both", ["visa", "bank"]), ("visa", ["visa"]), ("visas", ["visas"]),
+                            ("wildcard", ["v_sa", "10%"]), ("untagged", None)):
+            service.create_note(NoteCreate(title=title, content="body", tags=tags), user_id=1)
+        service.create_note(NoteCreate(title="other user", content="body", tags=["visa"]), user_id=2)
+
+        assert sorted(n.title for n in service.get_notes(user_id=1, tag="visa")) == ["both", "visa"]
+        assert [n.title for n in service.get_notes(user_id=1, tag="bank")] == ["both"]
+        assert [n.title for n in service.get_notes(user_id=1, tag="v_sa")] == ["wildcard"]
+        assert [n.title for n in service.get_notes(user_id=1, tag="10%")] == ["wildcard"]
+        assert len(service.get_notes(user_id=1)) == 5
+    finally:
+        db.close()
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+from app.models.outbox import OutboxEvent
+from app.services.outbox import OutboxService, OutboxWorker, register_handler
+
+FAILURES = []
+
+@register_handler("test.flaky")
+def flaky_handler(db, event, payload):
+    FAILURES.append(event.id)
+    raise RuntimeError("downstream unavailable")
+
+
+def _enqueue(session_factory, topic: str, count: int):
+    db = session_factory()
+    try:
+        for i in range(count):
+            OutboxService(db).enqueue(topic, {"i": i}, aggregate_id=i)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_two_workers_never_claim_the_same_rows(session_factory):
+    _enqueue(session_factory, "test.noop", 5)
+    first, second = OutboxWorker(session_factory, batch_size=3), OutboxWorker(session_factory, batch_size=3)
+    db_a, db_b = session_factory(), session_factory()
+    try:
+        claimed_a = first._claim_batch(db_a)
+        claimed_b = second._claim_batch(db_b)
+        assert len(claimed_a) == 3 and len(claimed_b) == 2
+        assert not set(claimed_a) & set(claimed_b)
+        assert second._claim_batch(db_b) == []
+    finally:
+        db_a.close()
+        db_b.close()
+
+
+def test_expired_lease_is_claimed_again(session_factory):
+    _enqueue(session_factory, "test.noop", 2)
+    worker = OutboxWorker(session_factory, lease_seconds=60)
+    db = session_factory()
+    try:
+        claimed = worker._claim_batch(db)
+        assert worker._claim_batch(db) == []
+        # The first worker crashed; its lease runs out.
+        db.query(OutboxEvent).update({OutboxEvent.available_at: datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+        assert worker._claim_batch(db) == claimed
+    finally:
+        db.close()
+
+
+def test_failed_handler_backs_off_then_gives_up(session_factory):
+    _enqueue(session_factory, "test.flaky", 1)
+    worker = OutboxWorker(session_factory, max_attempts=2, retry_backoff=30)
+    assert worker.drain_once() == 1
+
+    db = session_factory()
+    try:
+        event = db.query(OutboxEvent).one()
+        assert (event.status, event.attempts) == ("pending", 1)
+        assert "downstream unavailable" in event.last_error
+        assert event.available_at > datetime.utcnow() + timedelta(seconds=25)
+        assert worker.drain_once() == 0
+
+        event.available_at = datetime.utcnow()
+        db.commit()
+        assert worker.drain_once() == 1
+        db.expire_all()
+        assert (event.status, event.attempts) == ("failed", 2)
+    finally:
+        db.close()
+
+
+def test_purge_removes_only_old_processed_events(session_factory):
+    _enqueue(session_factory, "test.noop", 3)
+    now = datetime.utcnow()
+    db = session_factory()
+    try:
+        old, recent, pending = db.query(OutboxEvent).order_by(OutboxEvent.id).all()
+        old.status, old.processed_at = "done", now - timedelta(hours=48)
+        recent.status, recent.processed_at = "done", now
+        db.commit()
+        assert OutboxWorker(session_factory).purge_processed(timedelta(hours=24)) == 1
+        assert [e.id for e in db.query(OutboxEvent).order_by(OutboxEvent.id)] == [recent.id, pending.id]
+    finally:
+        db.close()
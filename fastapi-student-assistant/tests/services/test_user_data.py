@@ -0,0 +1,145 @@
+import io
+import json
+import os
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.sqlite import DirectWriter
+from app.models.calendar import CalendarEvent
+from app.models.note import Note
+from app.models.outbox import OutboxEvent
+from app.models.reminder import Reminder
+from app.schemas.reminder import ReminderCreate
+from app.services.notes import NoteService, content_columns
+from app.services.reminders import ReminderService
+from app.services.user_data import UserDataImporter, UserDataService
+
+
+@pytest.fixture
+def source(make_database):
+    factory = sessionmaker(bind=make_database("source.db"))
+    now = datetime.utcnow().replace(microsecond=0)
+    long_body = "long body " * 1000  # stored compressed
+    with factory.kw["bind"].begin() as conn:
+        conn.execute(Note.__table__.insert(), [
+            {"user_id": 1, "title": f"note {i}", "tags": "a,b", "created_at": i, "updated_at": i,
+             **content_columns(long_body if i == 0 else os.urandom(1000).hex())}
+            for i in range(25)
+        ] + [{"user_id": 2, "title": "other user", "tags": None, "created_at": 0, "updated_at": 0, **content_columns("x")}])
+        conn.execute(Reminder.__table__.insert(), [
+            {"user_id": 1, "title": "pay rent", "reminder_time": now, "created_at": now, "updated_at": now},
+        ])
+        conn.execute(CalendarEvent.__table__.insert(), [
+            {"user_id": 1, "title": "exam", "start_time": now, "end_time": now + timedelta(hours=2),
+             "created_at": now, "updated_at": now},
+        ])
+    return factory, long_body, now
+
+
+def test_export_streams_ndjson_members(source, monkeypatch):
+    factory, long_body, _ = source
+    monkeypatch.setattr(settings, "EXPORT_FETCH_SIZE", 10)
+    db = factory()
+    try:
+        chunks = list(UserDataService(db).export_zip(1, chunk_size=1024))
+    finally:
+        db.close()
+    assert len(chunks) > 1
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["counts"]["notes"] == 25
+    assert manifest["counts"]["reminders"] == 1
+    notes = [json.loads(line) for line in archive.read("notes.ndjson").decode().splitlines()]
+    assert {n["user_id"] for n in notes} == {1}
+    assert notes[0]["content"] == long_body
+    assert "content_blob" not in notes[0]
+
+
+def test_import_round_trips_into_another_database(source, session_factory):
+    factory, long_body, now = source
+    db = factory()
+    try:
+        payload = b"".join(UserDataService(db).export_zip(1))
+    finally:
+        db.close()
+
+    target = session_factory
+    counts = UserDataImporter(DirectWriter(target), batch_size=10).import_zip(io.BytesIO(payload), 7)
+    assert counts["notes"] == 25
+    assert counts["calendar_events"] == 1
+
+    db = target()
+    try:
+        notes = db.query(Note).filter(Note.user_id == 7).order_by(Note.created_at).all()
+        assert len(notes) == 25
+        assert notes[0].content_codec is not None
+        assert NoteService(db).read_content(notes[0]) == long_body
+        assert db.query(Reminder).one().reminder_time == now
+        assert db.query(OutboxEvent).filter(OutboxEvent.topic == "notes.imported").count() == 1
+    finally:
+        db.close()
+
+
+def test_import_reports_the_bad_line(session_factory):
+    upload = io.BytesIO()
+    with zipfile.ZipFile(upload, "w") as archive:
+        archive.writestr("reminders.ndjson", '{"title": "ok"}\n{"title": "ok", "is_recurring": true}\nnot json\n')
+    upload.seek(0)
+    with pytest.raises(HTTPException) as exc:
+        UserDataImporter(DirectWriter(session_factory)).import_zip(upload, 1)
+    assert exc.value.status_code == 400
+    assert "reminders.ndjson line 3" in exc.value.detail
+
+
+@pytest.mark.parametrize("bad_line, error", [
+    ("not json", "reminders.ndjson line 6"),
+    ('{"description": "no title"}', "reminders.ndjson line 6: title is required"),
+])
+def test_bad_line_after_several_batches_stores_nothing(session_factory, bad_line, error):
+    upload = io.BytesIO()
+    with zipfile.ZipFile(upload, "w") as archive:
+        archive.writestr("notes.ndjson", '{"title": "kept only if all is valid", "content": "x"}\n')
+        archive.writestr("reminders.ndjson", "".join(f'{{"title": "r{i}"}}\n' for i in range(5)) + bad_line + "\n")
+    upload.seek(0)
+    target = session_factory
+    with pytest.raises(HTTPException) as exc:
+        UserDataImporter(DirectWriter(target), batch_size=2).import_zip(upload, 1)
+    assert exc.value.status_code == 400
+    assert error in exc.value.detail
+
+    db = target()
+    try:
+        assert db.query(Note).count() == 0
+        assert db.query(Reminder).count() == 0
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("hot_reminders", [0, 6])
+def test_imported_archive_rows_get_ids_no_hot_row_can_take(session_factory, hot_reminders):
+    now = datetime.utcnow().replace(microsecond=0)
+    with session_factory.kw["bind"].begin() as conn:
+        for i in range(hot_reminders):
+            conn.execute(Reminder.__table__.insert(), {"user_id": 1, "title": f"hot {i}", "reminder_time": now})
+    upload = io.BytesIO()
+    with zipfile.ZipFile(upload, "w") as archive:
+        archive.writestr("reminders_archive.ndjson", json.dumps(
+            {"archive_id": 1, "id": 5, "user_id": 9, "title": "archived", "completed": True,
+             "reminder_time": now.isoformat(), "archived_at": now.isoformat()}) + "\n")
+    upload.seek(0)
+    UserDataImporter(DirectWriter(session_factory)).import_zip(upload, 1)
+
+    db = session_factory()
+    try:
+        ReminderService(db).create_reminder(ReminderCreate(user_id=1, title="new", due_date=now), user_id=1)
+        ids = [r.id for r in ReminderService(db).get_reminders(user_id=1, include_archived=True)]
+        assert len(ids) == hot_reminders + 2
+        assert len(set(ids)) == len(ids)
+    finally:
+        db.close()
@@ -0,0 +1,87 @@
+import threading
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embeddings import HashingEmbedder
+from app.services.vector_index import IVFIndex, VectorStore
+
+NOTES = {
+    1: "Visa interview documents: passport, I-20, bank statements",
+    2: "Grocery list: rice, lentils, milk",
+    3: "Open a checking account at the bank near campus",
+    4: "Driver license written test practice questions",
+}
+
+
+def test_hashing_embedder_is_deterministic_and_normalised():
+    embedder = HashingEmbedder(dim=64)
+    first, second = embedder.embed(["visa interview docs"]), embedder.embed(["visa interview docs"])
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+
+
+def test_search_ranks_closest_note_first(tmp_path):
+    embedder = HashingEmbedder()
+    store = VectorStore(tmp_path, embedder.dim)
+    for note_id, text in NOTES.items():
+        store.upsert(7, note_id, embedder.embed([text])[0])
+
+    hits = store.search(7, embedder.embed(["visa interview docs"])[0], k=2)
+    assert [note_id for note_id, _ in hits][0] == 1
+    assert store.search(8, embedder.embed(["visa"])[0]) == []
+
+
+def test_upsert_replaces_and_remove_hides(tmp_path):
+    embedder = HashingEmbedder()
+    store = VectorStore(tmp_path, embedder.dim)
+    store.upsert(7, 1, embedder.embed(["bank account"])[0])
+    store.upsert(7, 1, embedder.embed(["driver license"])[0])
+    assert len(store.index_for(7)) == 1
+    assert store.search(7, embedder.embed(["driver license"])[0], k=1)[0][0] == 1
+
+    store.remove(7, 1)
+    assert store.search(7, embedder.embed(["driver license"])[0], k=1) == []
+
+
+def test_ivf_index_finds_exact_neighbour(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_IVF_THRESHOLD", 500)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((2000, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    store = VectorStore(tmp_path, 32)
+    for note_id, vector in enumerate(vectors, start=1):
+        store.upsert(7, note_id, vector)
+
+    found = sum(store.search(7, vectors[i], k=1)[0][0] == i + 1 for i in range(0, 2000, 50))
+    assert found == 40
+    assert store.index_for(7)._ivf is not None
+
+def test_ivf_build_does_not_block_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_IVF_THRESHOLD", 50)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((101, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    store = VectorStore(tmp_path, 16)
+    for note_id, vector in enumerate(vectors[:100], start=1):
+        store.upsert(7, note_id, vector)
+
+    building, release = threading.Event(), threading.Event()
+    build = IVFIndex.build.__func__
+
+    def slow_build(cls, *args, **kwargs):
+        building.set()
+        assert release.wait(5)
+        return build(cls, *args, **kwargs)
+
+    monkeypatch.setattr(IVFIndex, "build", classmethod(slow_build))
+    searcher = threading.Thread(target=store.search, args=(7, vectors[0]))
+    searcher.start()
+    assert building.wait(5)
+    # The build is in progress: writes and other searches still go through.
+    store.upsert(7, 101, vectors[100])
+    assert store.search(7, vectors[100], k=1)[0][0] == 101
+    release.set()
+    searcher.join(5)
+    assert store.index_for(7)._ivf is not None
@@ -4,7 +4,7 @@ import MainPage from "../../layout/Mainpage";
 import NotesPanel from "../common/NotesPanel";
 import ChatDock from "../common/ChatDock";
 import SavedNotesSidebar from "./SavedNotesSidebar";
-import { getNotes, createNote, updateNote, deleteNote } from "./notesApi";
+import { getNotes, getNote, createNote, updateNote, deleteNote } from "./notesApi";
 import "./Notes.css";
 
 export default function NotesPage({ userId = "demo-user-1" }) {
@@ -52,6 +52,16 @@ export default function NotesPage({ userId = "demo-user-1" }) {
     return () => { disposed = true; };
   }, [userId]);
 
+  /* Load the full body of the selected note (list items only carry a snippet) */
+  useEffect(() => {
+    if (!selected || selected.content !== undefined) return;
+    const controller = new AbortController();
+    getNote(userId, selected.id, { signal: controller.signal }).then(full => {
+      if (full) setNotes(ns => ns.map(n => (n.id === full.id ? { ...n, ...full } : n)));
+    });
+    return () => controller.abort();
+  }, [userId, selected]);
+
 //    useEffect(() => {
 //     const id = setInterval(refreshNotes, 30_000); // every 30s
 //     return () => clearInterval(id);               // cleanup on unmount
@@ -72,7 +82,7 @@ export default function NotesPage({ userId = "demo-user-1" }) {
         setDraft({ title: "", content: "", tags: [] });
         return;
     }
-    await deleteNote(id);
+    await deleteNote(userId, id);
     await refreshNotes();
     setSelectedId(null); // let refreshNotes choose the first note
   }
@@ -5,7 +5,7 @@ import "./SavedNotesSidebar.css";
  * Sidebar listing saved notes.
  *
  * Props:
- * - notes:       [{ id, title, content, tags }]
+ * - notes:       [{ id, title, snippet, tags }] (content only once a note was opened)
  * - selectedId:  string|null
  * - onSelect:    (id) => void
  * - onNew:       () => void
@@ -25,7 +25,7 @@ export default function SavedNotesSidebar({
     if (!s) return notes;
     return notes.filter((n) => {
       const hay =
-        `${n.title ?? ""} ${n.content ?? ""} ${(n.tags ?? []).join(" ")}`.toLowerCase();
+        `${n.title ?? ""} ${n.content ?? n.snippet ?? ""} ${(n.tags ?? []).join(" ")}`.toLowerCase();
       return hay.includes(s);
     });
   }, [q, notes]);
@@ -55,7 +55,7 @@ export default function SavedNotesSidebar({
 
         {filtered.map((n) => {
           const firstLine = (s) => (s || "").split(/\r?\n/).find(Boolean) || "";
-          const primary = firstLine(n.title) || firstLine(n.content) || "Untitled";
+          const primary = firstLine(n.title) || firstLine(n.content ?? n.snippet) || "Untitled";
           const meta = (n.tags ?? []).join(", ");
           const active = n.id === selectedId;
           return (
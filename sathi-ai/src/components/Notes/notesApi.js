@@ -32,6 +32,14 @@ export async function getNotes(userId, opts = {}) {
   return memory.filter(n => n.user_id === userId || userId === "demo-user-1");
 }
 
+// The list endpoint returns snippets only; fetch the full body when a note is opened.
+export async function getNote(userId, id, opts = {}) {
+  const data = await tryFetch(`${BASE}/${id}?user_id=${encodeURIComponent(userId)}`, { signal: opts.signal });
+  if (data) return data;
+  // fallback
+  return memory.find(n => n.id === id) || null;
+}
+
 export async function createNote(note) {
   const data = await tryFetch(BASE, {
     method: "POST",
@@ -57,8 +65,8 @@ export async function updateNote(id, patch) {
   return memory.find(n => n.id === id);
 }
 
-export async function deleteNote(id) {
-  const ok = await tryFetch(`${BASE}/${id}`, { method: "DELETE" });
+export async function deleteNote(userId, id) {
+  const ok = await tryFetch(`${BASE}/${id}?user_id=${encodeURIComponent(userId)}`, { method: "DELETE" });
   if (ok !== null) return true;
   // fallback
   memory = memory.filter(n => n.id !== id);